@@ -0,0 +1,72 @@
+import sys
+import time
+from ticimax_scraper.parsers import PARSER_BACKENDS, available_backends, make_soup
+from ticimax_scraper.corpus import load_corpus, record_pages
+from final_scraper import base_url, session, parse_product_page, get_sample_products
+
+# Folder with saved pages (one .html file per page, listed in its manifest.json)
+pages_dir = "benchmark_pages"
+
+# Each backend parses the whole corpus this many times
+ROUNDS = 3
+
+def load_pages(directory):
+    """Load saved product pages as (product_url, content) pairs"""
+    return [(url, content) for url, kind, content in load_corpus(directory, base_url) if kind == 'product']
+
+def main():
+    args = sys.argv[1:]
+    directory = next((arg for arg in args if not arg.startswith('--')), pages_dir)
+
+    if '--record' in args:
+        record_pages(session, get_sample_products(), directory)
+
+    pages = load_pages(directory)
+    if not pages:
+        print(f"No saved pages found in {directory}, run with --record first")
+        return
+
+    backends = available_backends()
+    missing = [name for name in PARSER_BACKENDS if name not in backends]
+    if missing:
+        print(f"Skipping backends that are not installed: {', '.join(missing)}")
+
+    results = {}
+    outputs = {}
+    for backend in backends:
+        # Tree building alone, then extraction with the selector cascades and the single-pass engine
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            for url, content in pages:
+                make_soup(content, backend)
+        rates = [len(pages) * ROUNDS / (time.perf_counter() - start)]
+
+        for single_pass in (False, True):
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                outputs[backend, single_pass] = [parse_product_page(content, url, backend, single_pass)
+                                                 for url, content in pages]
+            rates.append(len(pages) * ROUNDS / (time.perf_counter() - start))
+        results[backend] = rates
+
+    print(f"\nParser Benchmark ({len(pages)} pages x {ROUNDS} rounds, pages/sec):")
+    for backend, (parse_rate, cascade_rate, single_pass_rate) in sorted(results.items(), key=lambda item: -item[1][2]):
+        print(f"- {backend}: {parse_rate:.1f} parse only, {cascade_rate:.1f} with selector cascades, "
+              f"{single_pass_rate:.1f} with single-pass extraction")
+
+    # Every combination must produce the same fields as html.parser with the selector cascades
+    baseline = outputs['html.parser', False]
+    for (backend, single_pass), products in outputs.items():
+        if (backend, single_pass) == ('html.parser', False):
+            continue
+        differences = 0
+        for expected, actual in zip(baseline, products):
+            for field in expected:
+                if expected[field] != actual[field]:
+                    differences += 1
+                    print(f"  {backend} differs on {field} for {expected['product_url']}")
+        engine = 'single-pass' if single_pass else 'selector cascades'
+        print(f"- {backend} / {engine}: {'identical fields' if not differences else f'{differences} field differences'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then left out
+    resource = None
+
+from ticimax_scraper.corpus import load_corpus, record_pages, replay_session
+from ticimax_scraper.crawler import CategoryCrawler
+from ticimax_scraper.fetch_engine import HostRateLimiter
+
+# Website URL
+base_url = "https://www.bbeox.com"
+
+# Folder with saved product and category pages, shared with benchmark_parsers.py
+pages_dir = "benchmark_pages"
+
+# Folder the JSON results are written to, one file per run
+results_dir = "benchmark_results"
+
+# Every engine goes through the whole corpus this many times
+ROUNDS = 3
+
+# How many listing pages linked from the main page are saved with --record
+CATEGORY_SAMPLE_SIZE = 5
+
+# A drop in pages/sec (or rise in p99 latency) larger than this is reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+def unpaced(module):
+    """Lift a scraper's request pacing; replayed pages need no politeness delay"""
+    limiter = getattr(module, 'rate_limiter', None)
+    if limiter is not None and hasattr(limiter, 'initial_rate'):
+        limiter.initial_rate = limiter.max_rate = 1_000_000
+
+def final_engine(structured=True, single_pass=True, backend='lxml'):
+    import final_scraper
+    unpaced(final_scraper)
+    final_scraper.USE_STRUCTURED_DATA = structured
+    final_scraper.SINGLE_PASS_EXTRACTION = single_pass
+    final_scraper.PARSER_BACKEND = backend
+    return final_scraper.session, final_scraper.get_product_details
+
+def advanced_engine():
+    import advanced_scraper
+    unpaced(advanced_scraper)
+    return advanced_scraper.session, advanced_scraper.extract_product_details
+
+def scrape_bbeox_engine():
+    import scrape_bbeox
+    unpaced(scrape_bbeox)
+    return scrape_bbeox.session, scrape_bbeox.extract_product_info
+
+def crawler_engine():
+    import requests
+    session = requests.Session()
+    limiter = HostRateLimiter(1_000_000)
+
+    def crawl_page(url):
+        # max_pages=1 keeps the crawl on the page itself
+        crawler = CategoryCrawler(session, base_url, max_workers=1, limiter=limiter, max_pages=1)
+        return list(crawler.crawl(seeds=[url]))
+    return session, crawl_page
+
+# name -> (page kind it runs on, setup returning (session, extract function))
+ENGINES = {
+    'final_scraper': ('product', final_engine),
+    'final_scraper.dom_single_pass': ('product', lambda: final_engine(structured=False)),
+    'final_scraper.dom_cascades': ('product', lambda: final_engine(structured=False, single_pass=False, backend='html.parser')),
+    'advanced_scraper': ('product', advanced_engine),
+    'scrape_bbeox': ('product', scrape_bbeox_engine),
+    'category_crawler': ('category', crawler_engine),
+}
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_engine(name, directory):
+    """Time one engine over the corpus; runs in its own process so peak RSS is per engine"""
+    kind, setup = ENGINES[name]
+    pages = load_corpus(directory, base_url)
+    session, extract = setup()
+    replay_session(session, pages)
+    urls = [url for url, page_kind, _ in pages if page_kind == kind]
+
+    latencies = []
+    failures = 0
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # Untimed warm-up pass so lazy imports and first-call setup do not land in the latencies
+        for url in urls:
+            extract(url)
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            for url in urls:
+                start = time.perf_counter()
+                if not extract(url):
+                    failures += 1
+                latencies.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'page_kind': kind,
+        'pages': len(urls),
+        'pages_per_sec': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'peak_rss_mb': peak_rss_mb(),
+        'failures': failures // ROUNDS,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+def sample_category_urls(session):
+    """Listing pages linked from the main page, for recording"""
+    crawler = CategoryCrawler(session, base_url)
+    response = session.get(base_url)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.content, 'html.parser')
+    urls = []
+    for link in soup.find_all('a', href=True):
+        url = urljoin(base_url, link['href'])
+        if url.startswith(base_url) and crawler.is_listing(url) and url not in urls:
+            urls.append(url)
+    return urls[:CATEGORY_SAMPLE_SIZE]
+
+def compare(previous, current):
+    """Print the change per engine against an earlier results file; returns the number of regressions"""
+    print(f"\nCompared with {previous.get('commit', 'unknown')} ({previous.get('created', '')}):")
+    regressions = 0
+    for name, result in current['engines'].items():
+        before = previous.get('engines', {}).get(name)
+        if not before or not before.get('pages_per_sec') or not before.get('p99_ms'):
+            print(f"- {name}: no earlier result")
+            continue
+        speed = result['pages_per_sec'] / before['pages_per_sec'] - 1
+        tail = result['p99_ms'] / before['p99_ms'] - 1
+        regressed = speed < -REGRESSION_THRESHOLD or tail > REGRESSION_THRESHOLD
+        regressions += regressed
+        print(f"- {name}: {speed * 100:+.1f}% pages/sec, {tail * 100:+.1f}% p99 latency"
+              f"{'  <-- REGRESSION' if regressed else ''}")
+    return regressions
+
+def main():
+    args = sys.argv[1:]
+    previous_file = None
+    if '--compare' in args:
+        position = args.index('--compare')
+        previous_file = args[position + 1] if position + 1 < len(args) else None
+        del args[position:position + 2]
+    directory = next((arg for arg in args if not arg.startswith('--')), pages_dir)
+
+    if '--record' in args:
+        import final_scraper
+        record_pages(final_scraper.session, final_scraper.get_sample_products(), directory)
+        try:
+            record_pages(final_scraper.session, sample_category_urls(final_scraper.session), directory, kind='category')
+        except Exception as e:
+            print(f"Error recording category pages: {e}")
+
+    if not os.path.isdir(directory) or not load_corpus(directory, base_url):
+        print(f"No saved pages found in {directory}, run with --record first")
+        return
+
+    results = {
+        'commit': git_commit(),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'rounds': ROUNDS,
+        'engines': {},
+    }
+    # A fresh process per engine: no shared caches, and ru_maxrss only covers that engine
+    context = multiprocessing.get_context('spawn')
+    for name in ENGINES:
+        print(f"Benchmarking {name}...")
+        try:
+            with context.Pool(1) as pool:
+                results['engines'][name] = pool.apply(run_engine, (name, directory))
+        except Exception as e:
+            print(f"Error benchmarking {name}: {e}")
+
+    print(f"\nExtraction Benchmark ({ROUNDS} rounds, commit {results['commit']}):")
+    for name, result in results['engines'].items():
+        rss = f"{result['peak_rss_mb']:.1f} MB" if result['peak_rss_mb'] is not None else 'n/a'
+        print(f"- {name}: {result['pages_per_sec']:.1f} pages/sec over {result['pages']} {result['page_kind']} pages, "
+              f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, peak RSS {rss}, "
+              f"{result['failures']} failed")
+
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    output = os.path.join(results_dir, f"{stamp}-{results['commit']}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if previous_file:
+        with open(previous_file, encoding='utf-8') as f:
+            regressions = compare(json.load(f), results)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
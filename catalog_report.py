@@ -0,0 +1,47 @@
+import datetime
+import os
+import sqlite3
+import sys
+from ticimax_scraper.sqlite_store import price_changes_since, price_trend
+
+# Catalog database written by final_scraper.py (SQLITE_DB)
+database = 'bbeox_catalog.db'
+
+def print_changes(conn, since):
+    """Print every product that is new or changed price since `since`"""
+    changes = price_changes_since(conn, since)
+    print(f"{len(changes)} price changes since {since}:")
+    for url, name, old_price, new_price, recorded_at in changes:
+        if old_price is None:
+            print(f"- {name}: new at {new_price} ({url})")
+        else:
+            print(f"- {name}: {old_price} -> {new_price} ({url})")
+
+def print_trend(conn, url):
+    """Print the price history of one product"""
+    trend = price_trend(conn, url)
+    if not trend:
+        print(f"No price history for {url}")
+        return
+    print(f"Price history of {url}:")
+    for recorded_at, price, _ in trend:
+        print(f"- {recorded_at}: {price}")
+
+def main():
+    args = sys.argv[1:]
+    if not os.path.exists(database):
+        print(f"No catalog database found at {database}, set SQLITE_DB in final_scraper.py and run it first")
+        return
+    conn = sqlite3.connect(database)
+    try:
+        if args and args[0].startswith('http'):
+            print_trend(conn, args[0])
+        else:
+            # Default: what changed today (UTC)
+            since = args[0] if args else datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+            print_changes(conn, since)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
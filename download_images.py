@@ -0,0 +1,56 @@
+import csv
+import sys
+from ticimax_scraper.image_blocklist import BLOCKLIST_FILE, ImageBlocklist
+from ticimax_scraper.images import ImageDownloader
+from ticimax_scraper.incremental import row_to_product
+from ticimax_scraper.ticimax_cdn import canonical_images
+from ticimax_scraper.transport import connection_stats
+
+# Product CSV written by final_scraper.py - pass another file on the command line to override
+input_file = 'bbeox_all_products.csv'
+
+# Images are stored here once per distinct content, with index.jsonl mapping URLs to files
+IMAGES_DIR = 'product_images'
+
+# Size of the Ticimax CDN images to download: 'thumb', 'kucuk', 'orta', 'buyuk', 'full',
+# or None for the largest one listed in the CSV
+IMAGE_VARIANT = None
+
+# MAX_WORKERS threads share a per-host budget of REQUESTS_PER_SECOND requests
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 5.0
+
+def load_products(filename):
+    """Read the products back from a scraper CSV"""
+    with open(filename, newline='', encoding='utf-8-sig') as f:
+        return [row_to_product(row) for row in csv.DictReader(f)]
+
+def main():
+    args = sys.argv[1:]
+    filename = args[0] if args else input_file
+    try:
+        products = load_products(filename)
+    except Exception as e:
+        print(f"Error reading {filename}: {e}")
+        return
+
+    if products:
+        # Site-chrome images learned by final_scraper.py are never fetched
+        blocklist = ImageBlocklist(products[0]['product_url'], BLOCKLIST_FILE)
+        products = [blocklist.filter(product) for product in products]
+        if blocklist.dropped:
+            print(f"Skipping {blocklist.dropped} blocklisted site-chrome image links")
+        listed = sum(len(product['images']) for product in products)
+        products = [dict(product, images=canonical_images(product['images'], IMAGE_VARIANT)) for product in products]
+        folded = listed - sum(len(product['images']) for product in products)
+        if folded:
+            print(f"Folded {folded} case or size variants of the same CDN images")
+
+    print(f"Downloading images of {len(products)} products into {IMAGES_DIR}")
+    downloader = ImageDownloader(IMAGES_DIR, max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND)
+    downloader.download_all(products)
+    downloader.report()
+    connection_stats.report()
+
+if __name__ == "__main__":
+    main()
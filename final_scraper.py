@@ -1,359 +1,244 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import re
-from urllib.parse import urljoin
+import os
+import sys
+import datetime
+import contextlib
+import functools
+import itertools
+from ticimax_scraper.fetch_engine import HostRateLimiter, create_session, fetch_content, fetch_stream
+from ticimax_scraper.http_cache import ResponseCache
+from ticimax_scraper.transport import ThreadLocalSession, connection_stats
+from ticimax_scraper.pipeline import run_pipeline
+from ticimax_scraper.rate_control import AdaptiveRateLimiter
+from ticimax_scraper.crawler import CategoryCrawler
+from ticimax_scraper.extractors import parse_page, extract_product
+from ticimax_scraper.browser_pool import DriverPool
+from ticimax_scraper.hybrid import EscalationStats, missing_fields, merge_rendered
+from ticimax_scraper.image_blocklist import ImageBlocklist
+from ticimax_scraper.ticimax_cdn import canonical_images
+from ticimax_scraper.sitemap import discover_product_urls
+from ticimax_scraper.incremental import CSVIndex, select_urls, merge_incremental, write_change_report
+from ticimax_scraper.stream_writer import StreamingCSVWriter, completed_urls, sort_csv_by_url
+from ticimax_scraper.output_backends import COLUMNAR_FORMATS, check_output, open_writer, output_format, sort_output, unsorted_name
+from ticimax_scraper.sqlite_store import SQLiteStore
+from ticimax_scraper.metrics import instrument_session, registry
+from ticimax_scraper.profiling import ExtractionProfiler
 
 # Website URL
 base_url = "https://www.bbeox.com"
 
+# HTML parser used for product pages: 'lxml' (fast, C based), 'html.parser' or 'html5lib' (browser-exact, slowest)
+PARSER_BACKEND = 'lxml'
+
+# Collect every selector match in one walk over the page instead of one walk per selector
+SINGLE_PASS_EXTRACTION = True
+
+# Read JSON-LD / inline Ticimax product JSON first; the DOM is only parsed when
+# one of STRUCTURED_REQUIRED_FIELDS is missing from it
+USE_STRUCTURED_DATA = True
+STRUCTURED_REQUIRED_FIELDS = ['name', 'price', 'description', 'images', 'sizes']
+
+# Concurrency settings for product fetching
+# MAX_WORKERS threads share a per-host budget of REQUESTS_PER_SECOND requests
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 1.0
+
+# Adaptive rate control: starting from REQUESTS_PER_SECOND the rate and concurrency per
+# host rise while responses stay fast (up to MAX_REQUESTS_PER_SECOND) and halve on
+# 429/503, timeouts or slow responses. Failed requests are retried up to MAX_RETRIES
+# times with jittered backoff (honoring Retry-After); a host failing repeatedly trips
+# a circuit breaker that holds its requests back for a while.
+ADAPTIVE_RATE = True
+MAX_REQUESTS_PER_SECOND = 4.0
+REQUEST_TIMEOUT = (10, 30)  # Connect and read timeout in seconds, also used without ADAPTIVE_RATE
+MAX_RETRIES = 3
+
+# Product URLs that could not be fetched or parsed, written after the run
+FAILED_URLS_FILE = 'bbeox_failed_urls.txt'
+
+# Staged pipeline: MAX_WORKERS I/O threads fetch pages, PARSE_PROCESSES processes
+# extract them and a single writer stage collects the products
+USE_PIPELINE = True
+PARSE_PROCESSES = os.cpu_count()
+
+# On-disk HTTP cache; unchanged pages are revalidated with conditional requests
+USE_HTTP_CACHE = True
+HTTP_CACHE_DIR = '.http_cache'
+HTTP_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+# Incremental mode: only fetch new URLs plus a rotating slice of known ones,
+# and merge them into the previous OUTPUT_FILE
+INCREMENTAL = False
+REFRESH_FRACTION = 0.1  # Share of known products re-checked on each run
+# When discovery finds fewer URLs than this share of the previous output (a broken sitemap
+# or crawl), no product is treated as removed and the previous catalog is kept
+MIN_DISCOVERED_FRACTION = 0.5
+OUTPUT_FILE = 'bbeox_all_products.csv'
+
+# Rows are appended as products arrive, flushed every WRITE_BATCH_SIZE rows and
+# fsynced every CHECKPOINT_EVERY rows. With RESUME, a run that was interrupted
+# continues from its journal instead of starting over.
+WRITE_BATCH_SIZE = 50
+CHECKPOINT_EVERY = 500
+RESUME = True
+
+# Extra outputs, picked by extension: '.jsonl' (one JSON object per product) or '.parquet' /
+# '.arrow' (list columns and a numeric price_amount, needs pyarrow). Products are streamed
+# to them while the crawl runs, COLUMNAR_ROW_GROUP products per row group, and put into
+# the order of the sorted OUTPUT_FILE at the end.
+EXTRA_OUTPUTS = []  # e.g. ['bbeox_all_products.jsonl', 'bbeox_all_products.parquet']
+COLUMNAR_ROW_GROUP = 1000
+
+# SQLite catalog kept across runs: products are upserted by URL and a price history
+# row is added whenever a price changes (see catalog_report.py). None disables it.
+SQLITE_DB = None  # e.g. 'bbeox_catalog.db'
+
+# Discover products from robots.txt / sitemaps before falling back to the homepage crawl
+USE_SITEMAP = True
+
+# Category crawler used when there are no sitemaps
+CRAWL_WORKERS = 2
+MAX_CATEGORY_PAGES = None  # Set a number to cap how many listing pages are visited
+
+# Connection pools: every host keeps up to POOL_SIZE kept-alive connections, so the fetch
+# and crawl threads reuse them instead of paying a TCP + TLS handshake per page. Hosts in
+# HOST_POOL_SIZES get a pool of their own with that many. USE_HTTP2 sends requests through
+# httpx over HTTP/2 (pip install 'httpx[http2]'); PER_THREAD_SESSIONS gives every thread its
+# own session. Responses are brotli compressed when brotli is installed, gzip otherwise.
+POOL_SIZE = MAX_WORKERS + CRAWL_WORKERS
+HOST_POOL_SIZES = {}  # e.g. {'static.ticimax.cloud': 16}
+USE_HTTP2 = False
+PER_THREAD_SESSIONS = False
+
+# Hybrid mode: pages whose static extraction fails the completeness rule of one of
+# HYBRID_REQUIRED_FIELDS are re-rendered on BROWSER_WORKERS headless browsers
+# (needs selenium) and the missing fields are filled from the rendered page
+HYBRID_MODE = False
+HYBRID_REQUIRED_FIELDS = ['price', 'sizes']
+BROWSER_WORKERS = 2
+
+# Drop site-chrome images (header/footer banners) that recur on most product pages.
+# The first IMAGE_BLOCKLIST_WARMUP products are held back until it is clear which
+# images are on at least IMAGE_BLOCKLIST_THRESHOLD of the pages; the blocklist is
+# saved to IMAGE_BLOCKLIST_FILE and reused on the next run
+FILTER_CHROME_IMAGES = True
+IMAGE_BLOCKLIST_FILE = '.image_blocklist.json'
+IMAGE_BLOCKLIST_THRESHOLD = 0.5
+IMAGE_BLOCKLIST_WARMUP = 20
+
+# Fold case variants and thumb/full copies of the same Ticimax CDN image into one URL.
+# IMAGE_VARIANT None keeps the largest size on the page; 'thumb', 'kucuk', 'orta',
+# 'buyuk' or 'full' rewrites every image to that size
+CANONICAL_IMAGES = True
+IMAGE_VARIANT = None
+
+# Record HTTP latency / size / status histograms and parse, extract and write timings,
+# written at the end of the run as Prometheus text and a JSON summary
+COLLECT_METRICS = True
+METRICS_FILE = 'bbeox_metrics.prom'
+METRICS_JSON_FILE = 'bbeox_metrics.json'
+
+# --profile: profile parsing and every field extractor on the first PROFILE_PAGES
+# product pages and save the call stacks for a flamegraph to PROFILE_OUTPUT
+PROFILE_PAGES = 20
+PROFILE_OUTPUT = 'bbeox_profile.folded'
+
+# Shared by discovery and product fetching so both stay inside one per-host budget
+if ADAPTIVE_RATE:
+    rate_limiter = AdaptiveRateLimiter(REQUESTS_PER_SECOND, max_rate=MAX_REQUESTS_PER_SECOND, max_concurrency=MAX_WORKERS,
+                                       timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES)
+else:
+    rate_limiter = HostRateLimiter(REQUESTS_PER_SECOND)
+
+# One cache for every session
+http_cache = ResponseCache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES) if USE_HTTP_CACHE else None
+
+def build_session():
+    """Create a session that revalidates through the cache, records metrics and is rate controlled"""
+    new_session, _ = create_session(cache=http_cache, pool_size=POOL_SIZE, host_pool_sizes=HOST_POOL_SIZES,
+                                    http2=USE_HTTP2)
+    instrument_session(new_session)
+    if ADAPTIVE_RATE:
+        # Installed after the metrics so every retry attempt is measured on its own
+        rate_limiter.install(new_session)
+    return new_session
+
 # Create a session
-session = requests.Session()
-session.headers.update({
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-})
+session = ThreadLocalSession(build_session) if PER_THREAD_SESSIONS else build_session()
+registry.enabled = COLLECT_METRICS
 
-def get_all_product_urls():
-    """Get all product URLs from the main page and category pages"""
-    product_urls = set()
+# Sitemap lastmod per product URL, filled in by get_all_product_urls
+sitemap_lastmod = {}
+
+def iter_product_urls():
+    """Yield product URLs from the sitemaps, or stream them from the category crawler"""
+    if USE_SITEMAP:
+        sitemap_products = discover_product_urls(session, base_url)
+        if sitemap_products:
+            print(f"Found {len(sitemap_products)} product URLs in sitemaps")
+            sitemap_lastmod.update(sitemap_products)
+            yield from sitemap_products
+            return
+        print("No product URLs found in sitemaps, crawling categories instead")
     
-    try:
-        # Get main page
-        response = session.get(base_url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find all links that might be product links
-        links = soup.find_all('a', href=True)
-        
-        # Pattern to identify product URLs
-        product_patterns = [
-            r'/[^/]+-[^/]+-[^/]+$',  # URLs ending with three parts separated by dashes
-            r'/urun/',
-            r'/product/',
-            r'/p/'
-        ]
-        
-        for link in links:
-            href = str(link['href'])  # Convert to string
-            # Check if it's a relative URL starting with /
-            if href.startswith('/'):
-                # Check if it matches product patterns
-                for pattern in product_patterns:
-                    if re.search(pattern, href) and not href.endswith(('.jpg', '.png', '.gif', '.css', '.js')):
-                        full_url = urljoin(base_url, href)
-                        product_urls.add(full_url)
-        
-        print(f"Found {len(product_urls)} potential product URLs from main page")
-        
-        # Also check some category pages if needed
-        category_selectors = [
-            'a[href*="kategori"]',
-            'a[href*="category"]',
-            'a[href*="elbise"]',
-            'a[href*="bluz"]',
-            'a[href*="takim"]'
-        ]
-        
-        for selector in category_selectors:
-            category_links = soup.select(selector)
-            for cat_link in category_links[:3]:  # Limit to first 3 categories
-                try:
-                    cat_href = str(cat_link['href'])  # Convert to string
-                    if cat_href.startswith('/'):
-                        cat_url = urljoin(base_url, cat_href)
-                        print(f"Checking category: {cat_url}")
-                        cat_response = session.get(cat_url)
-                        cat_response.raise_for_status()
-                        cat_soup = BeautifulSoup(cat_response.content, 'html.parser')
-                        
-                        cat_links = cat_soup.find_all('a', href=True)
-                        for link in cat_links:
-                            href = str(link['href'])  # Convert to string
-                            for pattern in product_patterns:
-                                if re.search(pattern, href) and not href.endswith(('.jpg', '.png', '.gif', '.css', '.js')):
-                                    full_url = urljoin(base_url, href)
-                                    product_urls.add(full_url)
-                        time.sleep(1)  # Be respectful
-                except Exception as e:
-                    print(f"Error checking category: {e}")
-                    continue
-        
-        return list(product_urls)
-    except Exception as e:
-        print(f"Error getting product URLs: {e}")
-        return list(product_urls)
+    # Start from the main page and follow category and pagination links
+    crawler = CategoryCrawler(session, base_url, max_workers=CRAWL_WORKERS,
+                              limiter=rate_limiter, max_pages=MAX_CATEGORY_PAGES)
+    yield from crawler.crawl()
+
+def get_all_product_urls():
+    """Get all product URLs from the sitemaps, or from the main page and category pages"""
+    return list(iter_product_urls())
 
 def get_product_details(product_url):
     """Extract detailed product information with more specific selectors"""
     try:
-        response = session.get(product_url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Initialize product info
-        product_info = {
-            'product_url': product_url,
-            'name': '',
-            'price': '',
-            'description': '',
-            'images': [],
-            'variations': [],
-            'sizes': []
-        }
-        
-        # Extract product name - more specific approach
-        # Look for the product name in the breadcrumb or title
-        title_elem = soup.find('title')
-        if title_elem:
-            title_text = title_elem.get_text(strip=True)
-            # Remove common suffixes
-            title_text = re.sub(r'\s*\|.*$', '', title_text)
-            title_text = re.sub(r'\s*-.*Bbeox.*$', '', title_text)
-            product_info['name'] = title_text.strip()
-        
-        # If we couldn't get name from title, try other methods
-        if not product_info['name']:
-            name_selectors = [
-                'h1.product-title',
-                'h1.product_name',
-                '.product-title',
-                '.product-name',
-                'h1',
-                '[class*="product"] h1',
-                '[class*="title"]'
-            ]
-            
-            for selector in name_selectors:
-                name_elem = soup.select_one(selector)
-                if name_elem and name_elem.get_text(strip=True):
-                    product_info['name'] = name_elem.get_text(strip=True)
-                    break
-        
-        # Extract price - look for specific patterns
-        # Try to find price in text content
-        page_text = soup.get_text()
-        price_patterns = [
-            r'Fiyat\s*:?\s*[₺$€£¥]?\s*([\d.,]+)',
-            r'₺\s*([\d.,]+)',
-            r'[\d.,]+\s*₺',
-            r'Price\s*:?\s*[₺$€£¥]?\s*([\d.,]+)'
-        ]
-        
-        for pattern in price_patterns:
-            matches = re.findall(pattern, page_text)
-            if matches:
-                # Take the first match that looks like a reasonable price
-                for match in matches:
-                    price_value = re.sub(r'[^\d,.]', '', match)
-                    # Handle Turkish number format (1.000,00)
-                    if '.' in price_value and ',' in price_value:
-                        # If both . and , exist, assume . is thousands separator
-                        price_value = price_value.replace('.', '').replace(',', '.')
-                    elif ',' in price_value:
-                        # If only comma, assume it's decimal separator
-                        price_value = price_value.replace(',', '.')
-                    
-                    try:
-                        if float(price_value) > 10:
-                            product_info['price'] = f"₺{match}"
-                            break
-                    except ValueError:
-                        continue
-                if product_info['price']:
-                    break
-        
-        # If still no price, try specific elements
-        if not product_info['price']:
-            price_selectors = [
-                '.price',
-                '.product-price',
-                '.price-current',
-                '[class*="price"]',
-                '.price-wrapper',
-                '.urunFiyat',
-                '.product-info .price'
-            ]
-            
-            for selector in price_selectors:
-                price_elem = soup.select_one(selector)
-                if price_elem and price_elem.get_text(strip=True):
-                    price_text = price_elem.get_text(strip=True)
-                    # Clean up price text
-                    price_text = re.sub(r'[^\d,₺$€£¥.]', '', price_text)
-                    if price_text:
-                        product_info['price'] = price_text
-                        break
-        
-        # Extract description - look for product details
-        desc_selectors = [
-            '.product-description',
-            '.description',
-            '[class*="description"]',
-            '.product-details',
-            '.product-info .description',
-            '.urunAciklama',
-            '.product-detail'
-        ]
-        
-        for selector in desc_selectors:
-            desc_elem = soup.select_one(selector)
-            if desc_elem and desc_elem.get_text(strip=True):
-                desc_text = desc_elem.get_text(strip=True)
-                if len(desc_text) > 20:  # Only consider substantial descriptions
-                    product_info['description'] = desc_text
-                    break
-        
-        # If no description found, try to get text from the main content area
-        if not product_info['description']:
-            content_area = soup.select_one('.content, .main-content, .product-content')
-            if content_area:
-                desc_text = content_area.get_text(strip=True)
-                if len(desc_text) > 50:
-                    product_info['description'] = desc_text
-        
-        # Extract images - try to get actual product images
-        # Look for data attributes that might contain real image URLs
-        img_elements = soup.find_all('img')
-        for img in img_elements:
-            # Try multiple attributes
-            src_attrs = ['data-src', 'data-lazy', 'data-original', 'src']
-            for attr in src_attrs:
-                src = img.get(attr)
-                if src:
-                    src_str = str(src)  # Convert to string
-                    if 'blank' not in src_str.lower() and 'placeholder' not in src_str.lower():
-                        # Check if it looks like a real product image
-                        if any(keyword in src_str.lower() for keyword in ['product', 'urun', 'upload', 'image']):
-                            full_img_url = urljoin(product_url, src_str)
-                            if full_img_url not in product_info['images']:
-                                product_info['images'].append(full_img_url)
-                                break  # Move to next image element
-        
-        # Extract sizes - look for size options
-        # Updated to better detect size information from the specific HTML structure
-        size_selectors = [
-            'select[name*="size"]',
-            'select[name*="beden"]',
-            '.size-options',
-            '.sizes',
-            '[class*="size"]',
-            '.size-selector',
-            '[data-option*="size"]',
-            '.bedenSecenekleri',
-            '.beden',
-            '[class*="beden"]',
-            '#divUrunEkSecenek'  # Specific selector for the HTML structure you provided
-        ]
-        
-        for selector in size_selectors:
-            size_elements = soup.select(selector)
-            for elem in size_elements:
-                # Special handling for the specific HTML structure you provided
-                if elem.get('id') == 'divUrunEkSecenek':
-                    # Look for "Beden" label
-                    beden_labels = elem.find_all(string=re.compile(r'Beden', re.I))
-                    for label in beden_labels:
-                        # Find the parent element and then look for size boxes
-                        parent = label.parent
-                        if parent:
-                            # Look for size_box elements in the same container
-                            size_boxes = parent.find_next_sibling().find_all(class_='size_box') if parent.find_next_sibling() else []
-                            for box in size_boxes:
-                                size_text = box.get_text(strip=True)
-                                # Remove "GELİNCE HABERİN OLSUN" text if present
-                                size_text = re.sub(r'GELİNCE HABERİN.*', '', size_text).strip()
-                                if size_text and size_text not in ['Seçiniz', 'Select', 'Choose', ''] and size_text not in product_info['sizes']:
-                                    # Filter to only include valid size values
-                                    size_keywords = ['xs', 's', 'm', 'l', 'xl', 'xxl', '32', '34', '36', '38', '40', '42', '44', '46', '48', '50', '52', '54', '56', '58', '60']
-                                    if any(keyword in size_text.lower() for keyword in size_keywords) or re.match(r'^\d+$', size_text):
-                                        product_info['sizes'].append(size_text)
-                elif elem.name == 'select':
-                    options = elem.find_all('option')
-                    for option in options:
-                        value = option.get_text(strip=True)
-                        if value and value not in ['Seçiniz', 'Select', 'Choose', ''] and value not in product_info['sizes']:
-                            # Filter out non-size values
-                            size_keywords = ['xs', 's', 'm', 'l', 'xl', 'xxl', '32', '34', '36', '38', '40', '42', '44', '46', '48', '50', '52', '54', '56', '58', '60']
-                            if any(keyword in value.lower() for keyword in size_keywords) or re.match(r'^\d+$', value):
-                                product_info['sizes'].append(value)
-                else:
-                    # For divs with size options
-                    buttons = elem.find_all(['button', 'a', 'div', 'span'], class_=lambda x: x and 'size' in x.lower())
-                    for button in buttons:
-                        text = button.get_text(strip=True)
-                        # Remove "GELİNCE HABERİN OLSUN" text if present
-                        text = re.sub(r'GELİNCE HABERİN.*', '', text).strip()
-                        if text and text not in ['Seçiniz', 'Select', 'Choose', ''] and text not in product_info['sizes']:
-                            # Filter out non-size values
-                            size_keywords = ['xs', 's', 'm', 'l', 'xl', 'xxl', '32', '34', '36', '38', '40', '42', '44', '46', '48', '50', '52', '54', '56', '58', '60']
-                            if any(keyword in text.lower() for keyword in size_keywords) or re.match(r'^\d+$', text):
-                                product_info['sizes'].append(text)
-        
-        # If no sizes found, try to extract from text content
-        if not product_info['sizes']:
-            # Look for size information in the page text
-            size_patterns = [
-                r'[Bb]eden\s*:\s*([A-Z0-9]+)',
-                r'[Ss]ize\s*:\s*([A-Z0-9]+)',
-                r'(XS|S|M|L|XL|XXL|32|34|36|38|40|42|44|46|48|50|52|54|56|58|60)'
-            ]
-            
-            for pattern in size_patterns:
-                matches = re.findall(pattern, page_text)
-                for match in matches:
-                    if match and match not in product_info['sizes']:
-                        product_info['sizes'].append(match)
-        
-        # Extract variations (color, style, etc.)
-        variation_selectors = [
-            'select[name*="color"]',
-            'select[name*="renk"]',
-            '.color-options',
-            '.variations',
-            '[class*="variation"]',
-            '.color-selector',
-            '[data-option*="color"]',
-            '.renkSecenekleri'
-        ]
-        
-        for selector in variation_selectors:
-            var_elements = soup.select(selector)
-            for elem in var_elements:
-                # Special handling for the specific HTML structure you provided
-                if elem.get('id') == 'divUrunEkSecenek':
-                    # Look for "Renk" label
-                    renk_labels = elem.find_all(string=re.compile(r'Renk', re.I))
-                    for label in renk_labels:
-                        # Find the parent element and then look for color boxes
-                        parent = label.parent
-                        if parent:
-                            # Look for size_box elements in the same container
-                            color_boxes = parent.find_next_sibling().find_all(class_='size_box') if parent.find_next_sibling() else []
-                            for box in color_boxes:
-                                color_text = box.get_text(strip=True)
-                                if color_text and color_text not in ['Seçiniz', 'Select', 'Choose', ''] and color_text not in product_info['variations']:
-                                    product_info['variations'].append(color_text)
-                elif elem.name == 'select':
-                    options = elem.find_all('option')
-                    for option in options:
-                        value = option.get_text(strip=True)
-                        if value and value not in ['Seçiniz', 'Select', 'Choose', ''] and value not in product_info['variations']:
-                            product_info['variations'].append(value)
-                else:
-                    # For divs with variation options
-                    buttons = elem.find_all(['button', 'a', 'div', 'span'])
-                    for button in buttons:
-                        text = button.get_text(strip=True)
-                        if text and text not in ['Seçiniz', 'Select', 'Choose', ''] and text not in product_info['variations']:
-                            product_info['variations'].append(text)
-        
-        return product_info
+        return parse_product_page(fetch_content(session, product_url, REQUEST_TIMEOUT), product_url)
     except Exception as e:
         print(f"Error extracting product details from {product_url}: {e}")
         return None
 
+def fetch_page(product_url):
+    """Download a product page and return its raw bytes, or None on error"""
+    try:
+        return fetch_content(session, product_url, REQUEST_TIMEOUT)
+    except Exception as e:
+        print(f"Error fetching {product_url}: {e}")
+        return None
+
+def parse_product_page(content, product_url, backend=None, single_pass=None, structured=None):
+    """Extract product information from an already downloaded product page"""
+    if single_pass is None:
+        single_pass = SINGLE_PASS_EXTRACTION
+    if structured is None:
+        structured = USE_STRUCTURED_DATA
+    page = parse_page(product_url, content, backend or PARSER_BACKEND, single_pass)
+    return extract_product(page, 'final', structured=structured, required=STRUCTURED_REQUIRED_FIELDS)
+
+def render_incomplete(products, stats):
+    """Re-render statically incomplete products in a browser pool and merge in what it finds"""
+    try:
+        from selenium_scraper import setup_driver, render_page_source
+    except ImportError as e:
+        print(f"Selenium is not available ({e}), keeping the static results of {len(products)} incomplete products")
+        return products
+    
+    def render_product_page(driver, product_url):
+        return parse_product_page(render_page_source(driver, product_url), product_url)
+    
+    print(f"Rendering {len(products)} incomplete products with {BROWSER_WORKERS} browsers...")
+    pool = DriverPool(setup_driver, size=BROWSER_WORKERS, limiter=rate_limiter)
+    rendered = pool.run([product['product_url'] for product in products], render_product_page)
+    pool.report()
+    
+    merged = []
+    for product, rendered_product in zip(products, rendered):
+        if rendered_product:
+            product = merge_rendered(product, rendered_product)
+            if not missing_fields(product, HYBRID_REQUIRED_FIELDS):
+                stats.completed += 1
+        merged.append(product)
+    return merged
+
 def get_sample_products():
     """Get a sample of product URLs for testing"""
     # These are some actual product URLs we found earlier
@@ -371,67 +256,222 @@ def get_sample_products():
     ]
     return sample_urls
 
-def save_to_csv(products_data, filename='bbeox_all_products.csv'):
-    """Save product data to CSV file"""
-    # Flatten the data for CSV
-    csv_data = []
-    for product in products_data:
-        if product:
-            # Create a row for each product
-            row = {
-                'Product URL': product.get('product_url', ''),
-                'Product Name': product.get('name', ''),
-                'Price': product.get('price', ''),
-                'Description': product.get('description', ''),
-                'Images': '; '.join(product.get('images', [])),
-                'Variations': '; '.join(product.get('variations', [])),
-                'Sizes': '; '.join(product.get('sizes', []))
-            }
-            csv_data.append(row)
+def print_product(product):
+    """Print one line of the scraping summary"""
+    print(f"- {product.get('name', 'Unknown')}: {product.get('price', 'No price')}")
+    if product.get('sizes'):
+        print(f"  Sizes: {', '.join(product.get('sizes', []))}")
+    if product.get('variations'):
+        print(f"  Variations: {', '.join(product.get('variations', []))}")
+
+def profile_extraction(limit=PROFILE_PAGES):
+    """Download a few product pages and report where extraction spends its time and memory"""
+    print(f"Profiling extraction on up to {limit} product pages...")
+    pages = []
+    for product_url in itertools.islice(iter_product_urls(), limit):
+        content = fetch_page(product_url)
+        if content is not None:
+            pages.append((product_url, content))
+    if not pages:
+        print("No product pages could be downloaded")
+        return
     
-    # Create DataFrame and save to CSV
-    df = pd.DataFrame(csv_data)
-    df.to_csv(filename, index=False, encoding='utf-8-sig')
-    print(f"Data saved to {filename}")
-    return filename
+    profiler = ExtractionProfiler()
+    profiler.profile_pages(pages, backend=PARSER_BACKEND, single_pass=SINGLE_PASS_EXTRACTION)
+    profiler.report()
+    profiler.write_folded(PROFILE_OUTPUT)
+    print(f"Flamegraph stacks saved to {PROFILE_OUTPUT} (e.g. flamegraph.pl {PROFILE_OUTPUT} > profile.svg)")
+
+def extra_batch_size(filename):
+    """Products per write of an extra output: a row group for columnar formats"""
+    return COLUMNAR_ROW_GROUP if output_format(filename) in COLUMNAR_FORMATS else WRITE_BATCH_SIZE
 
 def main():
+    args = sys.argv[1:]
+    if '--profile' in args:
+        position = args.index('--profile')
+        limit = args[position + 1] if position + 1 < len(args) else None
+        profile_extraction(int(limit) if limit and limit.isdigit() else PROFILE_PAGES)
+        return
+    
     print("Starting final scraping of bbeox.com...")
+    # An output whose backend is missing would otherwise only fail once the crawl is over
+    for filename in EXTRA_OUTPUTS:
+        check_output(filename)
     
-    # Get ALL product URLs instead of just sample ones
-    print("Getting ALL product URLs...")
-    product_urls = get_all_product_urls()
-    print(f"Found {len(product_urls)} product URLs")
+    previous = None
+    if INCREMENTAL and os.path.exists(OUTPUT_FILE):
+        # Incremental mode needs the full URL list up front to decide what to refresh
+        print("Getting ALL product URLs...")
+        product_urls = sorted(get_all_product_urls())
+        print(f"Found {len(product_urls)} product URLs")
+        
+        previous = CSVIndex(OUTPUT_FILE)
+        # Products whose sitemap lastmod is newer than the previous output are refreshed too
+        previous_run = datetime.datetime.fromtimestamp(os.path.getmtime(OUTPUT_FILE), datetime.timezone.utc)
+        new_urls, refresh_urls = select_urls(product_urls, previous, REFRESH_FRACTION,
+                                             lastmods=sitemap_lastmod, since=previous_run)
+        url_source = sorted(new_urls + refresh_urls)
+        print(f"Incremental mode: {len(new_urls)} new and {len(refresh_urls)} known products to fetch, "
+              f"{len(previous)} products in previous output")
+        discovery_incomplete = not product_urls or len(product_urls) < MIN_DISCOVERED_FRACTION * len(previous)
+        if discovery_incomplete:
+            print(f"Warning: only {len(product_urls)} product URLs found for {len(previous)} previous products, "
+                  f"keeping every previous product instead of reporting them as removed")
+    else:
+        # Fetch products while discovery is still finding more of them
+        print("Getting ALL product URLs and fetching products as they are found...")
+        url_source = iter_product_urls()
     
-    # Limit to a reasonable number to avoid taking too long
-    # Remove this limit if you want to scrape all products
-    # product_urls = product_urls[:50]  # Process first 50 products
+    # Results go to a side file first so a failed run never clobbers the previous output
+    results_file = OUTPUT_FILE + '.partial'
     
-    # Extract product information
-    products_data = []
-    for i, url in enumerate(product_urls):
-        print(f"Processing product {i+1}/{len(product_urls)}: {url}")
-        product_info = get_product_details(url)
-        if product_info:
-            products_data.append(product_info)
-        time.sleep(1)  # Be respectful with requests
+    # Resume an interrupted run: skip every URL its journal says is already written
+    done_urls = completed_urls(results_file) if RESUME else set()
+    if done_urls:
+        print(f"Resuming interrupted run, skipping {len(done_urls)} products already saved to {results_file}")
+        url_source = (url for url in url_source if url not in done_urls)
     
-    # Save to CSV
-    if products_data:
-        filename = save_to_csv(products_data)
-        print(f"Successfully scraped {len(products_data)} products and saved to {filename}")
+    print(f"Fetching with {MAX_WORKERS} workers at up to {REQUESTS_PER_SECOND} requests/sec per host")
+    print("\nScraping Summary:")
+    escalation = EscalationStats()
+    incomplete = []
+    # Product URLs that could not be fetched or parsed
+    failed_products = []
+    blocklist = None
+    warmup = []
+    if FILTER_CHROME_IMAGES:
+        blocklist = ImageBlocklist(base_url, IMAGE_BLOCKLIST_FILE, IMAGE_BLOCKLIST_THRESHOLD, IMAGE_BLOCKLIST_WARMUP)
+    extra_outputs = []
+    catalog = None
+    with contextlib.ExitStack() as outputs:
+        writer = outputs.enter_context(StreamingCSVWriter(results_file, resume=bool(done_urls), batch_size=WRITE_BATCH_SIZE,
+                                                          checkpoint_every=CHECKPOINT_EVERY))
+        if SQLITE_DB:
+            catalog = outputs.enter_context(SQLiteStore(SQLITE_DB, batch_size=WRITE_BATCH_SIZE))
+            extra_outputs.append(catalog)
+        for filename in EXTRA_OUTPUTS:
+            extra_outputs.append(outputs.enter_context(open_writer(unsorted_name(filename),
+                                                                   batch_size=extra_batch_size(filename))))
+        
+        def emit_product(product):
+            if blocklist:
+                product = blocklist.filter(product)
+            with registry.timer('write_seconds', output='csv'):
+                writer.write(product)
+            for extra in extra_outputs:
+                with registry.timer('write_seconds', output=type(extra).__name__):
+                    extra.write(product)
+            print_product(product)
+        
+        def save_product(product):
+            if CANONICAL_IMAGES:
+                product = dict(product, images=canonical_images(product.get('images', []), IMAGE_VARIANT))
+            if blocklist:
+                blocklist.observe(product)
+                if blocklist.warming_up:
+                    # Not enough pages yet to know which images are chrome
+                    warmup.append(product)
+                    return
+                while warmup:
+                    emit_product(warmup.pop(0))
+            emit_product(product)
         
-        # Display summary
-        print("\nScraping Summary:")
-        for product in products_data:
-            if product:
-                print(f"- {product.get('name', 'Unknown')}: {product.get('price', 'No price')}")
-                if product.get('sizes'):
-                    print(f"  Sizes: {', '.join(product.get('sizes', []))}")
-                if product.get('variations'):
-                    print(f"  Variations: {', '.join(product.get('variations', []))}")
+        def write_product(product):
+            if HYBRID_MODE:
+                # Hold back products the static path could not complete for the browser pass
+                missing = missing_fields(product, HYBRID_REQUIRED_FIELDS)
+                escalation.add(missing)
+                if missing:
+                    incomplete.append(product)
+                    return
+            save_product(product)
+        
+        if USE_PIPELINE:
+            # I/O threads fetch, a process pool parses, and the writer stage appends rows
+            # Parse processes start from a fresh import, so settings changed at runtime are passed along
+            parse = functools.partial(parse_product_page, backend=PARSER_BACKEND, single_pass=SINGLE_PASS_EXTRACTION,
+                                      structured=USE_STRUCTURED_DATA)
+            stages = run_pipeline(url_source, fetch_page, parse, write_product,
+                                  fetch_workers=MAX_WORKERS, parse_workers=PARSE_PROCESSES, limiter=rate_limiter)
+            failed_products.extend(stages['fetch'].failed + stages['parse'].failed)
+        else:
+            for product_url, product_info in fetch_stream(url_source, lambda url: (url, get_product_details(url)),
+                                                          max_workers=MAX_WORKERS, limiter=rate_limiter):
+                if product_info:
+                    write_product(product_info)
+                else:
+                    failed_products.append(product_url)
+        
+        if incomplete:
+            for product in render_incomplete(incomplete, escalation):
+                save_product(product)
+        
+        # A run shorter than the warm-up is filtered with the saved blocklist only
+        while warmup:
+            emit_product(warmup.pop(0))
+    scraped = writer.count + len(done_urls)
+    
+    if HYBRID_MODE:
+        escalation.report()
+    
+    if catalog:
+        catalog.report()
+    
+    if blocklist:
+        blocklist.save()
+        blocklist.report()
+    
+    if previous is not None:
+        fresh = CSVIndex(results_file)
+        merged_file = OUTPUT_FILE + '.tmp'
+        with StreamingCSVWriter(merged_file, journal=False) as merged:
+            report = merge_incremental(previous, product_urls, fresh, merged.write, keep_missing=discovery_incomplete)
+        previous.close()
+        fresh.close()
+        os.replace(merged_file, OUTPUT_FILE)
+        os.remove(results_file)
+        write_change_report(report)
+    elif scraped:
+        # Sort so the CSV comes out in the same order on every run
+        sort_csv_by_url(results_file, OUTPUT_FILE)
+        os.remove(results_file)
+    
+    # Reordered like the sorted CSV so every format holds the same products in the same order
+    for filename in EXTRA_OUTPUTS:
+        if scraped:
+            sort_output(unsorted_name(filename), OUTPUT_FILE, filename + '.partial', batch_size=extra_batch_size(filename))
+            os.replace(filename + '.partial', filename)
+            print(f"Data also saved to {filename}")
+        os.remove(unsorted_name(filename))
+    
+    if scraped:
+        print(f"Successfully scraped {scraped} products and saved to {OUTPUT_FILE}")
     else:
         print("No product data was extracted")
+    
+    if failed_products:
+        print(f"{len(failed_products)} products could not be fetched or parsed:")
+        for product_url in failed_products[:10]:
+            print(f"- {product_url}")
+        if len(failed_products) > 10:
+            print(f"- ... and {len(failed_products) - 10} more")
+        with open(FAILED_URLS_FILE, 'w', encoding='utf-8') as f:
+            f.writelines(product_url + '\n' for product_url in failed_products)
+        print(f"All of them are listed in {FAILED_URLS_FILE}")
+    
+    if http_cache:
+        http_cache.report()
+    
+    connection_stats.report()
+    
+    if isinstance(rate_limiter, AdaptiveRateLimiter):
+        rate_limiter.report()
+    
+    if registry.enabled:
+        registry.report()
+        registry.write(METRICS_FILE, METRICS_JSON_FILE)
+        print(f"Metrics saved to {METRICS_FILE} and {METRICS_JSON_FILE}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,41 +1,117 @@
-import time
-import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 from urllib.parse import urljoin
 import os
+from ticimax_scraper.browser_pool import DriverPool
+from ticimax_scraper.extractors import parse_page, extract_product
+from ticimax_scraper.fetch_engine import HostRateLimiter
+from ticimax_scraper.stream_writer import save_to_csv
 
-def setup_driver():
+# Number of headless browsers rendering product pages in parallel
+BROWSER_WORKERS = os.cpu_count() or 1
+
+# Each browser is restarted after this many pages to keep its memory bounded
+PAGES_PER_DRIVER = 50
+
+# How often a page is retried on a fresh browser after the browser crashed
+CRASH_RETRIES = 1
+
+# All browsers together stay inside this per-host budget
+REQUESTS_PER_SECOND = 1.0
+
+# Skip downloading images, media, fonts and third-party scripts; the page
+# source is all we extract from
+BLOCK_RESOURCES = True
+BLOCKED_URL_PATTERNS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.mp3', '*.m3u8',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+]
+# Analytics, ads and chat widgets loaded by the store template
+THIRD_PARTY_SCRIPT_HOSTS = [
+    'googletagmanager.com', 'google-analytics.com', 'doubleclick.net', 'googleadservices.com',
+    'connect.facebook.net', 'hotjar.com', 'criteo.com', 'criteo.net', 'yandex.ru', 'mc.yandex.com',
+    'analytics.tiktok.com', 'snap.licdn.com', 'clarity.ms', 'tawk.to', 'onesignal.com',
+]
+
+# Product pages count as ready once a price with digits is rendered next to an <h1>;
+# waiting stops after READY_TIMEOUT seconds and the page is extracted as it is
+READY_TIMEOUT = 10
+READY_POLL_INTERVAL = 0.1
+PRODUCT_READY_SCRIPT = """
+return !!document.querySelector('h1') &&
+    Array.from(document.querySelectorAll("[class*='price'], [class*='Price']"))
+        .some(function (elem) { return /\\d/.test(elem.textContent); });
+"""
+
+# How long to wait for more products after scrolling a listing page to the bottom
+SCROLL_TIMEOUT = 2
+
+# webdriver-manager looks up the chromedriver once, not for every pooled browser
+_driver_path = []
+
+def setup_driver(block_resources=None):
     """Setup Chrome driver with options"""
+    if block_resources is None:
+        block_resources = BLOCK_RESOURCES
     chrome_options = Options()
     chrome_options.add_argument("--headless")  # Run in background
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+    # driver.get returns once the DOM is parsed; readiness is checked on the product elements instead
+    chrome_options.page_load_strategy = 'eager'
+    if block_resources:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+        })
     
     # Setup the driver
-    service = Service(ChromeDriverManager().install())
+    if not _driver_path:
+        _driver_path.append(ChromeDriverManager().install())
+    service = Service(_driver_path[0])
     driver = webdriver.Chrome(service=service, options=chrome_options)
+    if block_resources:
+        block_requests(driver)
     return driver
 
+def block_requests(driver):
+    """Block heavy resources and third-party scripts through the DevTools protocol"""
+    patterns = BLOCKED_URL_PATTERNS + [f"*{host}*" for host in THIRD_PARTY_SCRIPT_HOSTS]
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+def wait_until(driver, condition, timeout):
+    """Wait for `condition(driver)` to become true; returns False on timeout"""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=READY_POLL_INTERVAL).until(condition)
+        return True
+    except TimeoutException:
+        return False
+
 def get_product_links_selenium(driver, base_url):
     """Get all product links using Selenium"""
     try:
         driver.get(base_url)
-        time.sleep(5)  # Wait for page to load
+        # Wait until links are on the page rather than a fixed delay
+        wait_until(driver, lambda d: d.find_elements(By.TAG_NAME, "a"), READY_TIMEOUT)
         
         # Scroll to load all products (if there's infinite scroll)
         last_height = driver.execute_script("return document.body.scrollHeight")
         while True:
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
+            # Continue as soon as the page grows; stop when nothing more loads in SCROLL_TIMEOUT
+            if not wait_until(driver, lambda d: d.execute_script("return document.body.scrollHeight") > last_height,
+                              SCROLL_TIMEOUT):
                 break
-            last_height = new_height
+            last_height = driver.execute_script("return document.body.scrollHeight")
         
         # Find product links
         product_links = []
@@ -55,136 +131,27 @@ def get_product_links_selenium(driver, base_url):
         print(f"Error getting product links with Selenium: {e}")
         return []
 
+def render_page_source(driver, product_url):
+    """Load a product page, wait until its product elements are rendered and return the HTML bytes"""
+    driver.get(product_url)
+    if not wait_until(driver, lambda d: d.execute_script(PRODUCT_READY_SCRIPT), READY_TIMEOUT):
+        print(f"Product elements not ready after {READY_TIMEOUT}s, extracting what rendered: {product_url}")
+    return driver.page_source.encode('utf-8')
+
+def render_product(driver, product_url):
+    """Render a product page and extract it; errors are raised so the pool can spot crashed browsers"""
+    # The rendered page goes through the same extractors as the static scrapers
+    page = parse_page(product_url, render_page_source(driver, product_url))
+    return extract_product(page, 'browser')
+
 def extract_product_info_selenium(driver, product_url):
     """Extract product information using Selenium"""
     try:
-        driver.get(product_url)
-        time.sleep(3)  # Wait for page to load
-        
-        product_info = {
-            'product_url': product_url,
-            'name': '',
-            'price': '',
-            'description': '',
-            'images': [],
-            'variations': [],
-            'sizes': []
-        }
-        
-        # Get product name
-        try:
-            name_element = driver.find_element(By.TAG_NAME, "h1")
-            product_info['name'] = name_element.text.strip()
-        except:
-            pass
-        
-        # Get price
-        try:
-            price_elements = driver.find_elements(By.CSS_SELECTOR, "[class*='price'], [class*='Price']")
-            for elem in price_elements:
-                price_text = elem.text.strip()
-                if price_text and any(char.isdigit() for char in price_text):
-                    product_info['price'] = price_text
-                    break
-        except:
-            pass
-        
-        # Get description
-        try:
-            desc_elements = driver.find_elements(By.CSS_SELECTOR, "[class*='description'], [class*='Description']")
-            for elem in desc_elements:
-                desc_text = elem.text.strip()
-                if desc_text and len(desc_text) > 20:  # Assume description is longer than 20 chars
-                    product_info['description'] = desc_text
-                    break
-        except:
-            pass
-        
-        # Get images
-        try:
-            # Main product image
-            img_elements = driver.find_elements(By.CSS_SELECTOR, "img")
-            for img in img_elements:
-                src = img.get_attribute("src") or img.get_attribute("data-src")
-                if src and "product" in src.lower() and "blank" not in src.lower():
-                    if src not in product_info['images']:
-                        product_info['images'].append(src)
-        except:
-            pass
-        
-        # Get size options
-        try:
-            size_elements = driver.find_elements(By.CSS_SELECTOR, 
-                "select[name*='size'], select[name*='beden'], [class*='size'], [class*='Size']")
-            for elem in size_elements:
-                if elem.tag_name == "select":
-                    options = elem.find_elements(By.TAG_NAME, "option")
-                    for option in options:
-                        value = option.text.strip()
-                        if value and value not in ["Seçiniz", "Select", "Choose"] and value not in product_info['sizes']:
-                            product_info['sizes'].append(value)
-                else:
-                    # For divs with size options
-                    buttons = elem.find_elements(By.CSS_SELECTOR, 
-                        "button, a, div, span")
-                    for button in buttons:
-                        text = button.text.strip()
-                        if text and text not in ["Seçiniz", "Select", "Choose"] and text not in product_info['sizes']:
-                            product_info['sizes'].append(text)
-        except:
-            pass
-        
-        # Get variations (color, etc.)
-        try:
-            var_elements = driver.find_elements(By.CSS_SELECTOR, 
-                "select[name*='color'], select[name*='renk'], [class*='color'], [class*='Color']")
-            for elem in var_elements:
-                if elem.tag_name == "select":
-                    options = elem.find_elements(By.TAG_NAME, "option")
-                    for option in options:
-                        value = option.text.strip()
-                        if value and value not in ["Seçiniz", "Select", "Choose"] and value not in product_info['variations']:
-                            product_info['variations'].append(value)
-                else:
-                    # For divs with variation options
-                    buttons = elem.find_elements(By.CSS_SELECTOR, 
-                        "button, a, div, span")
-                    for button in buttons:
-                        text = button.text.strip()
-                        if text and text not in ["Seçiniz", "Select", "Choose"] and text not in product_info['variations']:
-                            product_info['variations'].append(text)
-        except:
-            pass
-        
-        return product_info
+        return render_product(driver, product_url)
     except Exception as e:
         print(f"Error extracting product info from {product_url}: {e}")
         return None
 
-def save_to_csv(products_data, filename='bbeox_products_detailed.csv'):
-    """Save product data to CSV file"""
-    # Flatten the data for CSV
-    csv_data = []
-    for product in products_data:
-        if product:
-            # Create a row for each product
-            row = {
-                'Product URL': product.get('product_url', ''),
-                'Product Name': product.get('name', ''),
-                'Price': product.get('price', ''),
-                'Description': product.get('description', ''),
-                'Images': '; '.join(product.get('images', [])),
-                'Variations': '; '.join(product.get('variations', [])),
-                'Sizes': '; '.join(product.get('sizes', []))
-            }
-            csv_data.append(row)
-    
-    # Create DataFrame and save to CSV
-    df = pd.DataFrame(csv_data)
-    df.to_csv(filename, index=False, encoding='utf-8-sig')
-    print(f"Data saved to {filename}")
-    return filename
-
 def main():
     base_url = "https://www.bbeox.com"
     
@@ -195,29 +162,28 @@ def main():
         print("Getting product links...")
         product_links = get_product_links_selenium(driver, base_url)
         print(f"Found {len(product_links)} product links")
-        
-        # Limit for testing
-        product_links = product_links[:10]  # Remove this line to scrape all products
-        
-        # Extract product information
-        products_data = []
-        for i, link in enumerate(product_links):
-            print(f"Processing product {i+1}/{len(product_links)}: {link}")
-            product_info = extract_product_info_selenium(driver, link)
-            if product_info:
-                products_data.append(product_info)
-            time.sleep(2)  # Be respectful with requests
-        
-        # Save to CSV
-        if products_data:
-            filename = save_to_csv(products_data)
-            print(f"Successfully scraped {len(products_data)} products and saved to {filename}")
-        else:
-            print("No product data was extracted")
     except Exception as e:
         print(f"Error in main process: {e}")
+        product_links = []
     finally:
         driver.quit()
+    
+    # Limit for testing
+    product_links = product_links[:10]  # Remove this line to scrape all products
+    
+    # Render the product pages on a pool of browsers
+    print(f"Rendering products with {BROWSER_WORKERS} browsers at up to {REQUESTS_PER_SECOND} requests/sec")
+    pool = DriverPool(setup_driver, size=BROWSER_WORKERS, max_pages_per_driver=PAGES_PER_DRIVER,
+                      max_retries=CRASH_RETRIES, limiter=HostRateLimiter(REQUESTS_PER_SECOND))
+    products_data = [product for product in pool.run(product_links, render_product) if product]
+    pool.report()
+    
+    # Save to CSV
+    if products_data:
+        filename = save_to_csv(products_data, 'bbeox_products_detailed.csv')
+        print(f"Successfully scraped {len(products_data)} products and saved to {filename}")
+    else:
+        print("No product data was extracted")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,73 @@
+import unittest
+
+import requests
+
+from ticimax_scraper.corpus import replay_session
+from ticimax_scraper.crawler import CategoryCrawler, normalize_url
+from ticimax_scraper.fetch_engine import HostRateLimiter
+
+BASE_URL = 'https://www.example.com'
+
+
+def listing(*hrefs, next_page=None):
+    links = ''.join(f'<a href="{href}">link</a>' for href in hrefs)
+    head = f'<link rel="next" href="{next_page}">' if next_page else ''
+    return f'<html><head>{head}</head><body>{links}</body></html>'.encode()
+
+
+# A home page linking to a category, whose listing is split over two pages
+PAGES = [
+    (BASE_URL, 'category', listing('/kategori/elbise', '/hakkimizda', '/logo.png', 'https://other.example.com/urun/x',
+                                   'mailto:info@example.com')),
+    (f'{BASE_URL}/kategori/elbise', 'category',
+     listing('/uzun-kollu-elbise-siyah', '/urun/123?utm_source=mail', '/kategori/elbise?sayfa=2')),
+    (f'{BASE_URL}/kategori/elbise?sayfa=2', 'category',
+     listing('/kisa-kollu-elbise-beyaz', '/uzun-kollu-elbise-siyah/', next_page='/erkek-t-shirt-modelleri?sayfa=3')),
+    (f'{BASE_URL}/erkek-t-shirt-modelleri?sayfa=3', 'category', listing('/p/456')),
+    (f'{BASE_URL}/hakkimizda', 'category', listing('/gizli-urun-sayfasi')),
+]
+
+
+def crawler(**options):
+    session = requests.Session()
+    replay_session(session, PAGES)
+    return CategoryCrawler(session, BASE_URL, max_workers=2, limiter=HostRateLimiter(1000), **options)
+
+
+class CategoryCrawlerTest(unittest.TestCase):
+    def test_follows_categories_and_pagination(self):
+        engine = crawler()
+        products = set(engine.crawl())
+        self.assertEqual(products, {
+            f'{BASE_URL}/uzun-kollu-elbise-siyah',
+            f'{BASE_URL}/urun/123',
+            f'{BASE_URL}/kisa-kollu-elbise-beyaz',
+            f'{BASE_URL}/p/456',
+        })
+        self.assertEqual(engine.pages_fetched, 4)
+
+    def test_paginated_slug_is_a_listing_not_a_product(self):
+        engine = crawler()
+        url = f'{BASE_URL}/erkek-t-shirt-modelleri?sayfa=3'
+        self.assertTrue(engine.is_listing(url))
+        self.assertTrue(engine.is_product('/erkek-t-shirt-modelleri'))
+        products = set(engine.crawl())
+        self.assertIn(normalize_url(url), engine.seen_pages)
+        self.assertNotIn(normalize_url(url), products)
+
+    def test_classifies_links(self):
+        engine = crawler()
+        self.assertTrue(engine.is_listing(f'{BASE_URL}/kategori/elbise'))
+        self.assertTrue(engine.is_listing(f'{BASE_URL}/magaza?page=2'))
+        self.assertFalse(engine.is_listing(f'{BASE_URL}/hakkimizda'))
+        self.assertFalse(engine.is_product('/hakkimizda'))
+
+    def test_max_pages_bounds_the_crawl(self):
+        engine = crawler(max_pages=2)
+        products = set(engine.crawl())
+        self.assertEqual(engine.pages_fetched, 2)
+        self.assertEqual(products, {f'{BASE_URL}/uzun-kollu-elbise-siyah', f'{BASE_URL}/urun/123'})
+
+
+if __name__ == '__main__':
+    unittest.main()
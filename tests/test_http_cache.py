@@ -0,0 +1,137 @@
+import datetime
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from ticimax_scraper.http_cache import ResponseCache, install_cache
+
+URL = 'https://www.example.com/uzun-kollu-elbise'
+
+
+class FakeOrigin:
+    """Stands in for the network below the caching adapter; honors If-None-Match"""
+
+    def __init__(self):
+        self.pages = {URL: (b'<html>elbise</html>', '"v1"')}
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        body, etag = self.pages[request.url]
+        response = Response()
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(0)
+        response.headers = CaseInsensitiveDict({'ETag': etag, 'Content-Type': 'text/html; charset=utf-8'})
+        if request.headers.get('If-None-Match') == etag:
+            response.status_code = 304
+            response._content = b''
+        else:
+            response.status_code = 200
+            response._content = body
+            response.headers['Content-Length'] = str(len(body))
+        return response
+
+
+class FakeClock:
+    """time module whose clock advances one second per call, so LRU order is exact"""
+
+    def __init__(self):
+        self.seconds = itertools.count(1)
+
+    def time(self):
+        return next(self.seconds)
+
+
+class CachingAdapterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.origin = FakeOrigin()
+        patcher = mock.patch.object(HTTPAdapter, 'send', self.origin.send)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.session = requests.Session()
+        self.cache = install_cache(self.session, self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_unchanged_pages_are_revalidated_and_served_from_cache(self):
+        first = self.session.get(URL)
+        second = self.session.get(URL)
+        self.assertNotIn('If-None-Match', self.origin.requests[0].headers)
+        self.assertEqual(self.origin.requests[1].headers['If-None-Match'], '"v1"')
+        self.assertTrue(second.from_cache)
+        self.assertEqual((second.status_code, second.text), (200, first.text))
+        # Wire-level headers are not replayed for the decoded body
+        self.assertNotIn('Content-Length', second.headers)
+        self.assertEqual(self.cache.stats['hits'], 1)
+        self.assertEqual(self.cache.stats['misses'], 1)
+        self.assertEqual(self.cache.stats['bytes_saved'], len(first.content))
+
+    def test_changed_pages_are_downloaded_and_stored_again(self):
+        self.session.get(URL)
+        self.origin.pages[URL] = (b'<html>yeni elbise</html>', '"v2"')
+        response = self.session.get(URL)
+        self.assertFalse(getattr(response, 'from_cache', False))
+        self.assertEqual(response.content, b'<html>yeni elbise</html>')
+        self.assertEqual(self.session.get(URL).content, b'<html>yeni elbise</html>')
+        self.assertEqual(self.origin.requests[2].headers['If-None-Match'], '"v2"')
+        self.assertEqual(self.cache.total_bytes, len(b'<html>yeni elbise</html>'))
+
+    def test_streamed_requests_bypass_the_cache(self):
+        self.session.get(URL, stream=True)
+        self.session.get(URL, stream=True)
+        self.assertNotIn('If-None-Match', self.origin.requests[1].headers)
+        self.assertEqual(self.cache.stats['stored'], 0)
+
+    def test_validators_survive_a_restart(self):
+        self.session.get(URL)
+        self.cache.close()
+        session = requests.Session()
+        cache = install_cache(session, self.directory)
+        self.assertTrue(session.get(URL).from_cache)
+        self.assertEqual(cache.total_bytes, len(b'<html>elbise</html>'))
+
+
+class EvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        patcher = mock.patch('ticimax_scraper.http_cache.time', FakeClock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ResponseCache(self.directory, max_bytes=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def store(self, slug, body):
+        self.cache.store(f'https://www.example.com/{slug}', body, {'ETag': f'"{slug}"'})
+
+    def test_least_recently_used_entries_are_evicted_first(self):
+        self.store('a', b'aaaa')
+        self.store('b', b'bbbb')
+        self.cache.touch('https://www.example.com/a', 4)
+        self.store('c', b'cccc')
+        self.assertEqual(sorted(self.cache.index), ['https://www.example.com/a', 'https://www.example.com/c'])
+        self.assertEqual(self.cache.stats['evicted'], 1)
+        self.assertEqual(self.cache.total_bytes, 8)
+        self.assertEqual(len([name for name in os.listdir(self.directory) if name.endswith('.body')]), 2)
+
+    def test_replacing_an_entry_keeps_the_running_total(self):
+        self.store('a', b'aaaa')
+        self.store('a', b'aa')
+        self.assertEqual(self.cache.total_bytes, 2)
+        self.assertEqual(self.cache.stats['evicted'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
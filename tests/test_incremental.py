@@ -0,0 +1,87 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from ticimax_scraper.incremental import CSVIndex, merge_incremental, select_urls
+from ticimax_scraper.stream_writer import StreamingCSVWriter
+
+BASE_URL = 'https://www.example.com'
+
+
+def product(slug, price='₺100,00', description=''):
+    return {'product_url': f'{BASE_URL}/{slug}', 'name': slug, 'price': price, 'description': description,
+            'images': [f'https://cdn.example.com/{slug}.jpg'], 'variations': [], 'sizes': ['S', 'M']}
+
+
+class IncrementalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.indexes = []
+
+    def tearDown(self):
+        for index in self.indexes:
+            index.close()
+        shutil.rmtree(self.directory)
+
+    def csv_index(self, name, products):
+        filename = os.path.join(self.directory, name)
+        with StreamingCSVWriter(filename, journal=False) as writer:
+            for item in products:
+                writer.write(item)
+        index = CSVIndex(filename)
+        self.indexes.append(index)
+        return index
+
+    def merge(self, current_urls, fetched_products, **options):
+        previous = self.csv_index('previous.csv', [product('a'), product('b'), product('c')])
+        fetched = self.csv_index('fetched.csv', fetched_products)
+        merged = []
+        report = merge_incremental(previous, current_urls, fetched, merged.append, **options)
+        return merged, report
+
+    def test_index_reads_rows_spanning_lines(self):
+        index = self.csv_index('products.csv', [product('a', description='ilk satır\n"ikinci" satır')])
+        self.assertEqual(index.get_product(f'{BASE_URL}/a')['description'], 'ilk satır\n"ikinci" satır')
+        self.assertEqual(index.get_product(f'{BASE_URL}/a')['sizes'], ['S', 'M'])
+
+    def test_empty_file_has_no_rows(self):
+        filename = os.path.join(self.directory, 'empty.csv')
+        open(filename, 'w').close()
+        index = CSVIndex(filename)
+        self.indexes.append(index)
+        self.assertEqual(len(index), 0)
+        # Falsy although it is open, so callers check it against None
+        self.assertFalse(index)
+
+    def test_merge_reports_added_changed_and_removed(self):
+        current = [f'{BASE_URL}/{slug}' for slug in ('a', 'b', 'd')]
+        merged, report = self.merge(current, [product('a', price='₺90,00'), product('d')])
+        self.assertEqual([p['product_url'] for p in merged], current)
+        self.assertEqual(merged[0]['price'], '₺90,00')
+        self.assertEqual(report['added'], [f'{BASE_URL}/d'])
+        self.assertEqual(report['changed'], [f'{BASE_URL}/a'])
+        self.assertEqual(report['removed'], [f'{BASE_URL}/c'])
+        self.assertEqual(report['kept_from_previous'], 1)
+
+    def test_keep_missing_keeps_the_previous_catalog(self):
+        merged, report = self.merge([], [], keep_missing=True)
+        self.assertEqual([p['product_url'] for p in merged], [f'{BASE_URL}/{slug}' for slug in ('a', 'b', 'c')])
+        self.assertEqual(report['removed'], [])
+        self.assertEqual(report['kept_from_previous'], 3)
+
+    def test_select_urls_refreshes_one_slice_and_newer_lastmods(self):
+        previous = self.csv_index('previous.csv', [product(slug) for slug in 'abcd'])
+        current = [f'{BASE_URL}/{slug}' for slug in 'abcde']
+        since = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        lastmods = {f'{BASE_URL}/d': since + datetime.timedelta(days=1)}
+        new_urls, refresh_urls = select_urls(current, previous, 0.5, today=datetime.date(2026, 1, 2),
+                                             lastmods=lastmods, since=since)
+        self.assertEqual(new_urls, [f'{BASE_URL}/e'])
+        # 2026-01-02 has an even ordinal: the first of two slices, plus d for its newer lastmod
+        self.assertEqual(refresh_urls, [f'{BASE_URL}/a', f'{BASE_URL}/c', f'{BASE_URL}/d'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from ticimax_scraper import output_backends
+from ticimax_scraper.output_backends import check_output, open_writer, parse_price, sort_output, unsorted_name
+from ticimax_scraper.stream_writer import StreamingCSVWriter, sort_csv_by_url
+
+BASE_URL = 'https://www.example.com'
+
+
+def product(slug, price='₺1.549,99', images=None):
+    return {'product_url': f'{BASE_URL}/{slug}', 'name': slug, 'price': price, 'description': '',
+            'images': images if images is not None else [f'https://cdn.example.com/{slug}.jpg'],
+            'variations': [], 'sizes': ['S', 'M']}
+
+
+# Scraped out of order; one image URL holds the CSV list separator
+PRODUCTS = [product('c-urun'), product('a-urun', images=['https://cdn.example.com/a;%20b.jpg', 'x; y.jpg']),
+            product('b-urun', price='')]
+
+
+class ParsePriceTest(unittest.TestCase):
+    def test_prices(self):
+        self.assertEqual(parse_price('₺1.549,99'), (1549.99, '₺'))
+        self.assertEqual(parse_price('$1,549.99'), (1549.99, '$'))
+        self.assertEqual(parse_price('1.549 TL'), (1549.0, ''))
+        self.assertEqual(parse_price(''), (None, ''))
+
+
+class SortOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.csv_file = os.path.join(self.directory, 'products.csv')
+        with StreamingCSVWriter(self.csv_file, journal=False) as writer:
+            for item in PRODUCTS:
+                writer.write(item)
+        sort_csv_by_url(self.csv_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def stream_and_sort(self, filename, products=PRODUCTS):
+        filename = os.path.join(self.directory, filename)
+        with open_writer(unsorted_name(filename), batch_size=2) as writer:
+            for item in products:
+                writer.write(item)
+        return sort_output(unsorted_name(filename), self.csv_file, filename)
+
+    def test_jsonl_follows_csv_order_and_keeps_lists(self):
+        filename = self.stream_and_sort('products.jsonl')
+        with open(filename, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r['product_url'] for r in records], sorted(p['product_url'] for p in PRODUCTS))
+        self.assertEqual(records[0]['images'], ['https://cdn.example.com/a;%20b.jpg', 'x; y.jpg'])
+        self.assertEqual((records[0]['price_amount'], records[0]['currency']), (1549.99, '₺'))
+        self.assertIsNone(records[1]['price_amount'])
+
+    def test_rows_missing_from_the_stream_come_from_the_csv(self):
+        filename = self.stream_and_sort('products.jsonl', PRODUCTS[:1])
+        with open(filename, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]['images'], ['https://cdn.example.com/a;%20b.jpg', 'x', 'y.jpg'])
+
+    def test_columnar_formats_match_jsonl(self):
+        if output_backends.pa is None:
+            self.skipTest('pyarrow is not installed')
+        with open(self.stream_and_sort('products.jsonl'), encoding='utf-8') as f:
+            expected = [json.loads(line) for line in f]
+        parquet = output_backends.pq.read_table(self.stream_and_sort('products.parquet'))
+        self.assertEqual(parquet.to_pylist(), expected)
+        with output_backends.pa.memory_map(self.stream_and_sort('products.arrow')) as source:
+            self.assertEqual(output_backends.pa.ipc.open_file(source).read_all().to_pylist(), expected)
+
+
+class CheckOutputTest(unittest.TestCase):
+    def test_missing_pyarrow_fails_early(self):
+        with mock.patch.object(output_backends, 'pa', None):
+            with self.assertRaises(ImportError):
+                check_output('products.parquet')
+            check_output('products.jsonl')
+
+    def test_unknown_extension(self):
+        with self.assertRaises(ValueError):
+            check_output('products.xlsx')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import threading
+import unittest
+
+from ticimax_scraper.fetch_engine import HostRateLimiter
+from ticimax_scraper.metrics import registry
+from ticimax_scraper.pipeline import run_pipeline
+from ticimax_scraper.transport import connection_stats
+
+URLS = [f'https://www.example.com/urun-{number}' for number in range(6)]
+
+
+def fetch(url):
+    return None if url.endswith('-5') else url.encode()
+
+
+def parse(content, url):
+    # Touches the locks a fetch thread of the parent could be holding
+    connection_stats.requested('www.example.com')
+    registry.observe('parse_seconds', 0.01)
+    if url.endswith('-4'):
+        raise ValueError('broken page')
+    return {'product_url': url}
+
+
+def parsed_count():
+    return registry.summary()['histograms'].get('parse_seconds', {}).get('count', 0)
+
+
+def run(write):
+    return run_pipeline(URLS, fetch, parse, write, fetch_workers=2, parse_workers=2, limiter=HostRateLimiter(1000))
+
+
+class PipelineTest(unittest.TestCase):
+    def test_locks_held_while_the_workers_start_do_not_reach_them(self):
+        written = []
+        result = {}
+        parsed_before = parsed_count()
+
+        def pipeline():
+            result['stages'] = run(lambda product: written.append(product['product_url']))
+
+        # As if fetch threads were recording when the pool started its workers
+        connection_stats.lock.acquire()
+        registry.lock.acquire()
+        threading.Timer(1.0, registry.lock.release).start()
+        try:
+            thread = threading.Thread(target=pipeline, daemon=True)
+            thread.start()
+            thread.join(60)
+        finally:
+            connection_stats.lock.release()
+        self.assertFalse(thread.is_alive(), 'parse workers deadlocked')
+        self.assertEqual(sorted(written), URLS[:4])
+        self.assertEqual(result['stages']['fetch'].failed, [URLS[5]])
+        self.assertEqual(result['stages']['parse'].failed, [URLS[4]])
+        # Metrics recorded in the workers come back to the parent
+        self.assertEqual(parsed_count() - parsed_before, 4)
+
+    def test_write_errors_are_raised(self):
+        def write(result):
+            raise OSError('disk full')
+
+        with self.assertRaises(RuntimeError):
+            run(write)
+
+
+if __name__ == '__main__':
+    unittest.main()
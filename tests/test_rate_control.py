@@ -0,0 +1,190 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from ticimax_scraper.rate_control import AdaptiveRateLimiter
+
+URL = 'https://www.example.com/urun'
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSend:
+    """Stands in for session.request, answering with the given statuses or exceptions in turn"""
+
+    def __init__(self, *answers, delay=0.0):
+        self.answers = list(answers)
+        self.delay = delay
+        self.responses = []
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, method, url, **kwargs):
+        with self.lock:
+            self.calls += 1
+            answer = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        if self.delay:
+            time.sleep(self.delay)
+        if isinstance(answer, Exception):
+            raise answer
+        response = FakeResponse(*answer) if isinstance(answer, tuple) else FakeResponse(answer)
+        self.responses.append(response)
+        return response
+
+
+def limiter(**options):
+    options = {'requests_per_second': 100.0, 'max_rate': 200.0, 'backoff': 0.001, 'max_backoff': 0.01,
+               'decrease_interval': 0.0, 'max_retries': 3, **options}
+    return AdaptiveRateLimiter(**options)
+
+
+def unpaced(control):
+    """Skip the token bucket wait, so low starting rates do not slow the test down"""
+    control.host(URL).bucket.acquire = lambda: None
+    return control
+
+
+class AIMDTest(unittest.TestCase):
+    def test_successes_raise_rate_and_concurrency(self):
+        control = unpaced(limiter(requests_per_second=2.0, increase=0.5, max_concurrency=4))
+        for _ in range(10):
+            control.request(FakeSend(200), 'GET', URL)
+        state = control.host(URL)
+        self.assertEqual(state.bucket.rate, 7.0)
+        self.assertEqual(state.concurrency, 4)
+
+    def test_throttling_halves_rate_and_concurrency(self):
+        control = limiter(requests_per_second=8.0, max_concurrency=8)
+        control.request(FakeSend(429, 200), 'GET', URL)
+        state = control.host(URL)
+        self.assertAlmostEqual(state.bucket.rate, 4.0 + control.increase)
+        self.assertEqual(state.concurrency, 4)
+        self.assertEqual(control.throttled, 1)
+
+    def test_decrease_at_most_once_per_interval(self):
+        control = limiter(requests_per_second=8.0, decrease_interval=60.0, max_retries=2)
+        control.request(FakeSend(503), 'GET', URL)
+        self.assertEqual(control.host(URL).bucket.rate, 4.0)
+
+    def test_slow_responses_halve_rate(self):
+        control = limiter(requests_per_second=8.0, target_latency=0.01)
+        control.request(FakeSend(200, delay=0.05), 'GET', URL)
+        self.assertEqual(control.host(URL).bucket.rate, 4.0)
+
+    def test_rate_stays_within_bounds(self):
+        control = unpaced(limiter(requests_per_second=1.0, min_rate=0.5, max_rate=1.2, increase=0.5))
+        control.request(FakeSend(200), 'GET', URL)
+        self.assertEqual(control.host(URL).bucket.rate, 1.2)
+        control.request(FakeSend(429, 429, 429, 200), 'GET', URL)
+        self.assertEqual(control.host(URL).bucket.rate, 0.5 + control.increase)
+
+
+class RetryTest(unittest.TestCase):
+    def test_retry_after_is_honored(self):
+        control = limiter(max_backoff=10.0)
+        send = FakeSend((429, {'Retry-After': '3'}), 200)
+        with mock.patch('ticimax_scraper.rate_control.time.sleep') as sleep:
+            response = control.request(send, 'GET', URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sleep.call_args_list, [mock.call(3.0)])
+
+    def test_retry_after_is_capped_by_max_backoff(self):
+        control = limiter(max_backoff=2.0)
+        send = FakeSend((503, {'Retry-After': '120'}), 200)
+        with mock.patch('ticimax_scraper.rate_control.time.sleep') as sleep:
+            control.request(send, 'GET', URL)
+        self.assertEqual(sleep.call_args_list, [mock.call(2.0)])
+
+    def test_retried_responses_are_closed(self):
+        control = limiter()
+        send = FakeSend(500, 502, 200)
+        response = control.request(send, 'GET', URL)
+        self.assertEqual([r.closed for r in send.responses], [True, True, False])
+        self.assertIs(response, send.responses[-1])
+
+    def test_last_response_is_returned_open_after_retries(self):
+        control = limiter(max_retries=2)
+        send = FakeSend(503)
+        response = control.request(send, 'GET', URL)
+        self.assertEqual(send.calls, 3)
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.closed)
+        self.assertEqual(control.given_up, 1)
+        self.assertEqual(control.retries, 2)
+
+    def test_connection_errors_are_retried_then_raised(self):
+        control = limiter(max_retries=1, failure_threshold=10)
+        send = FakeSend(requests.exceptions.ConnectionError('refused'))
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            control.request(send, 'GET', URL)
+        self.assertEqual(send.calls, 2)
+
+    def test_timeout_is_set(self):
+        control = limiter(timeout=(1, 2))
+        seen = {}
+
+        def send(method, url, **kwargs):
+            seen.update(kwargs)
+            return FakeResponse(200)
+
+        control.request(send, 'GET', URL)
+        self.assertEqual(seen['timeout'], (1, 2))
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_circuit_opens_after_threshold(self):
+        control = limiter(failure_threshold=3, max_retries=2, open_seconds=60.0)
+        control.request(FakeSend(500), 'GET', URL)
+        state = control.host(URL)
+        self.assertIsNotNone(state.opened_at)
+        self.assertEqual(control.circuit_trips, 1)
+
+    def test_requests_wait_for_half_open_probe(self):
+        control = limiter(failure_threshold=1, max_retries=0, open_seconds=0.2)
+        control.request(FakeSend(500), 'GET', URL)
+        start = time.monotonic()
+        response = control.request(FakeSend(200), 'GET', URL)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(control.host(URL).opened_at)
+        self.assertEqual(control.given_up, 1)
+
+    def test_only_the_probe_is_sent_while_half_open(self):
+        control = limiter(failure_threshold=1, max_retries=0, open_seconds=0.1, max_concurrency=8)
+        control.request(FakeSend(500), 'GET', URL)
+        send = FakeSend(200, delay=0.2)
+        threads = [threading.Thread(target=control.request, args=(send, 'GET', URL)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        # The probe is in flight; everyone else waits for its outcome
+        self.assertEqual(send.calls, 1)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(send.calls, 4)
+        self.assertEqual(control.given_up, 1)
+
+    def test_failed_probe_reopens_the_circuit(self):
+        control = limiter(failure_threshold=1, max_retries=0, open_seconds=0.1)
+        control.request(FakeSend(500), 'GET', URL)
+        state = control.host(URL)
+        first_open = state.opened_at
+        control.request(FakeSend(500), 'GET', URL)
+        self.assertGreater(state.opened_at, first_open)
+        self.assertFalse(state.probing)
+        self.assertEqual(control.circuit_trips, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+
+import selenium_scraper
+
+
+class FakeLink:
+    def __init__(self, href):
+        self.href = href
+
+    def get_attribute(self, name):
+        return self.href
+
+
+class FakeDriver:
+    """Records DevTools commands and grows the page on the first two scrolls"""
+
+    def __init__(self, ready=True):
+        self.ready = ready
+        self.commands = []
+        self.height = 1000
+        self.scrolls = 0
+        self.page_source = '<html><h1>Elbise</h1></html>'
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+
+    def get(self, url):
+        self.url = url
+
+    def execute_script(self, script):
+        if script == selenium_scraper.PRODUCT_READY_SCRIPT:
+            return self.ready
+        if script.startswith('window.scrollTo'):
+            self.scrolls += 1
+            if self.scrolls <= 2:
+                self.height += 1000
+            return None
+        return self.height
+
+    def find_elements(self, by, value):
+        return [FakeLink('https://www.example.com/urun/elbise'), FakeLink('https://www.example.com/kategori'),
+                FakeLink('https://www.example.com/urun/elbise'), FakeLink(None)]
+
+
+class SeleniumHelpersTest(unittest.TestCase):
+    def test_block_requests_sends_every_pattern(self):
+        driver = FakeDriver()
+        selenium_scraper.block_requests(driver)
+        self.assertEqual(driver.commands[0], ('Network.enable', {}))
+        command, params = driver.commands[1]
+        self.assertEqual(command, 'Network.setBlockedURLs')
+        self.assertIn('*.woff2', params['urls'])
+        self.assertIn('*googletagmanager.com*', params['urls'])
+
+    def test_render_waits_for_product_elements(self):
+        driver = FakeDriver()
+        self.assertEqual(selenium_scraper.render_page_source(driver, 'https://www.example.com/urun/elbise'),
+                         driver.page_source.encode('utf-8'))
+
+    def test_render_extracts_what_rendered_after_the_timeout(self):
+        driver = FakeDriver(ready=False)
+        with mock.patch.object(selenium_scraper, 'READY_TIMEOUT', 0.2):
+            self.assertEqual(selenium_scraper.render_page_source(driver, 'https://www.example.com/urun/elbise'),
+                             driver.page_source.encode('utf-8'))
+
+    def test_scrolling_stops_when_the_page_stops_growing(self):
+        driver = FakeDriver()
+        with mock.patch.object(selenium_scraper, 'SCROLL_TIMEOUT', 0.2):
+            links = selenium_scraper.get_product_links_selenium(driver, 'https://www.example.com')
+        self.assertEqual(driver.scrolls, 3)
+        self.assertEqual(links, ['https://www.example.com/urun/elbise'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import datetime
+import gzip
+import io
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from ticimax_scraper import sitemap
+from ticimax_scraper.sitemap import discover_product_urls, is_product_url, iter_sitemap, parse_lastmod
+
+BASE_URL = 'https://www.example.com'
+NAMESPACE = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*entries):
+    body = ''.join(f'<url><loc>{BASE_URL}{path}</loc><lastmod>{lastmod}</lastmod></url>' for path, lastmod in entries)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NAMESPACE}>{body}</urlset>'.encode()
+
+
+def sitemap_index(*entries):
+    body = ''.join(f'<sitemap><loc>{BASE_URL}{path}</loc><lastmod>{lastmod}</lastmod></sitemap>'
+                   for path, lastmod in entries)
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NAMESPACE}>{body}</sitemapindex>'.encode()
+
+
+FILES = {
+    '/robots.txt': f'User-agent: *\nSitemap: {BASE_URL}/sitemap.xml\n'.encode(),
+    '/sitemap.xml': sitemap_index(('/sitemap/urunler.xml.gz', '2026-03-01'), ('/sitemap/kategoriler.xml', '2026-03-01'),
+                                  ('/sitemap/eski-urunler.xml', '2025-01-01')),
+    '/sitemap/urunler.xml.gz': gzip.compress(urlset(('/uzun-kollu-elbise', '2026-02-20T10:00:00+03:00'),
+                                                    ('/kisa-elbise', '2026-01-05'), ('/sepet', '2026-02-01'))),
+    '/sitemap/kategoriler.xml': urlset(('/kategori/elbise', '2026-02-01')),
+    '/sitemap/eski-urunler.xml': urlset(('/eski-model-elbise', '2024-12-01')),
+}
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+        self.raw = io.BytesIO(content or b'')
+        self.ok = content is not None
+
+    @property
+    def text(self):
+        return self.content.decode()
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise OSError('404')
+
+
+class FakeSession:
+    def __init__(self, files=FILES):
+        self.files = files
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        path = url[len(BASE_URL):]
+        self.requested.append(path)
+        return FakeResponse(self.files.get(path))
+
+
+class SitemapTest(unittest.TestCase):
+    def test_parse_lastmod(self):
+        self.assertEqual(parse_lastmod('2026-02-20T10:00:00+03:00'),
+                         datetime.datetime(2026, 2, 20, 7, tzinfo=datetime.timezone.utc))
+        self.assertEqual(parse_lastmod('2026-02-20'), datetime.datetime(2026, 2, 20, tzinfo=datetime.timezone.utc))
+        self.assertIsNone(parse_lastmod('dün'))
+
+    def test_discovers_products_from_index_and_gzip_sitemaps(self):
+        session = FakeSession()
+        products = discover_product_urls(session, BASE_URL)
+        self.assertEqual(sorted(products), [f'{BASE_URL}/eski-model-elbise', f'{BASE_URL}/kisa-elbise',
+                                            f'{BASE_URL}/uzun-kollu-elbise'])
+        self.assertEqual(products[f'{BASE_URL}/kisa-elbise'], parse_lastmod('2026-01-05'))
+        # Category sitemaps are never downloaded
+        self.assertNotIn('/sitemap/kategoriler.xml', session.requested)
+
+    def test_since_skips_old_sitemaps_and_entries(self):
+        session = FakeSession()
+        products = discover_product_urls(session, BASE_URL, since=parse_lastmod('2026-02-01'))
+        self.assertEqual(list(products), [f'{BASE_URL}/uzun-kollu-elbise'])
+        self.assertNotIn('/sitemap/eski-urunler.xml', session.requested)
+
+    def test_missing_robots_falls_back_to_sitemap_xml(self):
+        files = dict(FILES, **{'/robots.txt': None})
+        self.assertEqual(len(discover_product_urls(FakeSession(files), BASE_URL)), 3)
+
+    def test_processed_entries_are_removed_from_the_root(self):
+        roots = []
+        iterparse = ET.iterparse
+
+        def recording_iterparse(source, events):
+            # The first start event is the root, whichever events the caller asked for
+            for event, elem in iterparse(source, ('start',) + tuple(events)):
+                if not roots:
+                    roots.append(elem)
+                if event in events:
+                    yield event, elem
+
+        paths = [(f'/urun-{number}-elbise', '2026-01-01') for number in range(200)]
+        session = FakeSession({'/sitemap.xml': urlset(*paths)})
+        with mock.patch.object(sitemap.ET, 'iterparse', recording_iterparse):
+            entries = list(iter_sitemap(session, f'{BASE_URL}/sitemap.xml'))
+        self.assertEqual(len(entries), 200)
+        self.assertEqual(len(roots[0]), 0)
+
+    def test_is_product_url(self):
+        self.assertTrue(is_product_url(f'{BASE_URL}/uzun-kollu-elbise-siyah'))
+        self.assertTrue(is_product_url(f'{BASE_URL}/elbise', f'{BASE_URL}/sitemap/urunler.xml'))
+        self.assertFalse(is_product_url(f'{BASE_URL}/kategori/uzun-kollu-elbise', f'{BASE_URL}/sitemap/urunler.xml'))
+        self.assertFalse(is_product_url(f'{BASE_URL}/'))
+
+
+if __name__ == '__main__':
+    unittest.main()
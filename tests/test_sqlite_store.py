@@ -0,0 +1,91 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from ticimax_scraper.sqlite_store import SQLiteStore, price_changes_since, price_trend
+
+URL = 'https://www.example.com/uzun-kollu-elbise-siyah'
+
+
+def product(url=URL, price='₺1.549,99', images=('https://cdn.example.com/1.jpg',), sizes=('S', 'M')):
+    return {'product_url': url, 'name': 'Uzun Kollu Elbise', 'price': price, 'description': 'Siyah elbise',
+            'images': list(images), 'variations': [], 'sizes': list(sizes)}
+
+
+def write_in_thread(store, products):
+    """Write from a second thread, like the pipeline's writer stage does"""
+    errors = []
+
+    def write():
+        try:
+            for item in products:
+                store.write(item)
+            store.flush()
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    thread.join()
+    return errors
+
+
+class SQLiteStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'catalog.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_once(self, products):
+        with SQLiteStore(self.filename, batch_size=2) as store:
+            self.assertEqual(write_in_thread(store, products), [])
+        return store
+
+    def test_writes_from_another_thread(self):
+        store = self.run_once([product(), product(URL + '-2', price='₺99,90')])
+        self.assertEqual((store.count, store.new_products, store.price_changes), (2, 2, 0))
+        conn = sqlite3.connect(self.filename)
+        self.assertEqual(conn.execute('SELECT url, price_amount, currency FROM products ORDER BY url').fetchall(),
+                         [(URL, 1549.99, '₺'), (URL + '-2', 99.9, '₺')])
+        self.assertEqual(conn.execute('SELECT finished_at IS NOT NULL, products FROM runs').fetchall(), [(1, 2)])
+        conn.close()
+
+    def test_upsert_keeps_one_row_and_replaces_lists(self):
+        self.run_once([product()])
+        self.run_once([product(images=['https://cdn.example.com/2.jpg', 'https://cdn.example.com/3.jpg'],
+                               sizes=['L'])])
+        conn = sqlite3.connect(self.filename)
+        self.assertEqual(conn.execute('SELECT first_seen_run, last_seen_run FROM products').fetchall(), [(1, 2)])
+        self.assertEqual(conn.execute('SELECT url FROM images ORDER BY position').fetchall(),
+                         [('https://cdn.example.com/2.jpg',), ('https://cdn.example.com/3.jpg',)])
+        self.assertEqual(conn.execute('SELECT value FROM sizes').fetchall(), [('L',)])
+        conn.close()
+
+    def test_price_history_records_only_changes(self):
+        self.run_once([product()])
+        unchanged = self.run_once([product()])
+        changed = self.run_once([product(price='₺1.299,99')])
+        self.assertEqual((unchanged.new_products, unchanged.price_changes), (0, 0))
+        self.assertEqual((changed.new_products, changed.price_changes), (0, 1))
+        conn = sqlite3.connect(self.filename)
+        self.assertEqual([(price, amount) for _, price, amount in price_trend(conn, URL)],
+                         [('₺1.549,99', 1549.99), ('₺1.299,99', 1299.99)])
+        changes = price_changes_since(conn, '')
+        self.assertEqual([(old, new) for _, _, old, new, _ in changes], [(None, '₺1.549,99'), ('₺1.549,99', '₺1.299,99')])
+        conn.close()
+
+    def test_last_row_for_a_url_wins_within_a_batch(self):
+        store = self.run_once([product(), product(price='₺10,00')])
+        self.assertEqual(store.new_products, 1)
+        conn = sqlite3.connect(self.filename)
+        self.assertEqual(conn.execute('SELECT price FROM products').fetchall(), [('₺10,00',)])
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from ticimax_scraper.incremental import CSVIndex
+from ticimax_scraper.stream_writer import StreamingCSVWriter, completed_urls, journal_path, sort_csv_by_url
+
+BASE_URL = 'https://www.example.com'
+
+
+def product(slug, price='₺100,00', description=''):
+    return {'product_url': f'{BASE_URL}/{slug}', 'name': slug, 'price': price, 'description': description,
+            'images': [f'https://cdn.example.com/{slug}.jpg'], 'variations': [], 'sizes': ['S', 'M']}
+
+
+class StreamingCSVWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'products.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_urls(self):
+        index = CSVIndex(self.filename)
+        try:
+            return sorted(index.offsets)
+        finally:
+            index.close()
+
+    def interrupted_run(self, slugs, batch_size=2):
+        with self.assertRaises(KeyboardInterrupt):
+            with StreamingCSVWriter(self.filename, batch_size=batch_size) as writer:
+                for slug in slugs:
+                    writer.write(product(slug))
+                raise KeyboardInterrupt
+
+    def test_journal_lists_flushed_rows_only(self):
+        writer = StreamingCSVWriter(self.filename, batch_size=2)
+        for slug in 'abc':
+            writer.write(product(slug))
+        # c is still buffered, so a crash now would not have written it
+        self.assertEqual(completed_urls(self.filename), {f'{BASE_URL}/a', f'{BASE_URL}/b'})
+        writer.close()
+        self.assertFalse(os.path.exists(journal_path(self.filename)))
+        self.assertEqual(completed_urls(self.filename), set())
+        self.assertEqual(self.read_urls(), [f'{BASE_URL}/{slug}' for slug in 'abc'])
+
+    def test_interrupted_run_keeps_the_journal(self):
+        self.interrupted_run('abc')
+        # Leaving the block flushes the buffer before the journal is kept
+        self.assertEqual(completed_urls(self.filename), {f'{BASE_URL}/{slug}' for slug in 'abc'})
+
+    def test_resume_appends_without_a_second_header(self):
+        self.interrupted_run('ab')
+        with StreamingCSVWriter(self.filename, resume=True) as writer:
+            for slug in 'cd':
+                writer.write(product(slug))
+        with open(self.filename, encoding='utf-8-sig') as f:
+            content = f.read()
+        self.assertEqual(content.count('Product URL'), 1)
+        self.assertNotIn('\ufeff', content)
+        self.assertEqual(self.read_urls(), [f'{BASE_URL}/{slug}' for slug in 'abcd'])
+        self.assertFalse(os.path.exists(journal_path(self.filename)))
+
+    def test_without_resume_the_file_starts_over(self):
+        self.interrupted_run('ab')
+        with StreamingCSVWriter(self.filename) as writer:
+            writer.write(product('c'))
+        self.assertEqual(self.read_urls(), [f'{BASE_URL}/c'])
+
+
+class SortCSVByURLTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'products.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_sorts_multiline_rows_and_keeps_the_last_duplicate(self):
+        with StreamingCSVWriter(self.filename, journal=False) as writer:
+            writer.write(product('c', description='ilk satır\nikinci satır'))
+            writer.write(product('a', price='₺100,00'))
+            writer.write(product('b'))
+            writer.write(product('a', price='₺90,00'))
+        output = os.path.join(self.directory, 'sorted.csv')
+        sort_csv_by_url(self.filename, output)
+        index = CSVIndex(output)
+        try:
+            self.assertEqual(list(index.offsets), [f'{BASE_URL}/{slug}' for slug in 'abc'])
+            self.assertEqual(index.get_product(f'{BASE_URL}/a')['price'], '₺90,00')
+            self.assertEqual(index.get_product(f'{BASE_URL}/c')['description'], 'ilk satır\nikinci satır')
+        finally:
+            index.close()
+        with open(output, 'rb') as f:
+            self.assertTrue(f.read().startswith(b'\xef\xbb\xbfProduct URL'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from ticimax_scraper.ticimax_cdn import canonical_images, is_ticimax_cdn, split_variant, variant_url
+
+CDN = 'https://static.ticimax.cloud/3245/uploads/urunresimleri'
+
+
+class TicimaxCDNTest(unittest.TestCase):
+    def test_is_ticimax_cdn(self):
+        self.assertTrue(is_ticimax_cdn(f'{CDN}/buyuk/a.jpg'))
+        self.assertTrue(is_ticimax_cdn('https://ticimax.cloud/a.jpg'))
+        self.assertFalse(is_ticimax_cdn('https://notticimax.cloud/a.jpg'))
+        self.assertFalse(is_ticimax_cdn('https://cdn.example.com/ticimax.cloud/a.jpg'))
+
+    def test_split_variant_folds_folder_case_and_size(self):
+        key = f'{CDN}/Elbise-Siyah.jpg'
+        self.assertEqual(split_variant(f'{CDN}/buyuk/Elbise-Siyah.jpg'), (key, 'buyuk'))
+        self.assertEqual(split_variant('http://Static.Ticimax.Cloud/3245/Uploads/UrunResimleri/Thumb/Elbise-Siyah.jpg'),
+                         (key, 'thumb'))
+        self.assertEqual(split_variant(key), (key, 'full'))
+        # The file name keeps its case
+        self.assertNotEqual(split_variant(f'{CDN}/buyuk/elbise-siyah.jpg')[0], key)
+        self.assertEqual(split_variant('https://cdn.example.com/Buyuk/a.jpg'), ('https://cdn.example.com/Buyuk/a.jpg', None))
+
+    def test_variant_url(self):
+        self.assertEqual(variant_url(f'{CDN}/a.jpg', 'orta'), f'{CDN}/orta/a.jpg')
+        self.assertEqual(variant_url(f'{CDN}/a.jpg', 'full'), f'{CDN}/a.jpg')
+
+    def test_canonical_images_keeps_the_largest_size_in_page_order(self):
+        images = [f'{CDN}/thumb/a.jpg', 'https://cdn.example.com/b.jpg', f'{CDN}/buyuk/a.jpg',
+                  'https://static.ticimax.cloud/3245/Uploads/UrunResimleri/kucuk/c.jpg',
+                  'https://cdn.example.com/b.jpg']
+        self.assertEqual(canonical_images(images),
+                         [f'{CDN}/buyuk/a.jpg', 'https://cdn.example.com/b.jpg', f'{CDN}/kucuk/c.jpg'])
+
+    def test_canonical_images_rewrites_to_a_chosen_size(self):
+        images = [f'{CDN}/buyuk/a.jpg', f'{CDN}/c.jpg', 'https://cdn.example.com/b.jpg']
+        self.assertEqual(canonical_images(images, 'thumb'),
+                         [f'{CDN}/thumb/a.jpg', f'{CDN}/thumb/c.jpg', 'https://cdn.example.com/b.jpg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from ticimax_scraper import xml_feed
+from ticimax_scraper.xml_feed import clean_text, format_price, iter_feed_products, open_feed
+
+FEED = '''<?xml version="1.0" encoding="UTF-8"?>
+<Urunler>
+  <Urun>
+    <UrunAdi>Uzun Kollu Elbise</UrunAdi>
+    <UrunUrl>https://www.example.com/uzun-kollu-elbise</UrunUrl>
+    <Aciklama><![CDATA[<p>%100 <b>pamuk</b>&nbsp;elbise</p><ul><li>Yıkanabilir</li></ul>]]></Aciklama>
+    <SatisFiyati>1549,99</SatisFiyati>
+    <IndirimliFiyat>0</IndirimliFiyat>
+    <ParaBirimi>TL</ParaBirimi>
+    <Resimler>
+      <Resim>https://static.ticimax.cloud/1/uploads/urunresimleri/buyuk/a.jpg</Resim>
+      <Resim>https://static.ticimax.cloud/1/uploads/urunresimleri/buyuk/b.jpg</Resim>
+      <Resim>https://static.ticimax.cloud/1/uploads/urunresimleri/buyuk/a.jpg</Resim>
+    </Resimler>
+    <Secenekler>
+      <Ozellik Tanim="Beden" Deger="S"/>
+      <Ozellik Tanim="Beden" Deger="M"/>
+      <Ozellik Tanim="Renk" Deger="Siyah"/>
+    </Secenekler>
+  </Urun>
+  <Urun>
+    <UrunAdi>Kısa Elbise</UrunAdi>
+    <UrunUrl>https://www.example.com/kisa-elbise</UrunUrl>
+    <Aciklama>Düz metin açıklama</Aciklama>
+    <SatisFiyati>999.90</SatisFiyati>
+    <IndirimliFiyat>799.90</IndirimliFiyat>
+    <ParaBirimi>USD</ParaBirimi>
+  </Urun>
+</Urunler>
+'''.encode()
+
+
+class FakeRaw(io.BytesIO):
+    decode_content = False
+
+
+class FakeSession:
+    def __init__(self, content):
+        self.content = content
+        self.calls = []
+        self.raw = None
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        self.raw = FakeRaw(self.content)
+        return self
+
+    def raise_for_status(self):
+        pass
+
+
+class XMLFeedTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_maps_feed_products(self):
+        first, second = iter_feed_products(self.write('feed.xml', FEED))
+        self.assertEqual(first, {
+            'product_url': 'https://www.example.com/uzun-kollu-elbise',
+            'name': 'Uzun Kollu Elbise',
+            'price': '₺1.549,99',
+            'description': '%100 pamuk elbise Yıkanabilir',
+            'images': ['https://static.ticimax.cloud/1/uploads/urunresimleri/buyuk/a.jpg',
+                       'https://static.ticimax.cloud/1/uploads/urunresimleri/buyuk/b.jpg'],
+            'variations': ['Siyah'],
+            'sizes': ['S', 'M'],
+        })
+        # The discounted price wins when there is one
+        self.assertEqual(second['price'], '$799,90')
+        self.assertEqual(second['description'], 'Düz metin açıklama')
+
+    def test_reads_gzip_feeds(self):
+        products = list(iter_feed_products(self.write('feed.xml.gz', gzip.compress(FEED))))
+        self.assertEqual([p['name'] for p in products], ['Uzun Kollu Elbise', 'Kısa Elbise'])
+
+    def test_downloads_with_a_timeout_and_closes_the_response(self):
+        session = FakeSession(gzip.compress(FEED))
+        stream = open_feed('https://www.example.com/feed.xml.gz', session, timeout=5)
+        self.assertEqual(stream.read(), FEED)
+        stream.close()
+        self.assertEqual(session.calls, [('https://www.example.com/feed.xml.gz', {'stream': True, 'timeout': 5})])
+        self.assertTrue(session.raw.decode_content)
+        self.assertTrue(session.raw.closed)
+
+    def test_mapped_products_are_removed_from_the_root(self):
+        roots = []
+        iterparse = ET.iterparse
+
+        def recording_iterparse(source, events):
+            for event, elem in iterparse(source, events):
+                if not roots:
+                    roots.append(elem)
+                yield event, elem
+
+        with mock.patch.object(xml_feed.ET, 'iterparse', recording_iterparse):
+            products = list(iter_feed_products(self.write('feed.xml', FEED)))
+        self.assertEqual(len(products), 2)
+        self.assertEqual(len(roots[0]), 0)
+
+    def test_format_price(self):
+        self.assertEqual(format_price('1549.99'), '₺1.549,99')
+        self.assertEqual(format_price('1.549,99', 'EUR'), '€1.549,99')
+        self.assertEqual(format_price('fiyat sorunuz'), 'fiyat sorunuz')
+        self.assertEqual(format_price(''), '')
+
+    def test_clean_text(self):
+        self.assertEqual(clean_text('<p>Bir&amp;iki</p>\n<p>üç</p>'), 'Bir&iki üç')
+
+    def write(self, name, content):
+        filename = os.path.join(self.directory, name)
+        with open(filename, 'wb') as f:
+            f.write(content)
+        return filename
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import queue
+import threading
+
+_DONE = object()
+
+
+class DriverPool:
+    """A fixed number of reusable browser drivers working through one shared queue
+
+    Each worker thread owns one driver created by `create_driver()`. A driver
+    is quit and replaced after `max_pages_per_driver` pages so browser memory
+    stays bounded. When a task fails and the driver no longer responds, the
+    browser is treated as crashed: it is restarted and the URL is retried up
+    to `max_retries` times. Browsers are separate processes, so rendering
+    scales with the number of cores while the threads only wait on them.
+    """
+
+    def __init__(self, create_driver, size=None, max_pages_per_driver=50, max_retries=1, limiter=None):
+        self.create_driver = create_driver
+        self.size = size or os.cpu_count() or 1
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_retries = max_retries
+        self.limiter = limiter
+        self.lock = threading.Lock()
+        self.pages = 0
+        self.failures = 0
+        self.started = 0
+        self.recycled = 0
+        self.restarts = 0
+
+    def _count(self, name):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _start_driver(self):
+        driver = self.create_driver()
+        self._count('started')
+        return driver
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass  # The browser process may already be gone
+
+    @staticmethod
+    def is_alive(driver):
+        """A crashed browser or a lost session fails even the simplest command"""
+        try:
+            driver.execute_script('return 1')
+            return True
+        except Exception:
+            return False
+
+    def _run_task(self, driver, task, url):
+        """Run one task, restarting a crashed driver; returns (driver, result)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                if driver is None:
+                    driver = self._start_driver()
+                if self.limiter:
+                    self.limiter.wait(url)
+                return driver, task(driver, url)
+            except Exception as e:
+                if driver is not None and self.is_alive(driver):
+                    # The page failed, not the browser: retrying would fail the same way
+                    print(f"Error rendering {url}: {e}")
+                    return driver, None
+                if driver is not None:
+                    self._quit(driver)
+                    driver = None
+                    self._count('restarts')
+                if attempt < self.max_retries:
+                    print(f"Browser crashed on {url}, restarting it: {e}")
+                else:
+                    print(f"Browser crashed on {url}, giving up after {attempt + 1} attempts: {e}")
+        return driver, None
+
+    def _worker(self, task, work, results, done):
+        driver = None
+        pages = 0
+        try:
+            while True:
+                item = work.get()
+                if item is _DONE:
+                    return
+                index, url = item
+                driver, result = self._run_task(driver, task, url)
+                results[index] = result
+                with self.lock:
+                    if result:
+                        self.pages += 1
+                    else:
+                        self.failures += 1
+                    done[0] += 1
+                    print(f"Rendered product {done[0]}/{len(results)}: {url}")
+
+                pages += 1
+                if driver is not None and pages >= self.max_pages_per_driver:
+                    # Recycle the browser before its memory use creeps up
+                    self._quit(driver)
+                    driver = None
+                    pages = 0
+                    self._count('recycled')
+        finally:
+            if driver is not None:
+                self._quit(driver)
+
+    def run(self, urls, task):
+        """Run `task(driver, url)` for every URL and return the results in input order"""
+        urls = list(urls)
+        results = [None] * len(urls)
+        done = [0]
+        work = queue.Queue()
+        for index, url in enumerate(urls):
+            work.put((index, url))
+        workers = min(self.size, len(urls))
+        for _ in range(workers):
+            work.put(_DONE)
+
+        threads = [threading.Thread(target=self._worker, args=(task, work, results, done), daemon=True)
+                   for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def report(self):
+        print("\nBrowser Pool Summary:")
+        print(f"- Drivers: {self.size}, pages rendered: {self.pages}, failed: {self.failures}")
+        print(f"- Browsers started: {self.started}, recycled: {self.recycled}, restarted after a crash: {self.restarts}")
@@ -0,0 +1,91 @@
+import json
+import os
+
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+# Maps every saved file to the URL it was downloaded from and its page kind
+MANIFEST_FILE = 'manifest.json'
+PAGE_KINDS = ('product', 'category')
+
+
+def page_filename(url):
+    """File name for a saved page, based on the last path segment of its URL"""
+    slug = url.rstrip('/').rsplit('/', 1)[-1].split('?', 1)[0] or 'index'
+    return slug + '.html'
+
+
+def load_manifest(directory):
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def record_pages(session, urls, directory, kind='product'):
+    """Download pages into the corpus folder and list them in its manifest"""
+    os.makedirs(directory, exist_ok=True)
+    manifest = load_manifest(directory)
+    for url in urls:
+        try:
+            response = session.get(url)
+            response.raise_for_status()
+            filename = page_filename(url)
+            with open(os.path.join(directory, filename), 'wb') as f:
+                f.write(response.content)
+            manifest[filename] = {'url': url, 'kind': kind}
+            print(f"Saved {url}")
+        except Exception as e:
+            print(f"Error saving {url}: {e}")
+    with open(os.path.join(directory, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def load_corpus(directory, base_url):
+    """Load saved pages as (url, kind, content) tuples
+
+    Files missing from the manifest (e.g. saved before it existed) are
+    treated as product pages under `base_url`.
+    """
+    manifest = load_manifest(directory)
+    pages = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.html'):
+            continue
+        entry = manifest.get(filename, {'url': f"{base_url}/{filename[:-5]}", 'kind': 'product'})
+        with open(os.path.join(directory, filename), 'rb') as f:
+            pages.append((entry['url'], entry['kind'], f.read()))
+    return pages
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Serves requests from saved pages instead of the network; unknown URLs get a 404"""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+
+    def send(self, request, **kwargs):
+        response = Response()
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        content = self.pages.get(request.url.rstrip('/')) if request.method == 'GET' else None
+        if content is None:
+            response.status_code = 404
+            response._content = b''
+        else:
+            response.status_code = 200
+            response._content = content
+            response.headers = CaseInsensitiveDict({'Content-Type': 'text/html; charset=utf-8'})
+        return response
+
+
+def replay_session(session, pages):
+    """Mount a ReplayAdapter for `pages` ((url, kind, content) tuples) on `session`"""
+    adapter = ReplayAdapter({url.rstrip('/'): content for url, _, content in pages})
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
@@ -0,0 +1,155 @@
+import queue
+import re
+import threading
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
+
+from bs4 import BeautifulSoup
+
+from ticimax_scraper.fetch_engine import HostRateLimiter
+
+# Pattern to identify product URLs (same heuristics as the homepage crawl)
+PRODUCT_PATTERNS = [
+    r'/[^/]+-[^/]+-[^/]+$',  # URLs ending with three parts separated by dashes
+    r'/urun/',
+    r'/product/',
+    r'/p/'
+]
+# Links containing these are treated as category / listing pages
+CATEGORY_KEYWORDS = ['kategori', 'category', 'elbise', 'bluz', 'takim', 'koleksiyon', 'collection']
+# Query parameters Ticimax listing pages use for pagination
+PAGINATION_PARAMS = ('sayfa', 'page', 'pg')
+# Query parameters that never change the page content
+IGNORED_PARAMS = ('utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'gclid', 'fbclid')
+SKIPPED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.css', '.js', '.pdf', '.xml')
+
+
+def normalize_url(url):
+    """Normalize a URL for the seen-set: lower-case host, no fragment, tracking params or trailing slash"""
+    parts = urlparse(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in IGNORED_PARAMS)
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), path, '', urlencode(query), ''))
+
+
+class CategoryCrawler:
+    """Crawls category and listing pages (including pagination) with a bounded worker pool
+
+    Pages to visit sit in a frontier queue and every URL passes through a
+    seen-set keyed on its normalized form, so each page is fetched once.
+    Product URLs are handed out through `crawl()` as soon as they are found.
+    """
+
+    def __init__(self, session, base_url, max_workers=4, limiter=None, max_pages=None,
+                 product_patterns=PRODUCT_PATTERNS, category_keywords=CATEGORY_KEYWORDS):
+        self.session = session
+        self.base_url = base_url
+        self.host = urlparse(base_url).netloc.lower()
+        self.max_workers = max_workers
+        self.limiter = limiter or HostRateLimiter(1.0)
+        self.max_pages = max_pages
+        self.product_patterns = [re.compile(pattern) for pattern in product_patterns]
+        self.category_keywords = category_keywords
+        self.lock = threading.Lock()
+        self.seen_pages = set()
+        self.seen_products = set()
+        self.pages_fetched = 0
+
+    def is_product(self, path):
+        return any(pattern.search(path) for pattern in self.product_patterns)
+
+    def is_paginated(self, url):
+        return any(key.lower() in PAGINATION_PARAMS for key, _ in parse_qsl(urlparse(url).query))
+
+    def is_listing(self, url):
+        if self.is_paginated(url):
+            return True
+        return any(keyword in urlparse(url).path.lower() for keyword in self.category_keywords)
+
+    def _enqueue_page(self, url):
+        key = normalize_url(url)
+        with self.lock:
+            if key in self.seen_pages:
+                return
+            if self.max_pages is not None and len(self.seen_pages) >= self.max_pages:
+                return
+            self.seen_pages.add(key)
+        self.frontier.put(url)
+
+    def _add_product(self, url):
+        key = normalize_url(url)
+        with self.lock:
+            if key in self.seen_products:
+                return
+            self.seen_products.add(key)
+        self.found.put(key)
+
+    def _process_page(self, page_url):
+        self.limiter.wait(page_url)
+        response = self.session.get(page_url, timeout=30)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.content, 'html.parser')
+        with self.lock:
+            self.pages_fetched += 1
+
+        links = [(link['href'], False) for link in soup.find_all('a', href=True)]
+        # Explicit "next page" hints used by Ticimax listing templates
+        links += [(link['href'], True) for link in soup.select('link[rel="next"], a[rel="next"]') if link.get('href')]
+
+        for href, is_next in links:
+            href = str(href).strip()
+            if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+                continue
+            full_url = urljoin(page_url, href)
+            parts = urlparse(full_url)
+            if parts.netloc.lower() != self.host or parts.path.lower().endswith(SKIPPED_EXTENSIONS):
+                continue
+            # Pagination first: a listing slug can look like a product path (/erkek-t-shirt-modelleri?sayfa=2)
+            if is_next or self.is_paginated(full_url):
+                self._enqueue_page(full_url)
+            elif self.is_product(parts.path):
+                self._add_product(full_url)
+            elif self.is_listing(full_url):
+                self._enqueue_page(full_url)
+
+    def _worker(self):
+        while True:
+            page_url = self.frontier.get()
+            try:
+                if page_url is None:
+                    return
+                print(f"Checking category: {page_url}")
+                self._process_page(page_url)
+            except Exception as e:
+                print(f"Error checking category {page_url}: {e}")
+            finally:
+                self.frontier.task_done()
+
+    def crawl(self, seeds=None):
+        """Yield product URLs while the crawl is still running"""
+        self.frontier = queue.Queue()
+        self.found = queue.Queue()
+        for seed in seeds or [self.base_url]:
+            self._enqueue_page(seed)
+
+        workers = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.max_workers)]
+        for worker in workers:
+            worker.start()
+
+        def wait_for_frontier():
+            # The frontier drains only once no worker can add more pages
+            self.frontier.join()
+            self.found.put(None)
+        threading.Thread(target=wait_for_frontier, daemon=True).start()
+
+        try:
+            while True:
+                product_url = self.found.get()
+                if product_url is None:
+                    break
+                yield product_url
+        finally:
+            for _ in workers:
+                self.frontier.put(None)
+        print(f"Crawled {self.pages_fetched} listing pages, found {len(self.seen_products)} product URLs")
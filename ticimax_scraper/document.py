@@ -0,0 +1,82 @@
+from ticimax_scraper.metrics import registry
+from ticimax_scraper.parsers import DEFAULT_BACKEND, make_soup
+from ticimax_scraper.structured_data import extract_structured_product
+
+
+def empty_product(product_url):
+    """A product dict with every field present and empty"""
+    return {
+        'product_url': product_url,
+        'name': '',
+        'price': '',
+        'description': '',
+        'images': [],
+        'variations': [],
+        'sizes': []
+    }
+
+
+class ProductPage:
+    """One downloaded page, parsed at most once and shared by every extraction strategy
+
+    The structured data, the BeautifulSoup tree, the single-pass scan and the
+    page text are each built on first use and then reused, so running several
+    strategies over one page costs one download and one parse. With `rules`
+    (an ExtractionRules) selector queries are answered from a single DOM walk;
+    without them they go straight to the soup.
+    """
+
+    def __init__(self, url, content, backend=DEFAULT_BACKEND, rules=None):
+        self.url = url
+        self.content = content
+        self.backend = backend
+        self.rules = rules
+        self._structured = None
+        self._soup = None
+        self._doc = None
+        self._text = None
+
+    @property
+    def structured(self):
+        """Fields found in the page's JSON-LD / inline product JSON"""
+        if self._structured is None:
+            with registry.timer('structured_data_seconds'):
+                self._structured = extract_structured_product(self.content, self.url)
+        return self._structured
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            with registry.timer('parse_seconds', backend=self.backend):
+                self._soup = make_soup(self.content, self.backend)
+        return self._soup
+
+    @property
+    def doc(self):
+        """The single-pass document when rules are set, otherwise the soup"""
+        if self._doc is None:
+            if self.rules:
+                soup = self.soup
+                with registry.timer('scan_seconds'):
+                    self._doc = self.rules.scan(soup)
+            else:
+                self._doc = self.soup
+        return self._doc
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.doc.get_text()
+        return self._text
+
+    def select(self, selector):
+        return self.doc.select(selector)
+
+    def select_one(self, selector):
+        return self.doc.select_one(selector)
+
+    def find(self, name):
+        return self.doc.find(name)
+
+    def find_all(self, name):
+        return self.doc.find_all(name)
@@ -0,0 +1,217 @@
+import re
+
+from bs4.element import CData, NavigableString, Tag
+
+# One compound selector: tag, #id, .class and [attr*="value"] parts, e.g. 'select[name*="size"]'
+COMPOUND_PATTERN = re.compile(
+    r'(?P<tag>[a-zA-Z][\w-]*)?'
+    r'(?P<rest>(?:#[\w-]+|\.[\w-]+|\[[\w-]+\*=(?:"[^"]*"|\'[^\']*\')\])*)$'
+)
+PART_PATTERN = re.compile(r'#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)\*=(?:"(?P<dq>[^"]*)"|\'(?P<sq>[^\']*)\')\]')
+
+
+def compile_compound(text):
+    """Compile one compound selector into a (tag, id, classes, attr_contains) tuple"""
+    match = COMPOUND_PATTERN.match(text)
+    if not text or not match:
+        raise ValueError(f"Unsupported selector part: {text!r}")
+    tag = (match.group('tag') or '').lower() or None
+    element_id = None
+    classes = []
+    contains = []
+    for part in PART_PATTERN.finditer(match.group('rest')):
+        if part.group('id'):
+            element_id = part.group('id')
+        elif part.group('cls'):
+            classes.append(part.group('cls'))
+        else:
+            value = part.group('dq') if part.group('dq') is not None else part.group('sq')
+            contains.append((part.group('attr').lower(), value))
+    return tag, element_id, tuple(classes), tuple(contains)
+
+
+def compile_selector(selector):
+    """Compile a selector group into alternatives of descendant chains of compounds"""
+    alternatives = []
+    for alternative in selector.split(','):
+        chain = [compile_compound(part) for part in alternative.split()]
+        if not chain:
+            raise ValueError(f"Unsupported selector: {selector!r}")
+        alternatives.append(tuple(chain))
+    return tuple(alternatives)
+
+
+def attribute_text(value):
+    """Attribute value as one string; multi-valued attributes (class) are space-joined"""
+    if isinstance(value, list):
+        return ' '.join(value)
+    return value
+
+
+def compound_matches(compound, name, attrs):
+    tag, element_id, classes, contains = compound
+    if tag is not None and tag != name:
+        return False
+    if element_id is not None and attrs.get('id') != element_id:
+        return False
+    if classes:
+        value = attrs.get('class')
+        if not value:
+            return False
+        class_list = value if isinstance(value, list) else value.split()
+        for class_name in classes:
+            if class_name not in class_list:
+                return False
+    for attr, needle in contains:
+        value = attrs.get(attr)
+        if value is None or needle not in attribute_text(value):
+            return False
+    return True
+
+
+class ExtractionRules:
+    """A set of selectors and tag names compiled once and evaluated in a single DOM walk
+
+    `scan(soup)` visits every node exactly once and records, for every
+    registered selector, all matching elements in document order. The result
+    answers select / select_one / find / find_all / get_text like the soup
+    would, so extraction code keeps its selector priority order unchanged.
+    """
+
+    def __init__(self, selectors, tags=()):
+        self.selectors = {}
+        self.compounds = []
+        compound_ids = {}
+        for selector in selectors:
+            if selector in self.selectors:
+                continue
+            chains = []
+            for chain in compile_selector(selector):
+                ids = []
+                for compound in chain:
+                    if compound not in compound_ids:
+                        compound_ids[compound] = len(self.compounds)
+                        self.compounds.append(compound)
+                    ids.append(compound_ids[compound])
+                chains.append(tuple(ids))
+            self.selectors[selector] = tuple(chains)
+        self.tags = tuple(tag.lower() for tag in tags)
+
+        # Index compounds by what a node must have for them to possibly match,
+        # so each node only tests a handful of compounds
+        self.by_tag = {}
+        self.by_attr = {}
+        for compound_id, (tag, element_id, classes, contains) in enumerate(self.compounds):
+            if tag is not None:
+                self.by_tag.setdefault(tag, []).append(compound_id)
+            elif element_id is not None:
+                self.by_attr.setdefault('id', []).append(compound_id)
+            elif classes:
+                self.by_attr.setdefault('class', []).append(compound_id)
+            elif contains:
+                self.by_attr.setdefault(contains[0][0], []).append(compound_id)
+            else:
+                raise ValueError("Universal selectors are not supported")
+
+        # Selectors whose match is decided by the last compound of each chain
+        self.by_last_compound = {}
+        for selector, chains in self.selectors.items():
+            for chain in chains:
+                self.by_last_compound.setdefault(chain[-1], []).append((selector, chain))
+
+    def scan(self, soup):
+        """Walk the tree once and return a SinglePassDocument with every match collected"""
+        text_types = getattr(soup, 'interesting_string_types', None) or (NavigableString, CData)
+        matches = {selector: [] for selector in self.selectors}
+        tags = {tag: [] for tag in self.tags}
+        texts = []
+        stack = []  # (element, matched compound ids) for the open ancestors
+        compounds = self.compounds
+        by_tag = self.by_tag
+        by_attr = self.by_attr
+        by_last_compound = self.by_last_compound
+
+        for node in soup.descendants:
+            parent = node.parent
+            while stack and stack[-1][0] is not parent:
+                stack.pop()
+
+            if not isinstance(node, Tag):
+                if type(node) in text_types:
+                    texts.append(node)
+                continue
+
+            name = node.name
+            attrs = node.attrs
+            if name in tags:
+                tags[name].append(node)
+
+            candidates = by_tag.get(name, ())
+            if attrs:
+                for attr in attrs:
+                    if attr in by_attr:
+                        candidates = list(candidates) + by_attr[attr]
+            matched = set()
+            for compound_id in candidates:
+                if compound_matches(compounds[compound_id], name, attrs):
+                    matched.add(compound_id)
+
+            for compound_id in matched:
+                for selector, chain in by_last_compound.get(compound_id, ()):
+                    found = matches[selector]
+                    if found and found[-1] is node:
+                        continue  # Already matched through another alternative
+                    if len(chain) == 1 or self._ancestors_match(chain, stack):
+                        found.append(node)
+            stack.append((node, matched))
+
+        return SinglePassDocument(soup, matches, tags, texts)
+
+    @staticmethod
+    def _ancestors_match(chain, stack):
+        # Descendant combinators only: match the remaining compounds right to left
+        position = len(chain) - 2
+        for _, matched in reversed(stack):
+            if chain[position] in matched:
+                position -= 1
+                if position < 0:
+                    return True
+        return False
+
+
+class SinglePassDocument:
+    """Pre-collected matches from ExtractionRules.scan, queried like a BeautifulSoup tree"""
+
+    def __init__(self, soup, matches, tags, texts):
+        self.soup = soup
+        self.matches = matches
+        self.tags = tags
+        self.texts = texts
+        self._text = None
+
+    def select(self, selector):
+        if selector in self.matches:
+            return list(self.matches[selector])
+        return self.soup.select(selector)
+
+    def select_one(self, selector):
+        if selector in self.matches:
+            found = self.matches[selector]
+            return found[0] if found else None
+        return self.soup.select_one(selector)
+
+    def find_all(self, name):
+        if name in self.tags:
+            return list(self.tags[name])
+        return self.soup.find_all(name)
+
+    def find(self, name):
+        if name in self.tags:
+            found = self.tags[name]
+            return found[0] if found else None
+        return self.soup.find(name)
+
+    def get_text(self):
+        if self._text is None:
+            self._text = ''.join(self.texts)
+        return self._text
@@ -0,0 +1,496 @@
+import re
+import time
+from urllib.parse import urljoin
+
+from ticimax_scraper.document import ProductPage, empty_product
+from ticimax_scraper.extraction import ExtractionRules
+from ticimax_scraper.fetch_engine import fetch_content
+from ticimax_scraper.metrics import registry
+from ticimax_scraper.parsers import DEFAULT_BACKEND
+from ticimax_scraper.structured_data import merge_images
+
+# strategy name -> [(field, extractor)] in registration order; extractor(page) returns the field value
+STRATEGIES = {}
+
+# Every selector a registered extractor queries, compiled together into one set of rules
+REGISTERED_SELECTORS = []
+RULE_TAGS = ['title', 'img']
+_compiled_rules = []
+
+# The fast path is taken when structured data has all of these
+STRUCTURED_REQUIRED_FIELDS = ['name', 'price', 'description', 'images', 'sizes']
+
+# Product name, used when the <title> is empty
+NAME_SELECTORS = [
+    'h1.product-title',
+    'h1.product_name',
+    '.product-title',
+    '.product-name',
+    'h1',
+    '[class*="product"] h1',
+    '[class*="title"]'
+]
+
+# Price elements, used when no price is found in the page text
+PRICE_SELECTORS = [
+    '.price',
+    '.product-price',
+    '.price-current',
+    '[class*="price"]',
+    '.price-wrapper',
+    '.urunFiyat',
+    '.product-info .price'
+]
+BASIC_PRICE_SELECTORS = [selector for selector in PRICE_SELECTORS if selector != '.urunFiyat']
+
+# Product description; the basic and advanced strategies use the first 5 / 6
+DESCRIPTION_SELECTORS = [
+    '.product-description',
+    '.description',
+    '[class*="description"]',
+    '.product-details',
+    '.product-info .description',
+    '.urunAciklama',
+    '.product-detail'
+]
+
+# Main content area, used when none of the description selectors match
+CONTENT_SELECTOR = '.content, .main-content, .product-content'
+
+# Product gallery images; the basic strategy does not know '.urunResim img'
+IMAGE_SELECTORS = [
+    '.product-image img',
+    '.product-img img',
+    '.image img',
+    'img[class*="product"]',
+    '.product-gallery img',
+    '.product-images img',
+    '.urunResim img'
+]
+
+# Size options; the basic and advanced strategies use the first 7 / 8
+SIZE_SELECTORS = [
+    'select[name*="size"]',
+    'select[name*="beden"]',
+    '.size-options',
+    '.sizes',
+    '[class*="size"]',
+    '.size-selector',
+    '[data-option*="size"]',
+    '.bedenSecenekleri',
+    '.beden',
+    '[class*="beden"]',
+    '#divUrunEkSecenek'  # Ticimax option block with "Beden" / "Renk" rows of size_box elements
+]
+
+# Variations (color, style, etc.); the basic strategy uses the first 7
+VARIATION_SELECTORS = [
+    'select[name*="color"]',
+    'select[name*="renk"]',
+    '.color-options',
+    '.variations',
+    '[class*="variation"]',
+    '.color-selector',
+    '[data-option*="color"]',
+    '.renkSecenekleri'
+]
+
+# Selectors of the rendered-page strategy used by the Selenium scraper
+BROWSER_PRICE_SELECTOR = "[class*='price'], [class*='Price']"
+BROWSER_DESCRIPTION_SELECTOR = "[class*='description'], [class*='Description']"
+BROWSER_SIZE_SELECTOR = "select[name*='size'], select[name*='beden'], [class*='size'], [class*='Size']"
+BROWSER_VARIATION_SELECTOR = "select[name*='color'], select[name*='renk'], [class*='color'], [class*='Color']"
+
+SKIPPED_OPTIONS = ['Seçiniz', 'Select', 'Choose', '']
+SIZE_KEYWORDS = ['xs', 's', 'm', 'l', 'xl', 'xxl', '32', '34', '36', '38', '40', '42', '44', '46', '48', '50', '52', '54', '56', '58', '60']
+PRICE_PATTERNS = [
+    r'Fiyat\s*:?\s*[₺$€£¥]?\s*([\d.,]+)',
+    r'₺\s*([\d.,]+)',
+    r'[\d.,]+\s*₺',
+    r'Price\s*:?\s*[₺$€£¥]?\s*([\d.,]+)'
+]
+SIZE_PATTERNS = [
+    r'[Bb]eden\s*:\s*([A-Z0-9]+)',
+    r'[Ss]ize\s*:\s*([A-Z0-9]+)',
+    r'(XS|S|M|L|XL|XXL|32|34|36|38|40|42|44|46|48|50|52|54|56|58|60)'
+]
+
+
+def field_extractor(strategy, field, selectors=()):
+    """Register a function extracting one product field for a strategy
+
+    The selectors it queries are added to the shared rules, so a page is
+    scanned once for every strategy together.
+    """
+    def register(function):
+        STRATEGIES.setdefault(strategy, []).append((field, function))
+        for selector in selectors:
+            if selector not in REGISTERED_SELECTORS:
+                REGISTERED_SELECTORS.append(selector)
+                _compiled_rules.clear()
+        return function
+    return register
+
+
+def page_rules():
+    """The ExtractionRules for every registered selector, compiled on first use"""
+    if not _compiled_rules:
+        _compiled_rules.append(ExtractionRules(REGISTERED_SELECTORS, tags=RULE_TAGS))
+    return _compiled_rules[0]
+
+
+def parse_page(url, content, backend=DEFAULT_BACKEND, single_pass=True):
+    """Wrap downloaded page content in a ProductPage every strategy can share"""
+    return ProductPage(url, content, backend, page_rules() if single_pass else None)
+
+
+def load_page(session, url, backend=DEFAULT_BACKEND, single_pass=True):
+    """Download a page and wrap it in a ProductPage; raises on HTTP errors"""
+    return parse_page(url, fetch_content(session, url), backend, single_pass)
+
+
+def extract_product(page, strategy='final', structured=False, required=STRUCTURED_REQUIRED_FIELDS):
+    """Run the field extractors registered for `strategy` over a page
+
+    With `structured`, JSON-LD / inline product JSON is read first and the DOM
+    is only used when one of the `required` fields is missing from it.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown extraction strategy {strategy!r}, choose from {', '.join(STRATEGIES)}")
+    product = empty_product(page.url)
+    found = page.structured if structured else {}
+    if structured and all(found.get(field) for field in required):
+        product.update(found)
+        return product
+
+    # Build the tree up front so parse time is not counted against the first extractor
+    page.doc
+    for field, extractor in STRATEGIES[strategy]:
+        start = time.perf_counter()
+        try:
+            product[field] = extractor(page)
+        except Exception:
+            registry.inc('extract_errors', strategy=strategy, field=field)
+            raise
+        registry.observe('extract_seconds', time.perf_counter() - start, strategy=strategy, field=field)
+
+    # Structured data is more reliable than the DOM heuristics for the fields it has;
+    # gallery images only the DOM found are kept after the structured ones
+    for field, value in found.items():
+        if field == 'images':
+            product['images'] = merge_images(value, product['images'])
+        elif value:
+            product[field] = value
+    return product
+
+
+def extract_all(page, strategies=None, **options):
+    """Run several strategies over one page; returns {strategy: product}"""
+    return {strategy: extract_product(page, strategy, **options) for strategy in strategies or STRATEGIES}
+
+
+def first_text(page, selectors, min_length=0):
+    """Text of the first selector match with non-empty text longer than `min_length`"""
+    for selector in selectors:
+        elem = page.select_one(selector)
+        if elem and elem.get_text(strip=True):
+            text = elem.get_text(strip=True)
+            if len(text) > min_length:
+                return text
+    return ''
+
+
+def first_clean_price(page, selectors):
+    """First selector match reduced to digits, separators and currency signs"""
+    for selector in selectors:
+        price_elem = page.select_one(selector)
+        if price_elem and price_elem.get_text(strip=True):
+            price_text = re.sub(r'[^\d,₺$€£¥.]', '', price_elem.get_text(strip=True))
+            if price_text:
+                return price_text
+    return ''
+
+
+def collect_images(page, selectors, accept=lambda src: True):
+    images = []
+    for selector in selectors:
+        for img in page.select(selector):
+            src = img.get('src') or img.get('data-src') or img.get('data-lazy')
+            if src and accept(src):
+                full_img_url = urljoin(page.url, src)
+                if full_img_url not in images:
+                    images.append(full_img_url)
+    return images
+
+
+def collect_options(page, selectors, class_filter=None):
+    """Option texts from <select> elements, or from button-like children of other matches"""
+    values = []
+    for selector in selectors:
+        for elem in page.select(selector):
+            if elem.name == 'select':
+                texts = [option.get_text(strip=True) for option in elem.find_all('option')]
+            else:
+                texts = [button.get_text(strip=True)
+                         for button in elem.find_all(['button', 'a', 'div', 'span'], class_=class_filter)]
+            for text in texts:
+                if text and text not in SKIPPED_OPTIONS and text not in values:
+                    values.append(text)
+    return values
+
+
+def looks_like_size(text):
+    return any(keyword in text.lower() for keyword in SIZE_KEYWORDS) or re.match(r'^\d+$', text)
+
+
+def strip_notice(text):
+    """Remove the "GELİNCE HABERİN OLSUN" (notify me when back in stock) suffix of sold-out sizes"""
+    return re.sub(r'GELİNCE HABERİN.*', '', text).strip()
+
+
+def option_boxes(elem, label_pattern):
+    """size_box texts in the row after each label matching `label_pattern` in #divUrunEkSecenek"""
+    texts = []
+    for label in elem.find_all(string=re.compile(label_pattern, re.I)):
+        # Find the parent element and then look for size boxes
+        parent = label.parent
+        if parent:
+            # Look for size_box elements in the same container
+            boxes = parent.find_next_sibling().find_all(class_='size_box') if parent.find_next_sibling() else []
+            texts.extend(box.get_text(strip=True) for box in boxes)
+    return texts
+
+
+# Basic strategy (scrape_bbeox.py): first matching selector per field
+
+@field_extractor('basic', 'name', NAME_SELECTORS)
+def basic_name(page):
+    return first_text(page, NAME_SELECTORS)
+
+
+@field_extractor('basic', 'price', BASIC_PRICE_SELECTORS)
+def basic_price(page):
+    return first_text(page, BASIC_PRICE_SELECTORS)
+
+
+@field_extractor('basic', 'description', DESCRIPTION_SELECTORS[:5])
+def basic_description(page):
+    return first_text(page, DESCRIPTION_SELECTORS[:5])
+
+
+@field_extractor('basic', 'images', IMAGE_SELECTORS[:6] + ['img'])
+def basic_images(page):
+    images = collect_images(page, IMAGE_SELECTORS[:6])
+    # If no images found, try to get any images
+    if not images:
+        images = collect_images(page, ['img'], lambda src: 'product' in src.lower() or 'image' in src.lower()
+                                or 'photo' in src.lower())
+    return images
+
+
+@field_extractor('basic', 'sizes', SIZE_SELECTORS[:7])
+def basic_sizes(page):
+    return collect_options(page, SIZE_SELECTORS[:7], lambda x: x and ('size' in x or 'beden' in x.lower()))
+
+
+@field_extractor('basic', 'variations', VARIATION_SELECTORS[:7])
+def basic_variations(page):
+    return collect_options(page, VARIATION_SELECTORS[:7])
+
+
+# Advanced strategy (advanced_scraper.py): cleaned prices and filtered images
+
+@field_extractor('advanced', 'name', NAME_SELECTORS)
+def advanced_name(page):
+    return first_text(page, NAME_SELECTORS)
+
+
+@field_extractor('advanced', 'price', PRICE_SELECTORS)
+def advanced_price(page):
+    return first_clean_price(page, PRICE_SELECTORS)
+
+
+@field_extractor('advanced', 'description', DESCRIPTION_SELECTORS[:6])
+def advanced_description(page):
+    return first_text(page, DESCRIPTION_SELECTORS[:6])
+
+
+@field_extractor('advanced', 'images', IMAGE_SELECTORS + ['img'])
+def advanced_images(page):
+    images = collect_images(page, IMAGE_SELECTORS,
+                            lambda src: 'blank' not in src.lower() and 'placeholder' not in src.lower())
+    # If no images found, try to get any images that look like product images
+    if not images:
+        images = collect_images(page, ['img'], lambda src: 'product' in src.lower() or 'urun' in src.lower()
+                                or ('image' in src.lower() and 'blank' not in src.lower()))
+    return images
+
+
+@field_extractor('advanced', 'sizes', SIZE_SELECTORS[:8])
+def advanced_sizes(page):
+    return collect_options(page, SIZE_SELECTORS[:8], lambda x: x and ('size' in x.lower() or 'beden' in x.lower()))
+
+
+@field_extractor('advanced', 'variations', VARIATION_SELECTORS)
+def advanced_variations(page):
+    return collect_options(page, VARIATION_SELECTORS)
+
+
+# Final strategy (final_scraper.py / test_scraper.py): page title and text patterns,
+# lazy-loaded images and the Ticimax option block
+
+@field_extractor('final', 'name', NAME_SELECTORS)
+def final_name(page):
+    # Look for the product name in the title first
+    title_elem = page.find('title')
+    if title_elem:
+        title_text = title_elem.get_text(strip=True)
+        # Remove common suffixes
+        title_text = re.sub(r'\s*\|.*$', '', title_text)
+        title_text = re.sub(r'\s*-.*Bbeox.*$', '', title_text)
+        if title_text.strip():
+            return title_text.strip()
+    return first_text(page, NAME_SELECTORS)
+
+
+@field_extractor('final', 'price', PRICE_SELECTORS)
+def final_price(page):
+    # Try to find price in text content
+    for pattern in PRICE_PATTERNS:
+        # Take the first match that looks like a reasonable price
+        for match in re.findall(pattern, page.text):
+            price_value = re.sub(r'[^\d,.]', '', match)
+            # Handle Turkish number format (1.000,00)
+            if '.' in price_value and ',' in price_value:
+                # If both . and , exist, assume . is thousands separator
+                price_value = price_value.replace('.', '').replace(',', '.')
+            elif ',' in price_value:
+                # If only comma, assume it's decimal separator
+                price_value = price_value.replace(',', '.')
+
+            try:
+                if float(price_value) > 10:
+                    return f"₺{match}"
+            except ValueError:
+                continue
+
+    # If still no price, try specific elements
+    return first_clean_price(page, PRICE_SELECTORS)
+
+
+@field_extractor('final', 'description', DESCRIPTION_SELECTORS + [CONTENT_SELECTOR])
+def final_description(page):
+    # Only consider substantial descriptions
+    description = first_text(page, DESCRIPTION_SELECTORS, min_length=20)
+    if not description:
+        # Fall back to the text of the main content area
+        content_area = page.select_one(CONTENT_SELECTOR)
+        if content_area:
+            desc_text = content_area.get_text(strip=True)
+            if len(desc_text) > 50:
+                description = desc_text
+    return description
+
+
+@field_extractor('final', 'images')
+def final_images(page):
+    images = []
+    # Lazy-loading attributes hold the real image URL, src often a placeholder
+    for img in page.find_all('img'):
+        for attr in ['data-src', 'data-lazy', 'data-original', 'src']:
+            src = img.get(attr)
+            if src:
+                src_str = str(src).lower()
+                if 'blank' not in src_str and 'placeholder' not in src_str:
+                    # Check if it looks like a real product image
+                    if any(keyword in src_str for keyword in ['product', 'urun', 'upload', 'image']):
+                        full_img_url = urljoin(page.url, str(src))
+                        if full_img_url not in images:
+                            images.append(full_img_url)
+                            break  # Move to next image element
+    return images
+
+
+@field_extractor('final', 'sizes', SIZE_SELECTORS)
+def final_sizes(page):
+    sizes = []
+    for selector in SIZE_SELECTORS:
+        for elem in page.select(selector):
+            if elem.get('id') == 'divUrunEkSecenek':
+                texts = [strip_notice(text) for text in option_boxes(elem, r'Beden')]
+            elif elem.name == 'select':
+                texts = [option.get_text(strip=True) for option in elem.find_all('option')]
+            else:
+                # For divs with size options
+                texts = [strip_notice(button.get_text(strip=True)) for button in
+                         elem.find_all(['button', 'a', 'div', 'span'], class_=lambda x: x and 'size' in x.lower())]
+            for text in texts:
+                # Filter out non-size values
+                if text and text not in SKIPPED_OPTIONS and text not in sizes and looks_like_size(text):
+                    sizes.append(text)
+
+    # If no sizes found, try to extract from text content
+    if not sizes:
+        for pattern in SIZE_PATTERNS:
+            for match in re.findall(pattern, page.text):
+                if match and match not in sizes:
+                    sizes.append(match)
+    return sizes
+
+
+@field_extractor('final', 'variations', VARIATION_SELECTORS)
+def final_variations(page):
+    variations = []
+    for selector in VARIATION_SELECTORS:
+        for elem in page.select(selector):
+            if elem.get('id') == 'divUrunEkSecenek':
+                texts = option_boxes(elem, r'Renk')
+            elif elem.name == 'select':
+                texts = [option.get_text(strip=True) for option in elem.find_all('option')]
+            else:
+                texts = [button.get_text(strip=True) for button in elem.find_all(['button', 'a', 'div', 'span'])]
+            for text in texts:
+                if text and text not in SKIPPED_OPTIONS and text not in variations:
+                    variations.append(text)
+    return variations
+
+
+# Browser strategy (selenium_scraper.py): runs on the rendered page source
+
+@field_extractor('browser', 'name', ['h1'])
+def browser_name(page):
+    name_elem = page.select_one('h1')
+    return name_elem.get_text(' ', strip=True) if name_elem else ''
+
+
+@field_extractor('browser', 'price', [BROWSER_PRICE_SELECTOR])
+def browser_price(page):
+    for elem in page.select(BROWSER_PRICE_SELECTOR):
+        price_text = elem.get_text(' ', strip=True)
+        if price_text and any(char.isdigit() for char in price_text):
+            return price_text
+    return ''
+
+
+@field_extractor('browser', 'description', [BROWSER_DESCRIPTION_SELECTOR])
+def browser_description(page):
+    for elem in page.select(BROWSER_DESCRIPTION_SELECTOR):
+        desc_text = elem.get_text(' ', strip=True)
+        if desc_text and len(desc_text) > 20:  # Assume description is longer than 20 chars
+            return desc_text
+    return ''
+
+
+@field_extractor('browser', 'images', ['img'])
+def browser_images(page):
+    return collect_images(page, ['img'], lambda src: 'product' in src.lower() and 'blank' not in src.lower())
+
+
+@field_extractor('browser', 'sizes', [BROWSER_SIZE_SELECTOR])
+def browser_sizes(page):
+    return collect_options(page, [BROWSER_SIZE_SELECTOR])
+
+
+@field_extractor('browser', 'variations', [BROWSER_VARIATION_SELECTOR])
+def browser_variations(page):
+    return collect_options(page, [BROWSER_VARIATION_SELECTOR])
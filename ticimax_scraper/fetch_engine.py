@@ -0,0 +1,150 @@
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+from ticimax_scraper.http_cache import ResponseCache
+from ticimax_scraper.transport import ACCEPT_ENCODING, DEFAULT_POOL_SIZE, mount_adapters
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+
+# Connect and read timeout in seconds for requests whose caller sets none
+DEFAULT_TIMEOUT = (10, 30)
+
+
+def create_session(cache_dir='.http_cache', max_bytes=500 * 1024 * 1024, controller=None, cache=None,
+                   pool_size=DEFAULT_POOL_SIZE, host_pool_sizes=None, http2=False):
+    """Create the requests session every scraper uses; returns (session, cache)
+
+    With a `cache_dir` unchanged pages are revalidated from the on-disk HTTP
+    cache; pass None to disable it (the returned cache is then None), or pass
+    an existing `cache` to share it between sessions. With a `controller` (an
+    AdaptiveRateLimiter) every request is paced, given a timeout and retried
+    through it. Connections are kept alive in pools of `pool_size` per host,
+    sized per host with `host_pool_sizes`; `http2` switches to httpx. See
+    ticimax_scraper.transport.
+    """
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING})
+    if cache is None and cache_dir:
+        cache = ResponseCache(cache_dir, max_bytes)
+    mount_adapters(session, cache, pool_size, host_pool_sizes, http2)
+    if controller:
+        controller.install(session)
+    return session, cache
+
+
+def fetch_content(session, url, timeout=DEFAULT_TIMEOUT):
+    """Download `url` and return the raw response bytes; raises on HTTP errors"""
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per host so each host gets its own requests-per-second budget"""
+
+    def __init__(self, requests_per_second=1.0, burst=None):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket_for(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+            return self.buckets[host]
+
+    def wait(self, url):
+        """Block until a request to the host of `url` fits in the budget"""
+        self.bucket_for(url).acquire()
+
+
+def _rate_limited(worker, limiter, progress, total=None):
+    """Wrap `worker` so every call waits for the limiter and reports progress"""
+    done = [0]
+    done_lock = threading.Lock()
+
+    def run(url):
+        limiter.wait(url)
+        try:
+            return worker(url)
+        finally:
+            if progress:
+                with done_lock:
+                    done[0] += 1
+                    count = f"{done[0]}/{total}" if total is not None else done[0]
+                    print(f"Processed product {count}: {url}")
+    return run
+
+
+def fetch_all(urls, worker, max_workers=4, requests_per_second=1.0, burst=None, progress=True, limiter=None):
+    """Run `worker(url)` for every URL concurrently and return the results in input order
+
+    Requests are spread over `max_workers` threads while a per-host token bucket
+    keeps the overall rate at or below `requests_per_second`. Pass a shared
+    `limiter` to keep other stages (e.g. discovery) inside the same budget.
+    """
+    urls = list(urls)
+    limiter = limiter or HostRateLimiter(requests_per_second, burst)
+    run = _rate_limited(worker, limiter, progress, len(urls))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # map() yields results in submission order, which keeps the output deterministic
+        return list(executor.map(run, urls))
+
+
+def fetch_stream(urls, worker, max_workers=4, requests_per_second=1.0, burst=None, progress=True, limiter=None):
+    """Like fetch_all, but starts on each URL as soon as the iterable yields it
+
+    This lets product fetching overlap with a discovery stage that is still
+    producing URLs. At most 2 * max_workers URLs are queued ahead of the workers.
+    Results are yielded in the order the URLs arrived, each one as soon as it
+    and every result before it are done, so the caller can write them while
+    fetching continues.
+    """
+    limiter = limiter or HostRateLimiter(requests_per_second, burst)
+    run = _rate_limited(worker, limiter, progress)
+    in_flight = threading.BoundedSemaphore(max_workers * 2)
+    pending = collections.deque()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for url in urls:
+            in_flight.acquire()
+            future = executor.submit(run, url)
+            future.add_done_callback(lambda _: in_flight.release())
+            pending.append(future)
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Headers that describe the wire encoding; bodies are stored already decoded
+SKIPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection')
+# Headers a 304 may carry refreshed values of
+REFRESHED_HEADERS = ('ETag', 'Last-Modified', 'Date', 'Cache-Control', 'Expires')
+
+
+class ResponseCache:
+    """On-disk store of response bodies and their validators with size-based LRU eviction"""
+
+    def __init__(self, cache_dir='.http_cache', max_bytes=500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0, 'bytes_saved': 0}
+        self.unsaved = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable cache index {self.index_path}: {e}")
+        # Running size of every stored body, so eviction does not re-sum the index
+        self.total_bytes = sum(entry['size'] for entry in self.index.values())
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, key + '.body')
+
+    def get(self, url):
+        """Return the index entry for `url`, or None if nothing usable is cached"""
+        with self.lock:
+            entry = self.index.get(url)
+        if entry and os.path.exists(self._body_path(entry['key'])):
+            return entry
+        return None
+
+    def read_body(self, entry):
+        with open(self._body_path(entry['key']), 'rb') as f:
+            return f.read()
+
+    def touch(self, url, size, refreshed=None):
+        """Mark a cached entry as just used and count the download it saved
+
+        `refreshed` holds the validator headers a 304 sent along; they replace
+        the stored ones so the next revalidation uses them.
+        """
+        with self.lock:
+            entry = self.index.get(url)
+            if entry:
+                entry['last_used'] = time.time()
+                if refreshed:
+                    headers = CaseInsensitiveDict(entry['headers'])
+                    headers.update(refreshed)
+                    entry['headers'] = dict(headers)
+                    entry['etag'] = refreshed.get('ETag', entry.get('etag'))
+                    entry['last_modified'] = refreshed.get('Last-Modified', entry.get('last_modified'))
+                    self.unsaved += 1
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += size
+
+    def miss(self):
+        with self.lock:
+            self.stats['misses'] += 1
+
+    def store(self, url, body, headers):
+        """Save a response body together with its ETag / Last-Modified validators"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        tmp_path = self._body_path(key) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, self._body_path(key))
+        with self.lock:
+            if url in self.index:
+                self.total_bytes -= self.index[url]['size']
+            self.total_bytes += len(body)
+            self.index[url] = {
+                'key': key,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'headers': {k: v for k, v in headers.items() if k.lower() not in SKIPPED_HEADERS},
+                'size': len(body),
+                'last_used': time.time(),
+            }
+            self.stats['stored'] += 1
+            self._evict()
+            self.unsaved += 1
+            if self.unsaved >= 50:
+                self._save_index()
+
+    def _evict(self):
+        # Drop least recently used entries until the cache fits in max_bytes
+        if self.total_bytes <= self.max_bytes:
+            return
+        for url, entry in sorted(self.index.items(), key=lambda item: item[1]['last_used']):
+            try:
+                os.remove(self._body_path(entry['key']))
+            except OSError:
+                pass
+            del self.index[url]
+            self.stats['evicted'] += 1
+            self.total_bytes -= entry['size']
+            if self.total_bytes <= self.max_bytes:
+                break
+
+    def _save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+        self.unsaved = 0
+
+    def close(self):
+        with self.lock:
+            self._save_index()
+
+    def report(self):
+        """Persist the index and print hit/miss/bytes-saved figures for the run"""
+        self.close()
+        stats = self.stats
+        requests_seen = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] / requests_seen * 100 if requests_seen else 0.0
+        print("\nHTTP Cache Summary:")
+        print(f"- Hits (304 served from cache): {stats['hits']}")
+        print(f"- Misses (full downloads): {stats['misses']}")
+        print(f"- Hit rate: {hit_rate:.1f}%")
+        print(f"- Bytes saved: {stats['bytes_saved'] / 1024:.1f} KB")
+        print(f"- Entries stored: {stats['stored']}, evicted: {stats['evicted']}")
+        return stats
+
+
+class CachingAdapter(HTTPAdapter):
+    """Transport adapter that revalidates cached GET responses with conditional requests"""
+
+    def __init__(self, cache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, **kwargs):
+        # Streamed responses (sitemaps, XML feeds) are read incrementally from the
+        # socket; caching them would read the whole body into memory first
+        if request.method != 'GET' or kwargs.get('stream'):
+            return super().send(request, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry:
+            if entry.get('etag'):
+                request.headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and entry:
+            cached = self._cached_response(request, entry, response)
+            # Closing an unread response drops its connection; reading the empty
+            # body first hands the connection back to the pool for reuse
+            response.content
+            response.close()
+            refreshed = {header: response.headers[header] for header in REFRESHED_HEADERS
+                         if header in response.headers}
+            self.cache.touch(request.url, entry['size'], refreshed)
+            return cached
+
+        self.cache.miss()
+        if response.status_code == 200 and ('ETag' in response.headers or 'Last-Modified' in response.headers):
+            self.cache.store(request.url, response.content, response.headers)
+        return response
+
+    def _cached_response(self, request, entry, not_modified):
+        response = Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        # A 304 may carry refreshed validators
+        for header in REFRESHED_HEADERS:
+            if header in not_modified.headers:
+                response.headers[header] = not_modified.headers[header]
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.cache.read_body(entry)
+        response.elapsed = not_modified.elapsed
+        response.connection = self
+        response.from_cache = True
+        return response
+
+
+def install_cache(session, cache_dir='.http_cache', max_bytes=500 * 1024 * 1024):
+    """Mount a caching adapter on `session` and return its cache for reporting"""
+    cache = ResponseCache(cache_dir, max_bytes)
+    adapter = CachingAdapter(cache)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return cache
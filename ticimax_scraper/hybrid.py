@@ -0,0 +1,59 @@
+import re
+
+# Per-field completeness rules: a statically extracted value must pass its rule,
+# otherwise the page is re-rendered in a browser. Fields without a rule only
+# need to be non-empty.
+COMPLETENESS_RULES = {
+    'price': lambda value: bool(re.search(r'\d', value or '')),
+    'sizes': lambda value: bool(value),
+    'images': lambda value: bool(value),
+    'name': lambda value: bool(value and value.strip()),
+}
+
+
+def missing_fields(product, required_fields):
+    """The required fields of `product` that fail their completeness rule"""
+    return [field for field in required_fields
+            if not COMPLETENESS_RULES.get(field, bool)(product.get(field))]
+
+
+def merge_rendered(static, rendered):
+    """Fill the fields the static extraction got wrong with the browser's values
+
+    Fields that pass their completeness rule statically are kept, since the
+    static extractors are the reference; every other field takes the rendered
+    value when it has one.
+    """
+    merged = dict(static)
+    for field, value in rendered.items():
+        if field == 'product_url' or not value:
+            continue
+        if not COMPLETENESS_RULES.get(field, bool)(static.get(field)):
+            merged[field] = value
+    return merged
+
+
+class EscalationStats:
+    """Counts how many pages needed the browser, and why"""
+
+    def __init__(self):
+        self.static = 0
+        self.escalated = 0
+        self.completed = 0
+        self.by_field = {}
+
+    def add(self, missing):
+        self.static += 1
+        if missing:
+            self.escalated += 1
+            for field in missing:
+                self.by_field[field] = self.by_field.get(field, 0) + 1
+
+    def report(self):
+        share = self.escalated / self.static * 100 if self.static else 0.0
+        print("\nHybrid Mode Summary:")
+        print(f"- Pages extracted statically: {self.static}")
+        print(f"- Escalated to the browser: {self.escalated} ({share:.1f}%)")
+        if self.by_field:
+            print("- Missing fields: " + ', '.join(f"{field} {count}" for field, count in sorted(self.by_field.items())))
+        print(f"- Completed by the browser: {self.completed}")
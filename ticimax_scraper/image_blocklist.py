@@ -0,0 +1,92 @@
+import json
+import os
+from urllib.parse import urlparse
+
+BLOCKLIST_FILE = '.image_blocklist.json'
+
+
+class ImageBlocklist:
+    """Learns which image URLs are site chrome (header, footer, banners) from how often they recur
+
+    Every product page is observed before it is filtered. Once `min_pages`
+    pages have been seen, an image URL found on at least `threshold` of them
+    is blocked, since a real product image belongs to one product (or a few
+    colour variants of it). The blocklist is saved per site and loaded again
+    on the next run, so known chrome is dropped from the very first page.
+    """
+
+    def __init__(self, site, path=BLOCKLIST_FILE, threshold=0.5, min_pages=20):
+        self.site = urlparse(site).netloc or site
+        self.path = path
+        self.threshold = threshold
+        self.min_pages = min_pages
+        self.pages = 0
+        self.counts = {}
+        self.loaded = set()
+        self.blocked = set()
+        self.dropped = 0
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.loaded = set(json.load(f).get(self.site, []))
+        except Exception as e:
+            print(f"Error reading image blocklist {self.path}: {e}")
+        self.blocked = set(self.loaded)
+
+    @property
+    def warming_up(self):
+        """True until enough pages have been seen to tell chrome from product images"""
+        return self.pages < self.min_pages
+
+    def observe(self, product):
+        """Count the images of one product page and block those that turned out to be chrome"""
+        self.pages += 1
+        for url in set(product.get('images', [])):
+            self.counts[url] = self.counts.get(url, 0) + 1
+        if self.warming_up:
+            return
+        if self.pages == self.min_pages:
+            candidates = self.counts
+        else:
+            candidates = product.get('images', [])
+        for url in candidates:
+            if self.counts[url] >= self.threshold * self.pages:
+                self.blocked.add(url)
+
+    def filter(self, product):
+        """`product` with its blocked images removed"""
+        images = product.get('images', [])
+        kept = [url for url in images if url not in self.blocked]
+        if len(kept) == len(images):
+            return product
+        self.dropped += len(images) - len(kept)
+        return dict(product, images=kept)
+
+    def save(self):
+        """Persist this site's blocklist; a run too short to judge keeps the previous one"""
+        if not self.path:
+            return
+        if not self.warming_up:
+            # Re-judge every URL on the whole run so images that stopped recurring are unblocked
+            self.blocked = {url for url, count in self.counts.items() if count >= self.threshold * self.pages}
+        sites = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, encoding='utf-8') as f:
+                    sites = json.load(f)
+        except Exception as e:
+            print(f"Error reading image blocklist {self.path}: {e}")
+        sites[self.site] = sorted(self.blocked)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(sites, f, indent=2)
+
+    def report(self):
+        learned = len(self.blocked - self.loaded)
+        print("\nImage Blocklist Summary:")
+        print(f"- Pages observed: {self.pages}, distinct image URLs: {len(self.counts)}")
+        print(f"- Blocked image URLs: {len(self.blocked)} ({learned} new this run), "
+              f"image links dropped: {self.dropped}")
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from ticimax_scraper.fetch_engine import HostRateLimiter, create_session, fetch_all
+
+INDEX_FILE = 'index.jsonl'
+OBJECTS_DIR = 'objects'
+CHUNK_SIZE = 64 * 1024
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg'}
+
+
+def image_references(products):
+    """How often every image URL of `products` is used, in the order they first appear"""
+    references = {}
+    for product in products:
+        for url in product.get('images', []):
+            if url:
+                references[url] = references.get(url, 0) + 1
+    return references
+
+
+def image_extension(url):
+    extension = os.path.splitext(urlparse(url).path)[1].lower()
+    return extension if extension in IMAGE_EXTENSIONS else '.img'
+
+
+class ImageStore:
+    """Content-addressed image files plus an append-only URL index
+
+    An image is stored once under objects/<first 2 hex digits>/<sha256><ext>,
+    however many URLs or products point at it. index.jsonl maps every
+    downloaded URL to its file, so an interrupted run resumes where it stopped
+    and URLs whose file is still on disk are never downloaded again.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.index = {}
+        os.makedirs(os.path.join(directory, OBJECTS_DIR), exist_ok=True)
+        self._load_index()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short by an interrupted run
+                self.index[entry['url']] = entry
+
+    def object_path(self, digest, extension):
+        return os.path.join(self.directory, OBJECTS_DIR, digest[:2], digest + extension)
+
+    def lookup(self, url):
+        """The index entry for `url` if its file is still on disk, otherwise None"""
+        entry = self.index.get(url)
+        if entry and os.path.exists(os.path.join(self.directory, entry['path'])):
+            return entry
+        return None
+
+    def add(self, url, temp_path, digest, size):
+        """Move a downloaded file into place; returns False when the content was already stored"""
+        path = self.object_path(digest, image_extension(url))
+        with self.lock:
+            if os.path.exists(path):
+                os.remove(temp_path)
+                stored = False
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+                stored = True
+            entry = {'url': url, 'path': os.path.relpath(path, self.directory), 'sha256': digest, 'bytes': size}
+            self.index[url] = entry
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+        return stored
+
+
+class ImageDownloader:
+    """Downloads product images concurrently into an ImageStore
+
+    Each image is streamed to a temporary file while it is hashed, so memory
+    use does not depend on image size. Without a `session` an uncached one is
+    created whose connection pool is sized to the number of workers, so every
+    thread reuses a kept-alive connection.
+    """
+
+    def __init__(self, directory, session=None, max_workers=8, requests_per_second=5.0, limiter=None):
+        if session is None:
+            session, _ = create_session(cache_dir=None, pool_size=max_workers)
+        self.session = session
+        self.store = ImageStore(directory)
+        self.max_workers = max_workers
+        self.limiter = limiter or HostRateLimiter(requests_per_second)
+        self.lock = threading.Lock()
+        self.downloaded = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.failed = 0
+        self.repeated = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self.elapsed = 0.0
+
+    def _count(self, **amounts):
+        with self.lock:
+            for name, amount in amounts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def download(self, url):
+        """Download one image; returns its index entry, or None when it failed"""
+        temp_path = os.path.join(self.store.directory, f".{hashlib.sha1(url.encode()).hexdigest()}.part")
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with self.session.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                with open(temp_path, 'wb') as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+            if self.store.add(url, temp_path, digest.hexdigest(), size):
+                self._count(downloaded=1, bytes_downloaded=size)
+            else:
+                # Same bytes under another URL: the stored copy is reused
+                self._count(duplicates=1, bytes_downloaded=size, bytes_saved=size)
+            return self.store.index[url]
+        except Exception as e:
+            print(f"Error downloading image {url}: {e}")
+            self._count(failed=1)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+    def download_all(self, products):
+        """Download every image of `products` that is not stored yet; returns {url: file path}"""
+        references = image_references(products)
+        urls = list(references)
+        pending = []
+        for url in urls:
+            if self.store.lookup(url):
+                self._count(skipped=1)
+            else:
+                pending.append(url)
+        print(f"Found {len(urls)} unique images, {len(pending)} to download")
+
+        start = time.perf_counter()
+        done = [0]
+
+        def worker(url):
+            entry = self.download(url)
+            with self.lock:
+                done[0] += 1
+                if done[0] % 100 == 0 or done[0] == len(pending):
+                    print(f"Downloaded images {done[0]}/{len(pending)}")
+            return entry
+
+        fetch_all(pending, worker, max_workers=self.max_workers, progress=False, limiter=self.limiter)
+        self.elapsed += time.perf_counter() - start
+
+        # An image shared by several products is downloaded and stored only once
+        for url, count in references.items():
+            if count > 1 and url in self.store.index:
+                self._count(repeated=count - 1, bytes_saved=(count - 1) * self.store.index[url]['bytes'])
+        return {url: os.path.join(self.store.directory, self.store.index[url]['path'])
+                for url in urls if url in self.store.index}
+
+    def report(self):
+        fetched = self.downloaded + self.duplicates
+        rate = fetched / self.elapsed if self.elapsed else 0.0
+        throughput = self.bytes_downloaded / self.elapsed / 1024 / 1024 if self.elapsed else 0.0
+        print("\nImage Download Summary:")
+        print(f"- Downloaded: {fetched} images in {self.elapsed:.1f}s ({rate:.1f} images/sec, {throughput:.2f} MB/s)")
+        print(f"- New files stored: {self.downloaded}, duplicate content: {self.duplicates}, "
+              f"already on disk: {self.skipped}, failed: {self.failed}")
+        print(f"- Image URLs shared between products: {self.repeated} repeated references")
+        print(f"- Bytes saved by deduplication: {self.bytes_saved / 1024 / 1024:.2f} MB")
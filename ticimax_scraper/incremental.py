@@ -0,0 +1,161 @@
+import csv
+import datetime
+import io
+import json
+import math
+import mmap
+
+CSV_COLUMNS = ['Product URL', 'Product Name', 'Price', 'Description', 'Images', 'Variations', 'Sizes']
+LIST_FIELDS = {'Images': 'images', 'Variations': 'variations', 'Sizes': 'sizes'}
+TEXT_FIELDS = {'Product URL': 'product_url', 'Product Name': 'name', 'Price': 'price', 'Description': 'description'}
+
+
+def product_to_row(product):
+    """Flatten a product_info dict into a CSV row, the same way save_to_csv does"""
+    row = {column: product.get(key, '') for column, key in TEXT_FIELDS.items()}
+    for column, key in LIST_FIELDS.items():
+        row[column] = '; '.join(product.get(key, []))
+    return row
+
+
+def row_to_product(row):
+    """Turn a CSV row back into a product_info dict"""
+    product = {key: row.get(column, '') for column, key in TEXT_FIELDS.items()}
+    for column, key in LIST_FIELDS.items():
+        value = row.get(column, '')
+        product[key] = value.split('; ') if value else []
+    return product
+
+
+class CSVIndex:
+    """Memory-mapped view of a previous output CSV, indexed by Product URL
+
+    Only the byte range of every record is kept in memory; a row is decoded
+    when it is asked for, so large catalogs are never loaded as a whole.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, 'rb')
+        self.offsets = {}
+        self.mm = None
+        if self.file.seek(0, 2) == 0:
+            self.columns = CSV_COLUMNS
+            return
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.columns = None
+        self._build_index()
+
+    def _build_index(self):
+        mm = self.mm
+        start = 0
+        quotes = 0
+        while True:
+            line = mm.readline()
+            if not line:
+                break
+            # A record can span lines when a quoted field contains newlines;
+            # it only ends once every opened quote has been closed
+            quotes += line.count(b'"')
+            if quotes % 2:
+                continue
+            end = mm.tell()
+            if self.columns is None:
+                self.columns = self._parse(start, end)
+            else:
+                values = self._parse(start, end)
+                if values:
+                    self.offsets[values[0]] = (start, end)
+            start = end
+            quotes = 0
+
+    def _parse(self, start, end):
+        text = self.mm[start:end].decode('utf-8-sig')
+        return next(csv.reader(io.StringIO(text)), [])
+
+    def __contains__(self, url):
+        return url in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def urls(self):
+        return list(self.offsets)
+
+    def get_row(self, url):
+        start, end = self.offsets[url]
+        return dict(zip(self.columns, self._parse(start, end)))
+
+    def get_product(self, url):
+        return row_to_product(self.get_row(url))
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+        self.file.close()
+
+
+def select_urls(current_urls, previous, refresh_fraction=0.1, today=None, lastmods=None, since=None):
+    """Split the discovered URLs into new ones and today's slice of known ones to re-check
+
+    Known URLs are cut into ceil(1 / refresh_fraction) slices and the slice is
+    picked from the date, so every known product is refreshed once per cycle.
+    Known URLs whose sitemap lastmod is newer than `since` are always refreshed.
+    """
+    new_urls = [url for url in current_urls if url not in previous]
+    known_urls = sorted(url for url in current_urls if url in previous)
+    refresh_urls = []
+    if refresh_fraction > 0 and known_urls:
+        slice_count = max(1, math.ceil(1 / refresh_fraction))
+        today = today or datetime.date.today()
+        refresh_urls = known_urls[today.toordinal() % slice_count::slice_count]
+    if lastmods and since is not None:
+        scheduled = set(refresh_urls)
+        refresh_urls += [url for url in known_urls
+                         if url not in scheduled and lastmods.get(url) and lastmods[url] > since]
+    return new_urls, sorted(refresh_urls)
+
+
+def merge_incremental(previous, current_urls, fetched, write, keep_missing=False):
+    """Merge freshly fetched products with the previous output
+
+    `previous` and `fetched` are CSVIndex views of the old output and of this
+    run's results. Every merged product is passed to `write` in URL order, so
+    neither side has to be loaded into memory. Returns a report of added,
+    changed and removed URLs. With `keep_missing` (discovery looks broken),
+    previous products missing from `current_urls` are kept, not removed.
+    """
+    current = set(current_urls)
+    report = {'added': [], 'changed': [], 'removed': [], 'unchanged': 0, 'kept_from_previous': 0}
+
+    for url in sorted(current | set(previous.urls()) if keep_missing else current):
+        if url in fetched:
+            row = fetched.get_row(url)
+            if url not in previous:
+                report['added'].append(url)
+            elif row != previous.get_row(url):
+                report['changed'].append(url)
+            else:
+                report['unchanged'] += 1
+            write(row_to_product(row))
+        elif url in previous:
+            # Not refreshed this run (or the refresh failed): keep the last known data
+            write(previous.get_product(url))
+            report['kept_from_previous'] += 1
+
+    if not keep_missing:
+        report['removed'] = sorted(url for url in previous.urls() if url not in current)
+    return report
+
+
+def write_change_report(report, filename='bbeox_changes_report.json'):
+    """Write the added/changed/removed report and print a short summary"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print("\nIncremental Run Summary:")
+    print(f"- Added: {len(report['added'])}")
+    print(f"- Changed: {len(report['changed'])}")
+    print(f"- Removed: {len(report['removed'])}")
+    print(f"- Unchanged: {report['unchanged']}, kept from previous run: {report['kept_from_previous']}")
+    print(f"Change report saved to {filename}")
+    return filename
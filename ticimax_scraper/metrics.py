@@ -0,0 +1,243 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds of the histogram buckets, Prometheus style (a final +Inf bucket is implied)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTES_BUCKETS = tuple(1024 * 4 ** power for power in range(9))  # 1 KB .. 64 MB
+
+# name -> (type, help text, buckets for histograms)
+METRIC_TYPES = {
+    'http_request_seconds': ('histogram', 'Total time of an HTTP request including the body download', LATENCY_BUCKETS),
+    'http_first_byte_seconds': ('histogram', 'Time until the response headers arrived (DNS, connect, TLS and server time)', LATENCY_BUCKETS),
+    'http_response_bytes': ('histogram', 'Size of downloaded response bodies', BYTES_BUCKETS),
+    'http_responses': ('counter', 'HTTP responses by status code', None),
+    'http_errors': ('counter', 'HTTP requests that raised, by exception type', None),
+    'http_connections': ('counter', 'Connections opened per host (TLS ones include a handshake)', None),
+    'http_connect_seconds': ('histogram', 'Time to open a connection, including the TLS handshake', LATENCY_BUCKETS),
+    'parse_seconds': ('histogram', 'Time spent building the HTML tree of a page', LATENCY_BUCKETS),
+    'scan_seconds': ('histogram', 'Time spent collecting every selector match in one walk over the tree', LATENCY_BUCKETS),
+    'structured_data_seconds': ('histogram', 'Time spent reading JSON-LD / inline product JSON', LATENCY_BUCKETS),
+    'extract_seconds': ('histogram', 'Time spent in one field extractor', LATENCY_BUCKETS),
+    'extract_errors': ('counter', 'Field extractors that raised', None),
+    'write_seconds': ('histogram', 'Time spent handing one product to an output writer', LATENCY_BUCKETS),
+}
+
+
+class Histogram:
+    """Bucketed latency / size distribution; observing is a bisect and two additions"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        for index, value in enumerate(counts):
+            self.counts[index] += value
+        self.sum += total
+        self.count += count
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the `fraction` quantile (None in the +Inf bucket)"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+
+class MetricsRegistry:
+    """Histograms and counters keyed by metric name and label values
+
+    All updates go through one lock; with a few recordings per page the cost
+    is a few microseconds, small next to downloading and parsing the page.
+    Set `enabled` to False to turn every recording into a no-op.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(METRIC_TYPES[name][2])
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def drain(self):
+        """Return everything recorded so far as plain data and start over
+
+        Used to ship the metrics of a worker process back to the parent.
+        """
+        with self.lock:
+            snapshot = {
+                'histograms': [(key, histogram.counts, histogram.sum, histogram.count)
+                               for key, histogram in self.histograms.items()],
+                'counters': list(self.counters.items()),
+            }
+            self.histograms = {}
+            self.counters = {}
+        return snapshot
+
+    def merge(self, snapshot):
+        """Add a snapshot from drain() into this registry"""
+        with self.lock:
+            for key, counts, total, count in snapshot['histograms']:
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(METRIC_TYPES[key[0]][2])
+                histogram.merge(counts, total, count)
+            for key, amount in snapshot['counters']:
+                self.counters[key] = self.counters.get(key, 0) + amount
+
+    def to_prometheus(self):
+        """The metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, (kind, help_text, buckets) in METRIC_TYPES.items():
+            histograms = sorted(((labels, h) for (metric, labels), h in self.histograms.items() if metric == name),
+                                key=lambda item: item[0])
+            counters = sorted((labels, v) for (metric, labels), v in self.counters.items() if metric == name)
+            if not histograms and not counters:
+                continue
+            metric = f"bbeox_{name}" + ('_total' if kind == 'counter' else '')
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in counters:
+                lines.append(f"{metric}{format_labels(labels)} {value}")
+            for labels, histogram in histograms:
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{metric}_sum{format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{metric}_count{format_labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """Count, total, mean and approximate p50/p95/p99 per histogram, plus every counter"""
+        result = {'histograms': {}, 'counters': {}}
+        for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+            result['histograms'][name + format_labels(labels)] = {
+                'count': histogram.count,
+                'sum': round(histogram.sum, 6),
+                'mean': round(histogram.sum / histogram.count, 6) if histogram.count else 0.0,
+                'p50': histogram.quantile(0.50),
+                'p95': histogram.quantile(0.95),
+                'p99': histogram.quantile(0.99),
+            }
+        for (name, labels), value in sorted(self.counters.items()):
+            result['counters'][name + format_labels(labels)] = value
+        return result
+
+    def write(self, prometheus_file=None, json_file=None):
+        if prometheus_file:
+            with open(prometheus_file, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+        if json_file:
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump(self.summary(), f, indent=2)
+
+    def report(self):
+        """Print where the time went, one line per timed step"""
+        print("\nTiming Summary:")
+        totals = {}
+        for (name, _), histogram in self.histograms.items():
+            if name.endswith('_seconds'):
+                total, count = totals.get(name, (0.0, 0))
+                totals[name] = (total + histogram.sum, count + histogram.count)
+        for name, (total, count) in sorted(totals.items(), key=lambda item: -item[1][0]):
+            print(f"- {name[:-len('_seconds')]}: {total:.2f}s over {count} calls "
+                  f"({total / count * 1000:.2f} ms each)")
+        errors = sum(value for (name, _), value in self.counters.items() if name.endswith('_errors'))
+        print(f"- Errors: {errors}")
+
+
+def format_labels(labels):
+    """Render label pairs as {key="value",...}, escaped the way Prometheus expects"""
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+# Process-wide registry the scrapers record into
+registry = MetricsRegistry()
+
+
+def instrument_session(session, metrics=None):
+    """Record latency, first-byte time, body size, status and errors of every request made through `session`"""
+    metrics = metrics or registry
+    request = session.request
+
+    def timed_request(method, url, *args, **kwargs):
+        if not metrics.enabled:
+            return request(method, url, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            response = request(method, url, *args, **kwargs)
+        except Exception as e:
+            metrics.inc('http_errors', error=type(e).__name__)
+            raise
+        metrics.observe('http_request_seconds', time.perf_counter() - start, method=method.upper())
+        metrics.observe('http_first_byte_seconds', response.elapsed.total_seconds(), method=method.upper())
+        if not kwargs.get('stream'):
+            # Streamed bodies are read later by the caller and are not counted
+            metrics.observe('http_response_bytes', len(response.content))
+        metrics.inc('http_responses', status=response.status_code)
+        return response
+
+    session.request = timed_request
+    return session
+
+
+def reset_registry(enabled=True):
+    """Start a worker process with an empty registry that records only if the parent's does
+
+    Used as a process pool initializer, so parse workers follow the parent's
+    COLLECT_METRICS setting whatever their imports set it to.
+    """
+    registry.enabled = enabled
+    registry.lock = threading.Lock()
+    registry.histograms = {}
+    registry.counters = {}
+
+
+def run_instrumented(function, *args):
+    """Call `function` in a worker process and return (result, metrics recorded by the call)"""
+    registry.drain()
+    result = function(*args)
+    return result, registry.drain()
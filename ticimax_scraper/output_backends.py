@@ -0,0 +1,270 @@
+import csv
+import json
+import os
+import re
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed for Parquet / Arrow output
+    pa = None
+
+from ticimax_scraper.incremental import row_to_product
+from ticimax_scraper.stream_writer import StreamingCSVWriter
+
+LIST_KEYS = ['images', 'variations', 'sizes']
+CURRENCY_SIGNS = '₺$€£¥'
+
+
+def parse_price(text):
+    """Split a scraped price like '₺1.549,99' into (1549.99, '₺'); the amount is None when there is none"""
+    text = (text or '').strip()
+    currency = next((sign for sign in text if sign in CURRENCY_SIGNS), '')
+    number = re.sub(r'[^\d,.]', '', text)
+    if ',' in number and '.' in number:
+        # Whichever separator comes last is the decimal one
+        if number.rfind(',') > number.rfind('.'):
+            number = number.replace('.', '').replace(',', '.')
+        else:
+            number = number.replace(',', '')
+    elif ',' in number:
+        number = number.replace(',', '.')
+    elif number.count('.') > 1 or re.search(r'\.\d{3}$', number):
+        # Only thousands separators, e.g. '1.549'
+        number = number.replace('.', '')
+    try:
+        return float(number), currency
+    except ValueError:
+        return None, currency
+
+
+def product_record(product):
+    """A product_info dict with real list fields and a typed price, as the JSONL / columnar outputs store it"""
+    amount, currency = parse_price(product.get('price', ''))
+    return {
+        'product_url': product.get('product_url', ''),
+        'name': product.get('name', ''),
+        'price': product.get('price', ''),
+        'price_amount': amount,
+        'currency': currency,
+        'description': product.get('description', ''),
+        **{key: list(product.get(key, [])) for key in LIST_KEYS},
+    }
+
+
+class JSONLWriter:
+    """Streams one JSON object per product into a JSON Lines file
+
+    Same interface as StreamingCSVWriter: rows are buffered, written every
+    `batch_size` products and fsynced every `checkpoint_every` products.
+    """
+
+    def __init__(self, filename, resume=False, batch_size=50, checkpoint_every=500):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.checkpoint_every = checkpoint_every
+        self.buffer = []
+        self.count = 0
+        self.since_checkpoint = 0
+        self.file = open(filename, 'a' if resume else 'w', encoding='utf-8')
+
+    def write(self, product):
+        self.buffer.append(product)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.file.writelines(json.dumps(product_record(product), ensure_ascii=False) + '\n'
+                             for product in self.buffer)
+        self.file.flush()
+        self.count += len(self.buffer)
+        self.since_checkpoint += len(self.buffer)
+        self.buffer = []
+        if self.since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        os.fsync(self.file.fileno())
+        self.since_checkpoint = 0
+
+    def close(self, completed=True):
+        self.flush()
+        self.checkpoint()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(completed=exc_type is None)
+
+
+class ColumnarWriter:
+    """Writes products to a Parquet or Arrow IPC file, one row group per `batch_size` products
+
+    List fields stay list<string> columns and the price is also stored as a
+    float64 `price_amount` with its `currency`, so readers neither split
+    strings nor parse prices. Only one row group is held in memory. A Parquet
+    file is only readable once closed, so it cannot be appended to on resume.
+    Needs pyarrow.
+    """
+
+    def __init__(self, filename, format='parquet', batch_size=1000, checkpoint_every=None):
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet / Arrow output (pip install pyarrow)")
+        self.filename = filename
+        self.batch_size = batch_size
+        self.buffer = []
+        self.count = 0
+        self.schema = pa.schema([
+            ('product_url', pa.string()),
+            ('name', pa.string()),
+            ('price', pa.string()),
+            ('price_amount', pa.float64()),
+            ('currency', pa.string()),
+            ('description', pa.string()),
+            *[(key, pa.list_(pa.string())) for key in LIST_KEYS],
+        ])
+        if format == 'parquet':
+            self.writer = pq.ParquetWriter(filename, self.schema, compression='zstd')
+        elif format == 'arrow':
+            self.writer = pa.ipc.new_file(filename, self.schema)
+        else:
+            raise ValueError(f"Unknown columnar format {format!r}, choose 'parquet' or 'arrow'")
+
+    def write(self, product):
+        self.buffer.append(product_record(product))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.writer.write_table(pa.Table.from_pylist(self.buffer, schema=self.schema))
+        self.count += len(self.buffer)
+        self.buffer = []
+
+    def close(self, completed=True):
+        self.flush()
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(completed=exc_type is None)
+
+
+# Formats written by ColumnarWriter
+COLUMNAR_FORMATS = ('.parquet', '.arrow')
+
+# File extension -> output backend
+OUTPUT_FORMATS = {
+    '.csv': lambda filename, **options: StreamingCSVWriter(filename, journal=False, **options),
+    '.jsonl': lambda filename, **options: JSONLWriter(filename, **options),
+    '.parquet': lambda filename, **options: ColumnarWriter(filename, 'parquet', **options),
+    '.arrow': lambda filename, **options: ColumnarWriter(filename, 'arrow', **options),
+}
+
+
+def output_format(filename):
+    """The OUTPUT_FORMATS key for `filename`, ignoring a trailing .partial"""
+    name = filename[:-len('.partial')] if filename.endswith('.partial') else filename
+    extension = os.path.splitext(name)[1].lower()
+    if extension not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {extension!r}, choose from {', '.join(OUTPUT_FORMATS)}")
+    return extension
+
+
+def check_output(filename):
+    """Fail before scraping when `filename` has an unknown extension or its backend is not installed"""
+    if output_format(filename) in COLUMNAR_FORMATS and pa is None:
+        raise ImportError(f"pyarrow is required to write {filename} (pip install pyarrow)")
+
+
+def open_writer(filename, **options):
+    """Open the streaming writer matching the extension of `filename`"""
+    return OUTPUT_FORMATS[output_format(filename)](filename, **options)
+
+
+def save_products(products_data, filename):
+    """Save a list of product dicts in the format given by the file extension"""
+    with open_writer(filename) as writer:
+        for product in products_data:
+            if product:
+                writer.write(product)
+    print(f"Data saved to {filename}")
+    return filename
+
+
+def unsorted_name(filename):
+    """Where the records for `filename` are streamed during the crawl: bbeox.jsonl -> bbeox.unsorted.jsonl"""
+    root, extension = os.path.splitext(filename)
+    return f"{root}.unsorted{extension}"
+
+
+class RecordIndex:
+    """Records of a JSONL / Parquet / Arrow output, looked up by product URL
+
+    A JSONL file is indexed by the byte range of each line and a record is
+    decoded when asked for; a columnar file is read as one Arrow table, which
+    keeps the list columns compact. The last record of a URL wins.
+    """
+
+    def __init__(self, filename):
+        self.offsets = {}
+        self.file = None
+        self.table = None
+        if output_format(filename) == '.jsonl':
+            self.file = open(filename, 'rb')
+            start = 0
+            for line in self.file:
+                if line.strip():
+                    self.offsets[json.loads(line)['product_url']] = (start, len(line))
+                start += len(line)
+        else:
+            if pa is None:
+                raise ImportError("pyarrow is required to read Parquet / Arrow output (pip install pyarrow)")
+            if output_format(filename) == '.parquet':
+                self.table = pq.read_table(filename)
+            else:
+                with pa.memory_map(filename) as source:
+                    self.table = pa.ipc.open_file(source).read_all()
+            for position, url in enumerate(self.table.column('product_url').to_pylist()):
+                self.offsets[url] = position
+
+    def __contains__(self, url):
+        return url in self.offsets
+
+    def get(self, url):
+        if self.file is not None:
+            start, length = self.offsets[url]
+            self.file.seek(start)
+            return json.loads(self.file.read(length))
+        return self.table.slice(self.offsets[url], 1).to_pylist()[0]
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        self.table = None
+
+
+def sort_output(streamed, csv_file, filename, **options):
+    """Write the records streamed to `streamed` into `filename`, in the row order of `csv_file`
+
+    Records keep the list fields and prices exactly as they were scraped.
+    Rows of the CSV that were not streamed in this run (products kept from
+    the previous run in incremental mode, or saved before a resume) are
+    taken from the CSV instead.
+    """
+    index = RecordIndex(streamed)
+    try:
+        with open(csv_file, newline='', encoding='utf-8-sig') as f, open_writer(filename, **options) as writer:
+            for row in csv.DictReader(f):
+                url = row.get('Product URL', '')
+                writer.write(index.get(url) if url in index else row_to_product(row))
+    finally:
+        index.close()
+    return filename
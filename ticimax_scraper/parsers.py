@@ -0,0 +1,40 @@
+import importlib.util
+
+from bs4 import BeautifulSoup
+
+# BeautifulSoup tree builders, fastest first. 'lxml' uses the libxml2 C parser,
+# 'html.parser' is the pure-Python parser from the standard library. 'html5lib'
+# parses exactly like a browser but is several times slower than html.parser;
+# it is only worth it for pages the other two get wrong.
+PARSER_BACKENDS = {
+    'lxml': 'lxml',
+    'html.parser': None,
+    'html5lib': 'html5lib',
+}
+DEFAULT_BACKEND = 'lxml'
+
+_warned = set()
+
+
+def available_backends():
+    """Return the backends whose parser package is installed"""
+    return [name for name, module in PARSER_BACKENDS.items()
+            if module is None or importlib.util.find_spec(module) is not None]
+
+
+def resolve_backend(backend=None):
+    """Return `backend` if it can be used here, otherwise fall back to html.parser"""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend {backend!r}, choose from {', '.join(PARSER_BACKENDS)}")
+    if backend in available_backends():
+        return backend
+    if backend not in _warned:
+        _warned.add(backend)
+        print(f"Parser backend {backend!r} is not installed, falling back to 'html.parser'")
+    return 'html.parser'
+
+
+def make_soup(content, backend=None):
+    """Parse page content into a BeautifulSoup tree with the chosen backend"""
+    return BeautifulSoup(content, resolve_backend(backend))
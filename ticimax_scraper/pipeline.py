@@ -0,0 +1,172 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ticimax_scraper.fetch_engine import HostRateLimiter
+from ticimax_scraper.metrics import registry, reset_registry, run_instrumented
+
+_DONE = object()
+
+# Parse processes are never forked from the running scraper: a fork copies every lock a
+# fetch thread happens to hold (metrics, connection stats, logging, the cache) into the
+# child, where nothing will ever release it
+PARSE_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class StageStats:
+    """Busy and blocked time of one pipeline stage, summed over its workers"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0  # Time spent waiting on a full downstream queue
+        self.failed = []  # URLs this stage could not handle
+        self.lock = threading.Lock()
+
+    def add(self, busy, blocked=0.0):
+        with self.lock:
+            self.items += 1
+            self.busy += busy
+            self.blocked += blocked
+
+    def fail(self, url):
+        with self.lock:
+            self.failed.append(url)
+
+    def utilization(self, wall):
+        return self.busy / (wall * self.workers) if wall else 0.0
+
+
+def _put(target, item):
+    start = time.perf_counter()
+    target.put(item)
+    return time.perf_counter() - start
+
+
+def run_pipeline(urls, fetch, parse, write, fetch_workers=8, parse_workers=None,
+                 queue_size=64, limiter=None, requests_per_second=1.0):
+    """Run fetch -> parse -> write as separate stages connected by bounded queues
+
+    - fetch(url) runs on `fetch_workers` I/O threads and returns the raw page bytes (or None)
+    - parse(content, url) runs in a process pool with `parse_workers` processes; the
+      workers import `parse` afresh, so it must be a module-level function (or a
+      functools.partial of one) and only sees configuration passed as arguments
+    - write(result) runs on a single writer thread, in completion order
+
+    Full queues block the stage in front of them, so a slow stage throttles
+    the others instead of letting memory grow. Returns the per-stage stats;
+    URLs whose fetch returned None or raised, or whose parse raised, are in
+    the `failed` list of their stage. An exception from `write` stops the
+    writer and is raised again once every stage has finished.
+    """
+    parse_workers = parse_workers or os.cpu_count() or 1
+    limiter = limiter or HostRateLimiter(requests_per_second)
+    url_iter = iter(urls)
+    url_lock = threading.Lock()
+    parse_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    stats = {
+        'fetch': StageStats('fetch', fetch_workers),
+        'parse': StageStats('parse', parse_workers),
+        'write': StageStats('write', 1),
+    }
+
+    def next_url():
+        with url_lock:
+            return next(url_iter, _DONE)
+
+    def fetch_worker():
+        while True:
+            url = next_url()
+            if url is _DONE:
+                return
+            limiter.wait(url)
+            start = time.perf_counter()
+            try:
+                content = fetch(url)
+            except Exception as e:
+                print(f"Error fetching {url}: {e}")
+                content = None
+            if content is None:
+                stats['fetch'].fail(url)
+            busy = time.perf_counter() - start
+            blocked = _put(parse_queue, (url, content)) if content is not None else 0.0
+            stats['fetch'].add(busy, blocked)
+
+    def parse_worker(executor):
+        # Each feeder thread keeps one page in flight in the process pool
+        while True:
+            item = parse_queue.get()
+            if item is _DONE:
+                return
+            url, content = item
+            start = time.perf_counter()
+            try:
+                # The metrics recorded in the worker process come back with the result
+                result, metrics = executor.submit(run_instrumented, parse, content, url).result()
+                if registry.enabled:
+                    registry.merge(metrics)
+            except Exception as e:
+                print(f"Error extracting product details from {url}: {e}")
+                stats['parse'].fail(url)
+                result = None
+            busy = time.perf_counter() - start
+            blocked = _put(write_queue, result) if result else 0.0
+            stats['parse'].add(busy, blocked)
+
+    write_errors = []
+
+    def write_worker():
+        while True:
+            result = write_queue.get()
+            if result is _DONE:
+                return
+            if write_errors:
+                continue  # Keep draining so the other stages can finish
+            start = time.perf_counter()
+            try:
+                write(result)
+            except Exception as e:
+                print(f"Error writing {result.get('product_url', 'result')}: {e}")
+                write_errors.append(e)
+            stats['write'].add(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context(PARSE_START_METHOD),
+                             initializer=reset_registry, initargs=(registry.enabled,)) as executor:
+        fetchers = [threading.Thread(target=fetch_worker, daemon=True) for _ in range(fetch_workers)]
+        parsers = [threading.Thread(target=parse_worker, args=(executor,), daemon=True) for _ in range(parse_workers)]
+        writer = threading.Thread(target=write_worker, daemon=True)
+        for thread in fetchers + parsers + [writer]:
+            thread.start()
+
+        for thread in fetchers:
+            thread.join()
+        for _ in parsers:
+            parse_queue.put(_DONE)
+        for thread in parsers:
+            thread.join()
+        write_queue.put(_DONE)
+        writer.join()
+
+    wall = time.perf_counter() - started
+    print_pipeline_report(stats, wall)
+    if write_errors:
+        raise RuntimeError(f"Writer stage failed, output is incomplete: {write_errors[0]}") from write_errors[0]
+    return stats
+
+
+def print_pipeline_report(stats, wall):
+    """Print utilization per stage; the busiest stage is the one limiting throughput"""
+    print(f"\nPipeline Summary ({wall:.1f}s wall time):")
+    for stage in stats.values():
+        print(f"- {stage.name}: {stage.items} items, {stage.workers} workers, "
+              f"{stage.utilization(wall) * 100:.0f}% busy, {stage.blocked:.1f}s blocked on a full queue, "
+              f"{len(stage.failed)} failed")
+    bottleneck = max(stats.values(), key=lambda stage: stage.utilization(wall))
+    print(f"Bottleneck stage: {bottleneck.name}")
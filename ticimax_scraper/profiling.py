@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+import tracemalloc
+
+from ticimax_scraper.document import ProductPage
+from ticimax_scraper.extractors import STRATEGIES, parse_page
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def builtin_name(function):
+    module = getattr(function, '__module__', None) or ''
+    name = getattr(function, '__qualname__', None) or getattr(function, '__name__', repr(function))
+    return f"{module}.{name}" if module else name
+
+
+class ExtractionProfiler:
+    """Deterministic profile of page parsing and every field extractor, section by section
+
+    Each section (parse, scan, structured, then one per field) runs under
+    sys.setprofile, which records the self time of every Python and C call
+    under its full call stack, and under tracemalloc, which records the peak
+    and net memory the section allocated. Tracing makes everything several
+    times slower, so the times are for comparing sections, not absolute.
+    """
+
+    def __init__(self):
+        self.folded = {}  # 'section;caller;callee' -> self seconds
+        self.sections = {}  # section -> {'calls', 'seconds', 'cpu', 'peak', 'net'}
+        self.pages = 0
+        self.stack = []
+        self.section = None
+
+    def _callback(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == 'call':
+            self.stack.append([frame_name(frame), now, 0.0])
+        elif event == 'c_call':
+            self.stack.append([builtin_name(arg), now, 0.0])
+        elif self.stack:  # 'return', 'c_return' or 'c_exception'
+            name, start, children = self.stack.pop()
+            elapsed = now - start
+            path = ';'.join([self.section] + [entry[0] for entry in self.stack] + [name])
+            self.folded[path] = self.folded.get(path, 0.0) + elapsed - children
+            if self.stack:
+                self.stack[-1][2] += elapsed
+
+    def run(self, section, function, *args):
+        """Call `function(*args)` as one sample of `section` and return its result"""
+        self.section = section
+        self.stack = []
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        cpu = time.process_time()
+        start = time.perf_counter()
+        sys.setprofile(self._callback)
+        try:
+            return function(*args)
+        finally:
+            sys.setprofile(None)
+            elapsed = time.perf_counter() - start
+            cpu = time.process_time() - cpu
+            after, peak = tracemalloc.get_traced_memory()
+            stats = self.sections.setdefault(section, {'calls': 0, 'seconds': 0.0, 'cpu': 0.0, 'peak': 0, 'net': 0})
+            stats['calls'] += 1
+            stats['seconds'] += elapsed
+            stats['cpu'] += cpu
+            stats['peak'] = max(stats['peak'], peak - before)
+            stats['net'] += after - before
+
+    def profile_page(self, url, content, strategy='final', backend='lxml', single_pass=True):
+        """Profile parsing one page and running every field extractor of `strategy` on it"""
+        page = parse_page(url, content, backend, single_pass)
+        self.run('structured', ProductPage.structured.fget, page)
+        self.run('parse', ProductPage.soup.fget, page)
+        if page.rules:
+            self.run('scan', ProductPage.doc.fget, page)
+        for field, extractor in STRATEGIES[strategy]:
+            try:
+                self.run(field, extractor, page)
+            except Exception as e:
+                print(f"Error profiling {field} on {url}: {e}")
+        self.pages += 1
+
+    def profile_pages(self, pages, **options):
+        """Profile every (url, content) pair with tracemalloc running"""
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            for url, content in pages:
+                self.profile_page(url, content, **options)
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+
+    def write_folded(self, filename):
+        """Write the stacks in the folded format flamegraph.pl, speedscope and inferno read (microseconds)"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            for path, seconds in sorted(self.folded.items()):
+                micros = round(seconds * 1_000_000)
+                if micros > 0:
+                    f.write(f"{path} {micros}\n")
+
+    def report(self, top=10):
+        total = sum(stats['seconds'] for stats in self.sections.values()) or 1.0
+        print(f"\nExtraction Profile ({self.pages} pages, times include tracing overhead):")
+        for section, stats in sorted(self.sections.items(), key=lambda item: -item[1]['seconds']):
+            print(f"- {section}: {stats['seconds'] / self.pages * 1000:.2f} ms/page "
+                  f"({stats['seconds'] / total * 100:.1f}%), CPU {stats['cpu'] / self.pages * 1000:.2f} ms/page, "
+                  f"peak alloc {stats['peak'] / 1024:.1f} KB, net alloc {stats['net'] / self.pages / 1024:.1f} KB/page")
+
+        # Self time per function over all sections
+        functions = {}
+        for path, seconds in self.folded.items():
+            name = path.rsplit(';', 1)[-1]
+            functions[name] = functions.get(name, 0.0) + seconds
+        print(f"Top {top} functions by self time:")
+        for name, seconds in sorted(functions.items(), key=lambda item: -item[1])[:top]:
+            print(f"- {name}: {seconds / self.pages * 1000:.2f} ms/page")
@@ -0,0 +1,266 @@
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+from ticimax_scraper.fetch_engine import DEFAULT_TIMEOUT, TokenBucket
+
+# Responses worth retrying: throttling and server-side failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Responses that mean "slow down" rather than "broken"
+THROTTLE_STATUSES = {429, 503}
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError)
+
+
+def retry_after_seconds(response):
+    """The Retry-After header of `response` in seconds (it may be a number or an HTTP date), or None"""
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    """Rate, concurrency and circuit breaker state of one host"""
+
+    def __init__(self, rate, concurrency):
+        self.bucket = TokenBucket(rate)
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        self.latency = None  # Exponentially weighted moving average, seconds
+        self.successes = 0
+        self.last_decrease = 0.0
+        self.failures = 0  # Consecutive failures, for the circuit breaker
+        self.opened_at = None
+        self.probing = False
+
+
+class AdaptiveRateLimiter:
+    """Per-host request pacing that adapts to how the server responds
+
+    A drop-in for HostRateLimiter (`wait(url)`) that additionally wraps a
+    session with `install(session)`. Every request then gets a timeout and is
+    retried on connection errors, timeouts and 429/5xx responses with full
+    jitter exponential backoff, waiting at least as long as Retry-After asks.
+
+    Rate and concurrency follow AIMD: each fast success raises the host's
+    rate a little (and its concurrency by one every `concurrency` successes),
+    while a 429/503, a timeout or a latency above `target_latency` halves
+    both, at most once per `decrease_interval` seconds. After
+    `failure_threshold` failures in a row the host's circuit opens and
+    requests to it wait for `open_seconds`; then a single probe request is
+    sent while the others keep waiting for it to decide whether the circuit
+    closes again.
+    """
+
+    def __init__(self, requests_per_second=1.0, min_rate=0.2, max_rate=5.0, max_concurrency=8,
+                 target_latency=2.0, timeout=DEFAULT_TIMEOUT, max_retries=3, backoff=1.0, max_backoff=60.0,
+                 failure_threshold=5, open_seconds=30.0, increase=0.05, decrease_interval=2.0):
+        self.initial_rate = requests_per_second
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, requests_per_second)
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.increase = increase
+        self.decrease_interval = decrease_interval
+        self.hosts = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.retries = 0
+        self.throttled = 0
+        self.circuit_trips = 0
+        self.given_up = 0
+
+    def host(self, url):
+        name = urlparse(url).netloc
+        with self.lock:
+            if name not in self.hosts:
+                self.hosts[name] = HostState(self.initial_rate, max(1, min(self.max_concurrency, round(self.initial_rate))))
+            return self.hosts[name]
+
+    def wait(self, url):
+        """Block until a request to the host of `url` fits in its current rate"""
+        self.host(url).bucket.acquire()
+        # The next request from this thread to the same URL has already been paced
+        self.local.paced = url
+
+    # Circuit breaker
+
+    def _wait_for_circuit(self, state):
+        """Block while the circuit of the host is open; True when this thread sends the probe"""
+        with state.condition:
+            while state.opened_at is not None:
+                remaining = self.open_seconds - (time.monotonic() - state.opened_at)
+                if remaining <= 0 and not state.probing:
+                    # Half-open: let exactly one request through to test the host
+                    state.probing = True
+                    return True
+                # Woken up early when the probe in flight succeeds or fails
+                state.condition.wait(remaining if remaining > 0 else None)
+            return False
+
+    def _end_probe(self, state):
+        with state.condition:
+            state.probing = False
+            state.condition.notify_all()
+
+    def _record_failure(self, url, state):
+        with state.condition:
+            state.failures += 1
+            state.probing = False
+            if state.opened_at is not None or state.failures >= self.failure_threshold:
+                if state.opened_at is None:
+                    self.circuit_trips += 1
+                    print(f"Circuit opened for {urlparse(url).netloc} after {state.failures} failures, "
+                          f"pausing requests for {self.open_seconds:.0f}s")
+                state.opened_at = time.monotonic()
+            state.condition.notify_all()
+
+    def _record_success(self, url, state):
+        with state.condition:
+            if state.opened_at is not None:
+                print(f"Circuit closed for {urlparse(url).netloc}")
+            state.failures = 0
+            state.opened_at = None
+            state.probing = False
+            state.condition.notify_all()
+
+    # Rate and concurrency control
+
+    def _acquire_slot(self, state):
+        with state.condition:
+            while state.in_flight >= state.concurrency:
+                state.condition.wait()
+            state.in_flight += 1
+
+    def _release_slot(self, state):
+        with state.condition:
+            state.in_flight -= 1
+            # Threads waiting for the circuit share the condition, so wake everyone
+            state.condition.notify_all()
+
+    def _speed_up(self, state, latency):
+        with state.condition:
+            state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+            slow = state.latency > self.target_latency
+            if not slow:
+                state.bucket.rate = min(self.max_rate, state.bucket.rate + self.increase)
+                state.bucket.capacity = max(1.0, state.bucket.rate)
+                state.successes += 1
+                if state.successes >= state.concurrency and state.concurrency < self.max_concurrency:
+                    state.concurrency += 1
+                    state.successes = 0
+                    state.condition.notify_all()
+        if slow:
+            # The server is getting slower: back off before it starts refusing requests
+            self._slow_down(state)
+
+    def _slow_down(self, state):
+        with state.condition:
+            now = time.monotonic()
+            # Responses to requests sent before the last decrease would halve the rate again
+            if now - state.last_decrease < self.decrease_interval:
+                return
+            state.last_decrease = now
+            state.bucket.rate = max(self.min_rate, state.bucket.rate / 2)
+            state.bucket.capacity = max(1.0, state.bucket.rate)
+            state.concurrency = max(1, state.concurrency // 2)
+            state.successes = 0
+
+    def _backoff(self, attempt, response=None):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        retry_after = retry_after_seconds(response)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_backoff))
+        time.sleep(delay)
+
+    def request(self, send, method, url, **kwargs):
+        """Send a request through `send` with pacing, timeouts, retries and the circuit breaker"""
+        state = self.host(url)
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(self.max_retries + 1):
+            probe = self._wait_for_circuit(state)
+            if attempt or getattr(self.local, 'paced', None) != url:
+                state.bucket.acquire()
+            self.local.paced = None
+
+            self._acquire_slot(state)
+            start = time.perf_counter()
+            try:
+                response = send(method, url, **kwargs)
+            except RETRY_EXCEPTIONS as e:
+                error = e
+                response = None
+            except Exception:
+                if probe:
+                    # Not the host's fault: let the next request probe it
+                    self._end_probe(state)
+                raise
+            finally:
+                self._release_slot(state)
+            latency = time.perf_counter() - start
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                self._record_success(url, state)
+                self._speed_up(state, latency)
+                return response
+
+            throttled = response is not None and response.status_code in THROTTLE_STATUSES
+            if throttled or response is None:
+                self._slow_down(state)
+            if throttled:
+                with self.lock:
+                    self.throttled += 1
+            self._record_failure(url, state)
+            if attempt == self.max_retries:
+                break
+            with self.lock:
+                self.retries += 1
+            if response is not None:
+                # Give the connection back to the pool before waiting; the headers stay readable
+                response.close()
+            self._backoff(attempt, response)
+
+        with self.lock:
+            self.given_up += 1
+        if response is None:
+            raise error
+        return response  # The caller's raise_for_status reports the last status
+
+    def install(self, session):
+        """Route every request of `session` through this controller"""
+        send = session.request
+
+        def controlled_request(method, url, *args, **kwargs):
+            return self.request(lambda m, u, **kw: send(m, u, *args, **kw), method, url, **kwargs)
+
+        session.request = controlled_request
+        return session
+
+    def report(self):
+        print("\nRate Control Summary:")
+        for name, state in sorted(self.hosts.items()):
+            latency = f"{state.latency * 1000:.0f} ms" if state.latency is not None else 'n/a'
+            print(f"- {name}: {state.bucket.rate:.2f} requests/sec, concurrency {state.concurrency}, "
+                  f"average latency {latency}")
+        print(f"- Retries: {self.retries}, throttled responses: {self.throttled}, "
+              f"circuit breaker trips: {self.circuit_trips}, requests given up: {self.given_up}")
@@ -0,0 +1,133 @@
+import datetime
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlparse
+
+from ticimax_scraper.xml_feed import local_name, open_feed
+
+# Sitemap files and URL paths that never hold product pages on Ticimax stores
+NON_PRODUCT_SITEMAP_KEYWORDS = ['kategori', 'category', 'marka', 'brand', 'sayfa', 'page', 'blog', 'haber', 'icerik']
+NON_PRODUCT_PATH_PREFIXES = ('/kategori', '/category', '/marka', '/brand', '/sayfa', '/blog', '/haber',
+                             '/iletisim', '/hakkimizda', '/uyelik', '/sepet', '/arama')
+PRODUCT_SITEMAP_KEYWORDS = ['urun', 'product']
+PRODUCT_PATTERNS = [
+    r'/[^/]+-[^/]+-[^/]+$',  # Same slug pattern the homepage crawl uses
+    r'/urun/',
+    r'/product/',
+    r'/p/'
+]
+
+
+def parse_lastmod(value):
+    """Parse a W3C datetime from <lastmod>, returning an aware UTC datetime or None"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc)
+
+
+def get_sitemap_urls(session, base_url):
+    """Read the Sitemap: entries from robots.txt, falling back to /sitemap.xml"""
+    sitemaps = []
+    try:
+        response = session.get(urljoin(base_url, '/robots.txt'), timeout=30)
+        if response.ok:
+            for line in response.text.splitlines():
+                if line.lower().startswith('sitemap:'):
+                    sitemap_url = line.split(':', 1)[1].strip()
+                    if sitemap_url and sitemap_url not in sitemaps:
+                        sitemaps.append(sitemap_url)
+    except Exception as e:
+        print(f"Error reading robots.txt: {e}")
+    return sitemaps or [urljoin(base_url, '/sitemap.xml')]
+
+
+def iter_sitemap(session, sitemap_url, since=None):
+    """Stream (url, lastmod, sitemap_url) entries from a sitemap or sitemap index
+
+    Index files are followed recursively. Child sitemaps whose own lastmod is
+    older than `since` are not downloaded at all.
+    """
+    children = []
+    stream = open_feed(sitemap_url, session)
+    try:
+        loc = lastmod = None
+        path = []
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                path.append(elem)
+                continue
+            path.pop()
+            tag = local_name(elem.tag)
+            # Image sitemap entries carry their own <image:loc>; the page URL comes first
+            if tag == 'loc' and loc is None:
+                loc = (elem.text or '').strip()
+            elif tag == 'lastmod' and lastmod is None:
+                lastmod = parse_lastmod(elem.text)
+            elif tag in ('url', 'sitemap'):
+                if loc:
+                    if tag == 'sitemap':
+                        if since is None or lastmod is None or lastmod >= since:
+                            children.append(loc)
+                    else:
+                        yield loc, lastmod, sitemap_url
+                loc = lastmod = None
+                # Cleared elements would otherwise stay in the <urlset>, one per entry
+                elem.clear()
+                if path:
+                    path[-1].remove(elem)
+    finally:
+        stream.close()
+
+    for child in children:
+        if is_non_product_sitemap(child):
+            continue
+        try:
+            yield from iter_sitemap(session, child, since)
+        except Exception as e:
+            print(f"Error reading sitemap {child}: {e}")
+
+
+def is_non_product_sitemap(sitemap_url):
+    name = urlparse(sitemap_url).path.lower()
+    if any(keyword in name for keyword in PRODUCT_SITEMAP_KEYWORDS):
+        return False
+    return any(keyword in name for keyword in NON_PRODUCT_SITEMAP_KEYWORDS)
+
+
+def is_product_url(url, sitemap_url=''):
+    """Classify a sitemap entry as a product page"""
+    path = urlparse(url).path
+    if not path or path == '/' or path.lower().startswith(NON_PRODUCT_PATH_PREFIXES):
+        return False
+    if path.lower().endswith(('.jpg', '.png', '.gif', '.css', '.js', '.xml')):
+        return False
+    # Ticimax splits product URLs into their own sitemap files
+    if any(keyword in urlparse(sitemap_url).path.lower() for keyword in PRODUCT_SITEMAP_KEYWORDS):
+        return True
+    return any(re.search(pattern, path) for pattern in PRODUCT_PATTERNS)
+
+
+def discover_product_urls(session, base_url, since=None):
+    """Discover product URLs from the store's sitemaps
+
+    Returns a dict mapping every product URL to its lastmod (or None). When
+    `since` is given, entries last modified before it are left out.
+    """
+    products = {}
+    for sitemap_url in get_sitemap_urls(session, base_url):
+        print(f"Reading sitemap: {sitemap_url}")
+        try:
+            for url, lastmod, source in iter_sitemap(session, sitemap_url, since):
+                if since is not None and lastmod is not None and lastmod < since:
+                    continue
+                if is_product_url(url, source):
+                    products[url] = lastmod
+        except Exception as e:
+            print(f"Error reading sitemap {sitemap_url}: {e}")
+    return products
@@ -0,0 +1,208 @@
+import datetime
+import sqlite3
+import threading
+
+from ticimax_scraper.output_backends import LIST_KEYS, parse_price
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    products INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    name TEXT,
+    price TEXT,
+    price_amount REAL,
+    currency TEXT,
+    description TEXT,
+    first_seen_run INTEGER REFERENCES runs(id),
+    last_seen_run INTEGER REFERENCES runs(id),
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS images (
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (product_id, position)
+);
+CREATE INDEX IF NOT EXISTS images_url ON images(url);
+CREATE TABLE IF NOT EXISTS variations (
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    position INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (product_id, position)
+);
+CREATE TABLE IF NOT EXISTS sizes (
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    position INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (product_id, position)
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    recorded_at TEXT NOT NULL,
+    price TEXT,
+    price_amount REAL,
+    currency TEXT,
+    PRIMARY KEY (product_id, run_id)
+);
+CREATE INDEX IF NOT EXISTS price_history_recorded ON price_history(recorded_at);
+CREATE INDEX IF NOT EXISTS price_history_run ON price_history(run_id);
+"""
+
+# Child table of every list field, filled in list order
+LIST_TABLES = {'images': ('images', 'url'), 'variations': ('variations', 'value'), 'sizes': ('sizes', 'value')}
+
+
+def now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+
+
+class SQLiteStore:
+    """Keeps the catalog in SQLite across runs, with a price history
+
+    Products are upserted by URL in batches of `batch_size`, one transaction
+    per batch; their images, variations and sizes live in child tables. Every
+    run gets a row in `runs`, and `price_history` gets a row stamped with the
+    run only when a product is new or its price differs from the stored one.
+    Has the StreamingCSVWriter interface, so it can sit next to the CSV writer.
+    The connection is shared behind a lock, so the store may be opened on one
+    thread and written from another (the pipeline's writer stage).
+    """
+
+    def __init__(self, filename, batch_size=50, checkpoint_every=None):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.buffer = []
+        self.count = 0
+        self.new_products = 0
+        self.price_changes = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        with self.conn:
+            self.run_id = self.conn.execute('INSERT INTO runs (started_at) VALUES (?)', (now(),)).lastrowid
+
+    def write(self, product):
+        with self.lock:
+            self.buffer.append(product)
+            if len(self.buffer) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        # Later rows for the same URL win, like the CSV sort keeps the last row
+        batch = {product.get('product_url', ''): product for product in self.buffer}
+        stamp = now()
+        with self.conn:
+            previous = self._stored_prices(list(batch))
+            rows = []
+            for url, product in batch.items():
+                amount, currency = parse_price(product.get('price', ''))
+                rows.append((url, product.get('name', ''), product.get('price', ''), amount, currency,
+                             product.get('description', ''), self.run_id, self.run_id, stamp))
+            self.conn.executemany("""
+                INSERT INTO products (url, name, price, price_amount, currency, description,
+                                      first_seen_run, last_seen_run, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    name = excluded.name, price = excluded.price, price_amount = excluded.price_amount,
+                    currency = excluded.currency, description = excluded.description,
+                    last_seen_run = excluded.last_seen_run, updated_at = excluded.updated_at
+            """, rows)
+            ids = self._product_ids(list(batch))
+
+            history = []
+            for url, _, price, amount, currency, *_ in rows:
+                if url not in previous:
+                    self.new_products += 1
+                elif previous[url] == price:
+                    continue
+                else:
+                    self.price_changes += 1
+                history.append((ids[url], self.run_id, stamp, price, amount, currency))
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO price_history (product_id, run_id, recorded_at, price, price_amount, currency)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, history)
+
+            for key in LIST_KEYS:
+                table, column = LIST_TABLES[key]
+                self.conn.executemany(f'DELETE FROM {table} WHERE product_id = ?', [(ids[url],) for url in batch])
+                self.conn.executemany(f'INSERT INTO {table} (product_id, position, {column}) VALUES (?, ?, ?)',
+                                      [(ids[url], position, value) for url, product in batch.items()
+                                       for position, value in enumerate(product.get(key, []))])
+        self.count += len(self.buffer)
+        self.buffer = []
+
+    def _stored_prices(self, urls):
+        prices = {}
+        for start in range(0, len(urls), 500):  # Stay below SQLite's bound parameter limit
+            chunk = urls[start:start + 500]
+            query = f"SELECT url, price FROM products WHERE url IN ({', '.join('?' * len(chunk))})"
+            prices.update(self.conn.execute(query, chunk).fetchall())
+        return prices
+
+    def _product_ids(self, urls):
+        ids = {}
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            query = f"SELECT url, id FROM products WHERE url IN ({', '.join('?' * len(chunk))})"
+            ids.update(self.conn.execute(query, chunk).fetchall())
+        return ids
+
+    def report(self):
+        print(f"\nCatalog database {self.filename}: {self.count} products written, "
+              f"{self.new_products} new, {self.price_changes} price changes recorded")
+
+    def close(self, completed=True):
+        with self.lock:
+            self._flush()
+            with self.conn:
+                self.conn.execute('UPDATE runs SET finished_at = ?, products = ? WHERE id = ?',
+                                  (now() if completed else None, self.count, self.run_id))
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(completed=exc_type is None)
+
+
+def price_trend(conn, url):
+    """Every recorded price of one product, oldest first: [(recorded_at, price, price_amount)]"""
+    return conn.execute("""
+        SELECT h.recorded_at, h.price, h.price_amount FROM price_history h
+        JOIN products p ON p.id = h.product_id
+        WHERE p.url = ? ORDER BY h.run_id
+    """, (url,)).fetchall()
+
+
+def price_changes_since(conn, since):
+    """Prices recorded at or after the ISO timestamp `since`, with the price before each
+
+    Returns [(url, name, old_price, new_price, recorded_at)]; old_price is None
+    for products that were new.
+    """
+    return conn.execute("""
+        SELECT p.url, p.name,
+               (SELECT old.price FROM price_history old
+                WHERE old.product_id = h.product_id AND old.run_id < h.run_id
+                ORDER BY old.run_id DESC LIMIT 1),
+               h.price, h.recorded_at
+        FROM price_history h JOIN products p ON p.id = h.product_id
+        WHERE h.recorded_at >= ? ORDER BY h.recorded_at, p.url
+    """, (since,)).fetchall()
@@ -0,0 +1,122 @@
+import csv
+import os
+
+from ticimax_scraper.incremental import CSV_COLUMNS, CSVIndex, product_to_row
+
+
+def journal_path(filename):
+    return filename + '.journal'
+
+
+def completed_urls(filename):
+    """URLs already written to `filename` by an interrupted run, read from its resume journal"""
+    path = journal_path(filename)
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+class StreamingCSVWriter:
+    """Appends product rows to a CSV as results arrive
+
+    Rows are flushed every `batch_size` products and fsynced every
+    `checkpoint_every` products. With `journal=True` the URL of every flushed
+    row is appended to `<filename>.journal`, so an interrupted run can resume
+    and skip them; the journal is removed when the writer closes normally.
+    """
+
+    def __init__(self, filename, resume=False, journal=True, batch_size=50, checkpoint_every=500):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.checkpoint_every = checkpoint_every
+        self.buffer = []
+        self.count = 0
+        self.since_checkpoint = 0
+
+        appending = resume and os.path.exists(filename) and os.path.getsize(filename) > 0
+        # utf-8-sig would write a second BOM in the middle of the file when appending
+        self.file = open(filename, 'a' if appending else 'w', newline='', encoding='utf-8' if appending else 'utf-8-sig')
+        self.writer = csv.DictWriter(self.file, fieldnames=CSV_COLUMNS)
+        if not appending:
+            self.writer.writeheader()
+
+        self.journal = None
+        if journal:
+            self.journal = open(journal_path(filename), 'a' if appending else 'w', encoding='utf-8')
+
+    def write(self, product):
+        self.buffer.append(product)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.writer.writerows(product_to_row(product) for product in self.buffer)
+        self.file.flush()
+        # The journal only lists URLs whose rows have already reached the CSV
+        if self.journal:
+            self.journal.writelines(product.get('product_url', '') + '\n' for product in self.buffer)
+            self.journal.flush()
+        self.count += len(self.buffer)
+        self.since_checkpoint += len(self.buffer)
+        self.buffer = []
+        if self.since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Force everything written so far onto disk"""
+        os.fsync(self.file.fileno())
+        if self.journal:
+            os.fsync(self.journal.fileno())
+        self.since_checkpoint = 0
+
+    def close(self, completed=True):
+        self.flush()
+        self.checkpoint()
+        self.file.close()
+        if self.journal:
+            self.journal.close()
+            if completed:
+                os.remove(journal_path(self.filename))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Keep the journal when the run failed so it can be resumed
+        self.close(completed=exc_type is None)
+
+
+def sort_csv_by_url(filename, output=None):
+    """Write the rows of a CSV ordered by Product URL to `output` (default: in place)
+
+    Raw records are copied through the mmap index, so rows are never parsed
+    or held in memory. Duplicate URLs keep their last row.
+    """
+    output = output or filename
+    index = CSVIndex(filename)
+    tmp_path = output + '.tmp'
+    try:
+        with open(filename, 'rb') as source, open(tmp_path, 'wb') as target:
+            # The header record ends where the first data record starts
+            first = min((start for start, _ in index.offsets.values()), default=None)
+            target.write(source.read(first) if first is not None else source.read())
+            for url in sorted(index.offsets):
+                start, end = index.offsets[url]
+                record = index.mm[start:end]
+                target.write(record if record.endswith(b'\n') else record + b'\r\n')
+    finally:
+        index.close()
+    os.replace(tmp_path, output)
+
+
+def save_to_csv(products_data, filename):
+    """Save a list of product dicts to a CSV file in one go"""
+    with StreamingCSVWriter(filename, journal=False) as writer:
+        for product in products_data:
+            if product:
+                writer.write(product)
+    print(f"Data saved to {filename}")
+    return filename
@@ -0,0 +1,174 @@
+import json
+import re
+from urllib.parse import urljoin
+
+from ticimax_scraper.xml_feed import clean_text, format_price
+
+JSON_LD_PATTERN = re.compile(
+    rb'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.I | re.S)
+# Inline product objects Ticimax templates assign in <script> blocks
+INLINE_OBJECT_PATTERN = re.compile(rb'(?:var\s+|window\.)?(productDetailModel|productDetail|urunDetay)\s*=\s*\{')
+
+# Key aliases used by the inline Ticimax product object
+NAME_KEYS = ['productName', 'urunAdi', 'name']
+DESCRIPTION_KEYS = ['productDescription', 'urunAciklama', 'aciklama', 'description']
+PRICE_KEYS = ['productSellPriceKdvDahil', 'productPriceKdvDahil', 'indirimliFiyat', 'satisFiyati',
+              'productSellPrice', 'price']
+CURRENCY_KEYS = ['currency', 'paraBirimi', 'productCurrency']
+IMAGE_LIST_KEYS = ['productImages', 'images', 'resimler']
+IMAGE_URL_KEYS = ['bigImagePath', 'imagePath', 'url', 'path']
+VARIANT_LIST_KEYS = ['productVariantData', 'variants', 'varyasyonlar']
+OPTION_LIST_KEYS = ['ekSecenekList', 'options', 'ozellikler']
+SIZE_NAMES = {'beden', 'size', 'numara'}
+
+
+def first_value(data, keys):
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, '', [], {}):
+            return value
+    return None
+
+
+def iter_json_ld(content):
+    """Yield every JSON object found in the page's JSON-LD blocks"""
+    for block in JSON_LD_PATTERN.findall(content):
+        try:
+            data = json.loads(block.decode('utf-8', 'replace').strip())
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(reversed(item))
+            elif isinstance(item, dict):
+                yield item
+                if '@graph' in item:
+                    stack.append(item['@graph'])
+
+
+def merge_images(images, extra):
+    """`images` followed by the URLs of `extra` it does not have yet"""
+    return images + [url for url in extra if url not in images]
+
+
+def is_type(item, name):
+    types = item.get('@type', [])
+    return name in (types if isinstance(types, list) else [types])
+
+
+def image_urls(value, page_url):
+    """Normalize a JSON-LD / inline image value (string, list or objects) to absolute URLs"""
+    if not value:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    urls = []
+    for image in value:
+        if isinstance(image, dict):
+            image = first_value(image, IMAGE_URL_KEYS + ['contentUrl'])
+        if isinstance(image, str) and image.strip():
+            url = urljoin(page_url, image.strip())
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+def from_json_ld(content, page_url):
+    product = {}
+    for item in iter_json_ld(content):
+        if not (is_type(item, 'Product') or is_type(item, 'ProductGroup')):
+            continue
+        if item.get('name') and not product.get('name'):
+            product['name'] = str(item['name']).strip()
+        if item.get('description') and not product.get('description'):
+            product['description'] = clean_text(item['description'])
+        images = image_urls(item.get('image'), page_url)
+        if images and not product.get('images'):
+            product['images'] = images
+
+        offers = item.get('offers') or []
+        offers = offers if isinstance(offers, list) else [offers]
+        for offer in offers:
+            if not isinstance(offer, dict):
+                continue
+            price = offer.get('price', offer.get('lowPrice'))
+            if price not in (None, '') and not product.get('price'):
+                product['price'] = format_price(price, offer.get('priceCurrency') or 'TRY')
+
+        # ProductGroup variants carry the size / color of every SKU
+        for variant in item.get('hasVariant') or []:
+            if not isinstance(variant, dict):
+                continue
+            size = variant.get('size')
+            if isinstance(size, dict):
+                size = size.get('name')
+            if size and str(size) not in product.setdefault('sizes', []):
+                product['sizes'].append(str(size))
+            color = variant.get('color')
+            if color and str(color) not in product.setdefault('variations', []):
+                product['variations'].append(str(color))
+    return product
+
+
+def iter_inline_objects(content):
+    """Decode the inline Ticimax product objects assigned in <script> blocks"""
+    decoder = json.JSONDecoder()
+    for match in INLINE_OBJECT_PATTERN.finditer(content):
+        start = match.end() - 1
+        text = content[start:start + 2_000_000].decode('utf-8', 'replace')
+        try:
+            data, _ = decoder.raw_decode(text)
+        except ValueError:
+            continue  # Not strict JSON (plain JavaScript object); leave it to the DOM path
+        if isinstance(data, dict):
+            yield data.get('product', data) if isinstance(data.get('product'), dict) else data
+
+
+def from_inline_object(content, page_url):
+    product = {}
+    for data in iter_inline_objects(content):
+        name = first_value(data, NAME_KEYS)
+        if name and not product.get('name'):
+            product['name'] = str(name).strip()
+        description = first_value(data, DESCRIPTION_KEYS)
+        if description and not product.get('description'):
+            product['description'] = clean_text(description)
+        price = first_value(data, PRICE_KEYS)
+        if price and not product.get('price'):
+            product['price'] = format_price(price, first_value(data, CURRENCY_KEYS) or 'TRY')
+        images = image_urls(first_value(data, IMAGE_LIST_KEYS), page_url)
+        if images and not product.get('images'):
+            product['images'] = images
+
+        for variant in first_value(data, VARIANT_LIST_KEYS) or []:
+            if not isinstance(variant, dict):
+                continue
+            for option in first_value(variant, OPTION_LIST_KEYS) or []:
+                if not isinstance(option, dict):
+                    continue
+                option_name = str(first_value(option, ['tanim', 'name']) or '').lower()
+                value = str(first_value(option, ['deger', 'value']) or '').strip()
+                if not value:
+                    continue
+                field = 'sizes' if option_name in SIZE_NAMES else 'variations'
+                if value not in product.setdefault(field, []):
+                    product[field].append(value)
+    return product
+
+
+def extract_structured_product(content, page_url):
+    """Pull product fields out of JSON-LD and inline product JSON in the raw page bytes
+
+    Only the fields that were found are returned; inline Ticimax data fills
+    whatever JSON-LD left out. JSON-LD often lists only the main image while
+    the inline object has the whole gallery, so images from both are kept.
+    """
+    product = from_json_ld(content, page_url)
+    for field, value in from_inline_object(content, page_url).items():
+        if field == 'images':
+            product['images'] = merge_images(product.get('images', []), value)
+        elif value and not product.get(field):
+            product[field] = value
+    return product
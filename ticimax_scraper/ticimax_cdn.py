@@ -0,0 +1,66 @@
+from urllib.parse import urlparse, urlunparse
+
+# Ticimax serves every product image under the same file name in one folder per
+# size; a file directly in the image folder is the original upload
+SIZE_FOLDERS = ['thumb', 'kucuk', 'orta', 'buyuk']
+SIZE_VARIANTS = SIZE_FOLDERS + ['full']
+# Folder names the CDN matches case-insensitively; file names keep their case
+CASE_INSENSITIVE_FOLDERS = {'uploads', 'urunresimleri'} | set(SIZE_FOLDERS)
+
+
+def is_ticimax_cdn(url):
+    host = urlparse(url).netloc.lower()
+    return host == 'ticimax.cloud' or host.endswith('.ticimax.cloud')
+
+
+def split_variant(url):
+    """Split a Ticimax CDN image URL into (canonical key, size variant)
+
+    The key is the same for case variants of the image folders
+    (`Uploads/UrunResimleri` vs `uploads/urunresimleri`, which the CDN treats
+    alike) and for every size of one file. The file name keeps its case, so
+    the key still points at an existing file on a case-sensitive origin.
+    Other URLs are their own key with variant None.
+    """
+    if not is_ticimax_cdn(url):
+        return url, None
+    parsed = urlparse(url)
+    segments = parsed.path.split('/')
+    folders = [folder.lower() if folder.lower() in CASE_INSENSITIVE_FOLDERS else folder
+               for folder in segments[:-1]] + segments[-1:]
+    variant = 'full'
+    if len(folders) > 2 and folders[-2] in SIZE_FOLDERS:
+        variant = folders.pop(-2)
+    return urlunparse(('https', parsed.netloc.lower(), '/'.join(folders), '', '', '')), variant
+
+
+def variant_url(key, variant):
+    """The URL of one size variant of a canonical key"""
+    if variant == 'full':
+        return key
+    folder, _, name = key.rpartition('/')
+    return f"{folder}/{variant}/{name}"
+
+
+def canonical_images(images, variant=None):
+    """Fold case variants and size copies of the same Ticimax image into one URL each
+
+    With `variant` None the largest size found on the page is kept. With one of
+    SIZE_VARIANTS every Ticimax image is rewritten to that size, e.g. 'thumb'
+    to download small previews only. Order follows the first occurrence, and
+    URLs outside the Ticimax CDN are only deduplicated.
+    """
+    groups = {}
+    for url in images:
+        key, found = split_variant(url)
+        groups.setdefault(key, []).append(found)
+
+    result = []
+    for key, found in groups.items():
+        if found[0] is None:
+            result.append(key)
+        elif variant:
+            result.append(variant_url(key, variant))
+        else:
+            result.append(variant_url(key, max(found, key=SIZE_VARIANTS.index)))
+    return result
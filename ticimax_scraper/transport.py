@@ -0,0 +1,330 @@
+import http.client
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING as DECODABLE_ENCODINGS
+
+try:
+    import httpx
+except ImportError:  # Only needed for HTTP/2
+    httpx = None
+
+from ticimax_scraper.http_cache import CachingAdapter
+from ticimax_scraper.metrics import registry
+
+# Keep-alive connections kept open per host by default
+DEFAULT_POOL_SIZE = 10
+# Host pools a default adapter keeps before closing the least recently used one
+DEFAULT_POOL_HOSTS = 10
+
+# Content codings urllib3 can decode here: always gzip and deflate, plus br when
+# brotli / brotlicffi and zstd when zstandard is installed. httpx decodes the same set.
+ACCEPT_ENCODING = DECODABLE_ENCODINGS.replace(',', ', ')
+
+
+class ConnectionStats:
+    """Connections opened, TLS handshakes and requests per host
+
+    Requests per connection show how well keep-alive works: with a pool as
+    large as the number of threads using it every handshake is paid once per
+    thread, not once per page. Connections counted as discarded did not fit
+    back into a full pool and were closed; a steady stream of them means the
+    pool is smaller than the concurrency. Connections and connect times are
+    also recorded in the metrics registry.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def _host(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = {'requests': 0, 'connections': 0, 'tls_handshakes': 0,
+                                'connect_seconds': 0.0, 'discarded': 0}
+        return self.hosts[host]
+
+    def connected(self, host, tls, seconds):
+        with self.lock:
+            stats = self._host(host)
+            stats['connections'] += 1
+            stats['tls_handshakes'] += int(tls)
+            stats['connect_seconds'] += seconds
+        registry.inc('http_connections', host=host, tls=str(tls).lower())
+        registry.observe('http_connect_seconds', seconds, host=host)
+
+    def requested(self, host):
+        with self.lock:
+            self._host(host)['requests'] += 1
+
+    def discarded(self, host):
+        with self.lock:
+            self._host(host)['discarded'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {host: dict(stats) for host, stats in self.hosts.items()}
+
+    def report(self):
+        print("\nConnection Reuse Summary:")
+        for host, stats in sorted(self.snapshot().items()):
+            connections = stats['connections']
+            per_connection = f"{stats['requests'] / connections:.1f}" if connections else 'n/a'
+            connect = stats['connect_seconds'] / connections * 1000 if connections else 0.0
+            print(f"- {host}: {stats['requests']} requests over {connections} connections "
+                  f"({per_connection} per connection), {stats['tls_handshakes']} TLS handshakes, "
+                  f"{connect:.0f} ms per connect, {stats['discarded']} discarded by a full pool")
+
+
+# Process-wide statistics every pooled adapter records into
+connection_stats = ConnectionStats()
+
+
+def host_label(host, port, tls):
+    """`host`, with the port appended unless it is the default one of the scheme"""
+    return host if port in (None, 443 if tls else 80) else f"{host}:{port}"
+
+
+# urllib3 pools whose connections count connects and requests
+
+class CountingConnection:
+    tls = False
+
+    def connect(self):
+        # Also called when a kept-alive connection the server closed is reopened
+        start = time.perf_counter()
+        super().connect()
+        connection_stats.connected(host_label(self.host, self.port, self.tls), self.tls,
+                                   time.perf_counter() - start)
+
+    def request(self, *args, **kwargs):
+        connection_stats.requested(host_label(self.host, self.port, self.tls))
+        return super().request(*args, **kwargs)
+
+
+class CountingHTTPConnection(CountingConnection, HTTPConnection):
+    pass
+
+
+class CountingHTTPSConnection(CountingConnection, HTTPSConnection):
+    tls = True
+
+
+class CountingPool:
+    def _put_conn(self, conn):
+        # Approximate: another thread may fill or drain the pool in between
+        full = self.pool is not None and self.pool.full()
+        super()._put_conn(conn)
+        if full and conn is not None:
+            connection_stats.discarded(host_label(self.host, self.port, self.scheme == 'https'))
+
+
+class CountingHTTPConnectionPool(CountingPool, HTTPConnectionPool):
+    ConnectionCls = CountingHTTPConnection
+
+
+class CountingHTTPSConnectionPool(CountingPool, HTTPSConnectionPool):
+    ConnectionCls = CountingHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools record into connection_stats"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': CountingHTTPConnectionPool,
+                                                   'https': CountingHTTPSConnectionPool}
+
+
+class CachingPooledAdapter(CachingAdapter, PooledAdapter):
+    pass
+
+
+# HTTP/2 through httpx
+
+class HTTPXBody:
+    """File-like view of an httpx response body for requests' Response.raw
+
+    Reads decoded chunks lazily, so streamed responses stay streamed. Also
+    stands in for the http.client response requests reads cookies from.
+    """
+
+    def __init__(self, response):
+        self.response = response
+        self.chunks = response.iter_bytes()
+        self.buffer = b''
+        self.msg = http.client.HTTPMessage()
+        for name, value in response.headers.multi_items():
+            self.msg[name] = value
+        self._original_response = self
+
+    def read(self, amt=None, **kwargs):
+        while amt is None or len(self.buffer) < amt:
+            try:
+                self.buffer += next(self.chunks)
+            except StopIteration:
+                break
+            except httpx.TransportError as e:
+                raise requests.exceptions.ChunkedEncodingError(e) from e
+        if amt is None:
+            data, self.buffer = self.buffer, b''
+        else:
+            data, self.buffer = self.buffer[:amt], self.buffer[amt:]
+        return data
+
+    def close(self):
+        self.response.close()
+
+    def release_conn(self):
+        self.response.close()
+
+
+def httpx_timeout(timeout):
+    """Translate a requests timeout (seconds or a (connect, read) pair) to httpx"""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+class HTTP2Adapter(HTTPAdapter):
+    """Transport adapter that sends requests through an httpx client speaking HTTP/2
+
+    HTTP/2 multiplexes every request to a host over one connection, so
+    `pool_maxsize` only caps the number of connections the client may open.
+    TLS verification and client certificates are set on the client, not per
+    request; proxies are not supported. Needs httpx with the h2 extra
+    (pip install 'httpx[http2]').
+    """
+
+    def __init__(self, pool_maxsize=DEFAULT_POOL_SIZE, **kwargs):
+        if httpx is None:
+            raise ImportError("httpx is required for HTTP/2 (pip install 'httpx[http2]')")
+        super().__init__(pool_maxsize=pool_maxsize, **kwargs)
+        self.client = httpx.Client(http2=True, limits=httpx.Limits(max_connections=pool_maxsize,
+                                                                     max_keepalive_connections=pool_maxsize))
+
+    def _trace(self, host, tls):
+        started = {}
+
+        def trace(event, info):
+            if event == 'connection.connect_tcp.started':
+                started['at'] = time.perf_counter()
+            elif event == ('connection.start_tls.complete' if tls else 'connection.connect_tcp.complete'):
+                connection_stats.connected(host, tls, time.perf_counter() - started.get('at', time.perf_counter()))
+
+        return trace
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = urlparse(request.url)
+        tls = url.scheme == 'https'
+        host = host_label(url.hostname, url.port, tls)
+        connection_stats.requested(host)
+        outgoing = self.client.build_request(request.method, request.url, headers=dict(request.headers),
+                                             content=request.body, timeout=httpx_timeout(timeout),
+                                             extensions={'trace': self._trace(host, tls)})
+        try:
+            incoming = self.client.send(outgoing, stream=True)
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request) from e
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request) from e
+        if not stream:
+            # The connection only goes back to the pool once the body has been read
+            try:
+                incoming.read()
+            except httpx.TransportError as e:
+                raise requests.exceptions.ChunkedEncodingError(e) from e
+
+        response = Response()
+        response.status_code = incoming.status_code
+        response.reason = incoming.reason_phrase
+        response.headers = CaseInsensitiveDict(incoming.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = HTTPXBody(incoming)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        requests.cookies.extract_cookies_to_jar(response.cookies, request, response.raw)
+        return response
+
+    def close(self):
+        super().close()
+        self.client.close()
+
+
+class CachingHTTP2Adapter(CachingAdapter, HTTP2Adapter):
+    pass
+
+
+def mount_adapters(session, cache=None, pool_size=DEFAULT_POOL_SIZE, host_pool_sizes=None, http2=False,
+                   pool_block=False):
+    """Mount pooled adapters on `session`, revalidating through `cache` when one is given
+
+    Every host gets its own pool of `pool_size` kept-alive connections, except
+    the hosts in `host_pool_sizes` ({'static.ticimax.cloud': 16}), which get
+    an adapter of their own with that many. With `pool_block` a thread waits
+    for a free connection instead of opening one that is closed after use.
+    With `http2` requests go through httpx, falling back to HTTP/1.1 with a
+    warning when httpx or h2 is not installed.
+    """
+    def adapter(size):
+        if http2:
+            return CachingHTTP2Adapter(cache, pool_maxsize=size) if cache else HTTP2Adapter(pool_maxsize=size)
+        kwargs = {'pool_connections': DEFAULT_POOL_HOSTS, 'pool_maxsize': size, 'pool_block': pool_block}
+        return CachingPooledAdapter(cache, **kwargs) if cache else PooledAdapter(**kwargs)
+
+    try:
+        default = adapter(pool_size)
+    except ImportError as e:
+        print(f"HTTP/2 is not available ({e}), using HTTP/1.1")
+        http2 = False
+        default = adapter(pool_size)
+    session.mount('http://', default)
+    session.mount('https://', default)
+    # requests picks the adapter with the longest matching prefix
+    for host, size in (host_pool_sizes or {}).items():
+        host_adapter = adapter(size)
+        session.mount(f'http://{host}/', host_adapter)
+        session.mount(f'https://{host}/', host_adapter)
+    return session
+
+
+class ThreadLocalSession:
+    """Gives every thread its own session built by `factory`, behind the Session interface
+
+    Threads then share no cookie jar, adapter or connection pool. Sessions live
+    as long as this object; a thread pool of N workers ends up with N of them.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.sessions = []
+
+    def current(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = self.factory()
+            with self.lock:
+                self.sessions.append(session)
+        return session
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions:
+                session.close()
+            self.sessions = []
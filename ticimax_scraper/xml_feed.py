@@ -0,0 +1,157 @@
+import gzip
+import html
+import re
+import xml.etree.ElementTree as ET
+
+import requests
+
+# Ticimax feed tags (and common aliases) mapped onto product_info fields
+PRODUCT_TAGS = {'urun', 'product', 'item'}
+NAME_TAGS = {'urunadi', 'name', 'title'}
+URL_TAGS = {'urunurl', 'urunlink', 'link', 'url'}
+DESCRIPTION_TAGS = {'aciklama', 'description', 'onyazi'}
+IMAGE_TAGS = {'resim', 'image', 'image_link', 'additional_image_link'}
+PRICE_TAGS = ['indirimlifiyat', 'satisfiyati', 'sale_price', 'price', 'fiyat']
+CURRENCY_TAGS = {'parabirimi', 'currency'}
+OPTION_TAGS = {'ozellik', 'option'}
+SIZE_NAMES = {'beden', 'size', 'numara'}
+
+CURRENCY_SYMBOLS = {'TL': '₺', 'TRY': '₺', 'USD': '$', 'EUR': '€', 'GBP': '£'}
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def local_name(tag):
+    """Tag name without namespace, lower-cased"""
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+def clean_text(value):
+    """Plain text of a description that may hold HTML markup or entities"""
+    return ' '.join(html.unescape(TAG_PATTERN.sub(' ', str(value))).split())
+
+
+def format_price(value, currency='TL'):
+    """Format a feed price like the HTML path does, e.g. 1549.99 -> ₺1.549,99"""
+    text = str(value).strip()
+    if not text:
+        return ''
+    if ',' in text and '.' in text:
+        text = text.replace('.', '').replace(',', '.')
+    elif ',' in text:
+        text = text.replace(',', '.')
+    try:
+        number = float(text)
+    except ValueError:
+        return str(value).strip()
+    formatted = f"{number:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    symbol = CURRENCY_SYMBOLS.get((currency or 'TL').upper(), currency)
+    return f"{symbol}{formatted}"
+
+
+class ClosingGzipFile(gzip.GzipFile):
+    """GzipFile that also closes the stream it decompresses (GzipFile leaves a passed fileobj open)"""
+
+    def __init__(self, stream):
+        super().__init__(fileobj=stream)
+        self.stream = stream
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.stream.close()
+
+
+def open_feed(source, session=None, timeout=30):
+    """Open a feed file path or URL (optionally gzip-compressed) as a binary stream
+
+    Closing the returned stream also closes the HTTP response or file under it.
+    """
+    if source.startswith(('http://', 'https://')):
+        response = (session or requests).get(source, stream=True, timeout=timeout)
+        response.raise_for_status()
+        response.raw.decode_content = True
+        stream = response.raw
+    else:
+        stream = open(source, 'rb')
+    if source.endswith('.gz'):
+        return ClosingGzipFile(stream)
+    return stream
+
+
+def map_product(elem):
+    """Map one <Urun> element onto the product_info dict used by save_to_csv"""
+    product_info = {
+        'product_url': '',
+        'name': '',
+        'price': '',
+        'description': '',
+        'images': [],
+        'variations': [],
+        'sizes': []
+    }
+    prices = {}
+    currency = 'TL'
+
+    for child in elem.iter():
+        tag = local_name(child.tag)
+        text = (child.text or '').strip()
+        if tag in OPTION_TAGS:
+            option_name = (child.get('Tanim') or child.get('tanim') or child.get('name') or '').lower()
+            value = (child.get('Deger') or child.get('deger') or text).strip()
+            if not value:
+                continue
+            if option_name in SIZE_NAMES:
+                if value not in product_info['sizes']:
+                    product_info['sizes'].append(value)
+            elif option_name:
+                # Every other option (Renk, Model, ...) is treated as a variation
+                if value not in product_info['variations']:
+                    product_info['variations'].append(value)
+        elif not text:
+            continue
+        elif tag in NAME_TAGS and not product_info['name']:
+            product_info['name'] = text
+        elif tag in URL_TAGS and not product_info['product_url']:
+            product_info['product_url'] = text
+        elif tag in DESCRIPTION_TAGS and not product_info['description']:
+            # Feeds carry the description as HTML; the page scrapers store its text
+            product_info['description'] = clean_text(text)
+        elif tag in IMAGE_TAGS:
+            if text not in product_info['images']:
+                product_info['images'].append(text)
+        elif tag in PRICE_TAGS and tag not in prices:
+            prices[tag] = text
+        elif tag in CURRENCY_TAGS:
+            currency = text
+
+    # Prefer the discounted price when the feed carries one
+    for tag in PRICE_TAGS:
+        price = prices.get(tag, '')
+        if price and price.strip('0.,'):
+            product_info['price'] = format_price(price, currency)
+            break
+    return product_info
+
+
+def iter_feed_products(source, session=None):
+    """Yield product_info dicts from a Ticimax XML feed in constant memory
+
+    Each product element is cleared and detached from its parent as soon as
+    it has been mapped, so memory does not grow with the size of the feed.
+    """
+    stream = open_feed(source, session)
+    try:
+        path = []
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                path.append(elem)
+                continue
+            path.pop()
+            if local_name(elem.tag) in PRODUCT_TAGS and not any(local_name(parent.tag) in PRODUCT_TAGS for parent in path):
+                yield map_product(elem)
+                elem.clear()
+                if path:
+                    path[-1].remove(elem)
+    finally:
+        stream.close()
@@ -0,0 +1,77 @@
+import csv
+import sys
+import time
+import tracemalloc
+from ticimax_scraper.xml_feed import iter_feed_products
+from ticimax_scraper.incremental import CSV_COLUMNS, product_to_row
+from final_scraper import session, get_product_details
+
+# Default feed location - pass a file path or URL on the command line to override
+feed_source = "https://www.bbeox.com/XMLExport/urunler.xml"
+
+# Number of feed products fetched through the HTML path when benchmarking
+BENCHMARK_HTML_SAMPLE = 20
+
+def save_feed_to_csv(source, filename='bbeox_feed_products.csv'):
+    """Stream products from the XML feed straight into a CSV file"""
+    count = 0
+    with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for product_info in iter_feed_products(source, session):
+            writer.writerow(product_to_row(product_info))
+            count += 1
+            if count % 10000 == 0:
+                print(f"Written {count} products...")
+    print(f"Data saved to {filename}")
+    return count
+
+def benchmark(source):
+    """Compare feed ingestion against the HTML path on the same catalog"""
+    print("Benchmarking XML feed ingestion...")
+    tracemalloc.start()
+    start = time.perf_counter()
+    sample_urls = []
+    count = 0
+    for product_info in iter_feed_products(source, session):
+        count += 1
+        if product_info['product_url'] and len(sample_urls) < BENCHMARK_HTML_SAMPLE:
+            sample_urls.append(product_info['product_url'])
+    feed_seconds = time.perf_counter() - start
+    _, feed_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Benchmarking HTML path on {len(sample_urls)} of the same products...")
+    tracemalloc.start()
+    start = time.perf_counter()
+    html_count = sum(1 for url in sample_urls if get_product_details(url))
+    html_seconds = time.perf_counter() - start
+    _, html_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    feed_rate = count / feed_seconds if feed_seconds else 0.0
+    html_rate = html_count / html_seconds if html_seconds else 0.0
+    print("\nBenchmark Summary:")
+    print(f"- XML feed: {count} products in {feed_seconds:.2f}s ({feed_rate:.1f} products/sec), "
+          f"peak memory {feed_peak / 1024 / 1024:.1f} MB")
+    print(f"- HTML path: {html_count} products in {html_seconds:.2f}s ({html_rate:.1f} products/sec), "
+          f"peak memory {html_peak / 1024 / 1024:.1f} MB")
+    if html_rate:
+        print(f"- Feed is {feed_rate / html_rate:.0f}x faster per product")
+
+def main():
+    args = sys.argv[1:]
+    source = next((arg for arg in args if not arg.startswith('--')), feed_source)
+
+    if '--benchmark' in args:
+        benchmark(source)
+        return
+
+    print(f"Reading Ticimax XML feed: {source}")
+    start = time.perf_counter()
+    count = save_feed_to_csv(source)
+    elapsed = time.perf_counter() - start
+    print(f"Successfully imported {count} products in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()